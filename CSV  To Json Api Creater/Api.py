@@ -1,374 +1,208 @@
 import sys
-import json
 import csv
 import os
 import re
 import threading
+import uuid
 from datetime import datetime, date
 from decimal import Decimal, InvalidOperation
 import pandas as pd
 import numpy as np
-from flask import Flask, jsonify, request
+from flask import Flask, jsonify, request, Response, has_request_context
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, 
                              QWidget, QPushButton, QLabel, QFileDialog, QTextEdit, 
                              QProgressBar, QMessageBox, QCheckBox, QLineEdit, 
                              QGroupBox, QGridLayout, QSpinBox, QTabWidget, QTableWidget,
-                             QTableWidgetItem, QHeaderView, QSplitter)
+                             QTableWidgetItem, QHeaderView, QSplitter, QTableView, QComboBox)
 from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer
-from PyQt5.QtGui import QFont, QIcon, QTextCursor
+from PyQt5.QtGui import QFont, QFontMetrics, QIcon, QTextCursor
+from processing import FileProcessor
+from streaming import DEFAULT_CHUNK_SIZE
+from sketches import STATISTICS_MODES
+from store import ColumnStore
+from search import SearchIndex, SegmentedSearchIndex, segment_count, MAX_SEGMENTS
+from filters import FilterIndex, SegmentedFilterIndex, FilterError, parse_filter_args
+from sorting import SortError, parse_sort, parse_fields
+from page_cache import PageCache, DEFAULT_CACHE_BYTES
+from registry import DatasetRegistry, DEFAULT_MEMORY_BUDGET, validate_name
+from dataset import Dataset
+from serving import ThreadedServer
+from watcher import FileWatcher
+from export import iter_batches, iter_ndjson, iter_csv, iter_json_document, write_api_file
+from jobs import JobTracker, QueueFull, JOB_WORKERS
+from upload import save_upload, process_upload, resolve_source_path, UPLOAD_EXTENSIONS, BACKGROUND_UPLOAD_BYTES
+from profiling import Profile, prometheus_text, profile_families
+from views import JsonLinesModel, RecordTableModel
+import serializer
 import warnings
 warnings.filterwarnings('ignore')
 
 
+SSE_KEEPALIVE_SECONDS = 15
+
+
 class DataProcessor(QThread):
+    """Runs FileProcessor on a worker thread and reports through Qt signals"""
     progress_updated = pyqtSignal(int)
     status_updated = pyqtSignal(str)
     finished_processing = pyqtSignal(dict)
     error_occurred = pyqtSignal(str)
     preview_ready = pyqtSignal(list, list)
     
-    def __init__(self, file_path, config):
+    def __init__(self, file_path, config, server=None):
         super().__init__()
         self.file_path = file_path
         self.config = config
-        self.df = None
+        self.server = server
+        self.prepared = None  # store and indexes built for server, see FlaskAPIServer.prepare_data
+        self.core = FileProcessor(file_path, config,
+                                  on_progress=self.progress_updated.emit,
+                                  on_status=self.status_updated.emit,
+                                  on_preview=self.preview_ready.emit)
+    
+    @property
+    def df(self):
+        return self.core.df
+    
+    @property
+    def column_types(self):
+        return self.core.column_types
         
     def run(self):
         try:
-            self.status_updated.emit("Starting file processing...")
-            self.progress_updated.emit(5)
-            
-            # Load file based on extension
-            file_ext = os.path.splitext(self.file_path)[1].lower()
-            
-            if file_ext == '.csv':
-                self.df = self.load_csv_file()
-            elif file_ext in ['.xlsx', '.xls']:
-                self.df = self.load_excel_file()
-            else:
-                raise ValueError(f"Unsupported file format: {file_ext}")
-            
-            self.progress_updated.emit(30)
-            self.status_updated.emit("Processing data...")
-            
-            # Clean and process data
-            self.clean_data()
-            self.progress_updated.emit(60)
-            
-            # Generate preview
-            headers = list(self.df.columns)
-            preview_data = []
-            for _, row in self.df.head(10).iterrows():
-                preview_data.append([str(val) if pd.notna(val) else "" for val in row])
-            
-            self.preview_ready.emit(headers, preview_data)
-            self.progress_updated.emit(80)
-            
-            # Generate JSON API
-            api_data = self.generate_json_api()
-            self.progress_updated.emit(100)
-            
-            self.status_updated.emit("Processing completed successfully!")
+            api_data = self.core.process()
+            if self.server is not None and not api_data.get('appended'):
+                # Built here so the GUI thread only swaps the new data in
+                self.prepared = self.server.prepare_data(api_data, self.core.df, self.core.sheet_frames,
+                                                         self.core.profile)
             self.finished_processing.emit(api_data)
-            
         except Exception as e:
             self.error_occurred.emit(f"Error processing file: {str(e)}")
+
+
+class SerializerJSONProvider(JSONProvider):
+    """jsonify through serializer.py: compact with sorted keys, indented when the request asks for ?pretty=1"""
     
-    def load_csv_file(self):
-        """Load CSV file with intelligent delimiter detection and error handling"""
-        try:
-            self.status_updated.emit("Analyzing CSV structure...")
-            
-            # Try different encodings
-            encodings = ['utf-8', 'utf-8-sig', 'latin-1', 'cp1252', 'iso-8859-1']
-            df = None
-            
-            for encoding in encodings:
-                try:
-                    # First, try to detect delimiter
-                    with open(self.file_path, 'r', encoding=encoding) as file:
-                        sample = file.read(4096)
-                        
-                    # Try different delimiters
-                    delimiters = [',', ';', '\t', '|', ':', ' ']
-                    best_delimiter = ','
-                    max_columns = 0
-                    
-                    for delimiter in delimiters:
-                        try:
-                            test_df = pd.read_csv(self.file_path, delimiter=delimiter, 
-                                                encoding=encoding, nrows=5)
-                            if len(test_df.columns) > max_columns:
-                                max_columns = len(test_df.columns)
-                                best_delimiter = delimiter
-                        except:
-                            continue
-                    
-                    # Load full file with best delimiter
-                    df = pd.read_csv(self.file_path, delimiter=best_delimiter, 
-                                   encoding=encoding, low_memory=False)
-                    
-                    # If only one column, try fixed-width parsing
-                    if len(df.columns) == 1:
-                        try:
-                            df = pd.read_fwf(self.file_path, encoding=encoding)
-                        except:
-                            pass
-                    
-                    self.status_updated.emit(f"CSV loaded with {encoding} encoding and '{best_delimiter}' delimiter")
-                    break
-                    
-                except Exception as e:
-                    continue
-            
-            if df is None:
-                raise ValueError("Could not parse CSV file with any supported encoding or delimiter")
-            
-            return df
-            
-        except Exception as e:
-            raise Exception(f"CSV loading error: {str(e)}")
-    
-    def load_excel_file(self):
-        """Load Excel file with comprehensive error handling"""
-        try:
-            self.status_updated.emit("Loading Excel file...")
-            
-            # Try to read Excel file
-            try:
-                # First try default sheet
-                df = pd.read_excel(self.file_path, engine='openpyxl')
-            except:
-                try:
-                    # Try with xlrd engine for older files
-                    df = pd.read_excel(self.file_path, engine='xlrd')
-                except:
-                    # Try reading all sheets and use the first non-empty one
-                    excel_file = pd.ExcelFile(self.file_path)
-                    df = None
-                    for sheet_name in excel_file.sheet_names:
-                        try:
-                            temp_df = pd.read_excel(self.file_path, sheet_name=sheet_name)
-                            if not temp_df.empty:
-                                df = temp_df
-                                self.status_updated.emit(f"Using sheet: {sheet_name}")
-                                break
-                        except:
-                            continue
-                    
-                    if df is None:
-                        raise ValueError("No readable sheets found in Excel file")
-            
-            return df
-            
-        except Exception as e:
-            raise Exception(f"Excel loading error: {str(e)}")
+    def dumps(self, obj, **kwargs):
+        return serializer.dumps_text(obj, pretty=bool(kwargs.get('indent')), sort_keys=kwargs.get('sort_keys', True))
     
-    def clean_data(self):
-        """Clean and standardize data"""
-        try:
-            self.status_updated.emit("Cleaning data...")
-            
-            # Clean column names
-            self.df.columns = [self.clean_column_name(col) for col in self.df.columns]
-            
-            # Remove completely empty rows and columns
-            self.df = self.df.dropna(how='all').dropna(axis=1, how='all')
-            
-            # Convert data types intelligently
-            for col in self.df.columns:
-                self.df[col] = self.df[col].apply(self.smart_convert_value)
-            
-            self.status_updated.emit(f"Data cleaned: {len(self.df)} rows, {len(self.df.columns)} columns")
-            
-        except Exception as e:
-            raise Exception(f"Data cleaning error: {str(e)}")
+    def loads(self, s, **kwargs):
+        return serializer.loads(s)
     
-    def clean_column_name(self, name):
-        """Clean column names for API compatibility"""
-        # Convert to string and strip whitespace
-        name = str(name).strip()
-        
-        # Replace spaces and special characters with underscores
-        name = re.sub(r'[^\w]', '_', name)
-        
-        # Remove multiple consecutive underscores
-        name = re.sub(r'_+', '_', name)
-        
-        # Remove leading/trailing underscores
-        name = name.strip('_')
-        
-        # Ensure it doesn't start with a number
-        if name and name[0].isdigit():
-            name = 'col_' + name
-        
-        # Handle empty names
-        if not name:
-            name = 'unnamed_column'
-        
-        return name.lower()
+    mimetype = 'application/json'
     
-    def smart_convert_value(self, value):
-        """Intelligently convert values to appropriate types"""
-        if pd.isna(value):
-            return None
-        
-        # Convert to string first
-        str_value = str(value).strip()
-        
-        if not str_value:
-            return None
-        
-        # Boolean conversion
-        if str_value.lower() in ['true', 'yes', '1', 'on', 'y']:
-            return True
-        elif str_value.lower() in ['false', 'no', '0', 'off', 'n']:
-            return False
-        
-        # Numeric conversion
-        try:
-            # Try integer first
-            if '.' not in str_value and 'e' not in str_value.lower():
-                return int(float(str_value))
-            else:
-                return float(str_value)
-        except (ValueError, OverflowError):
-            pass
-        
-        # Date conversion attempts
-        date_patterns = [
-            r'\d{4}-\d{2}-\d{2}',  # YYYY-MM-DD
-            r'\d{2}/\d{2}/\d{4}',  # MM/DD/YYYY
-            r'\d{2}-\d{2}-\d{4}',  # MM-DD-YYYY
-        ]
-        
-        for pattern in date_patterns:
-            if re.match(pattern, str_value):
-                try:
-                    pd.to_datetime(str_value)
-                    return str_value  # Keep as string for JSON compatibility
-                except:
-                    pass
-        
-        return str_value
-    
-    def generate_json_api(self):
-        """Generate comprehensive JSON API structure"""
-        try:
-            self.status_updated.emit("Generating JSON API...")
-            
-            # Convert DataFrame to records
-            records = self.df.to_dict('records')
-            
-            # Generate field information
-            fields_info = {}
-            for col in self.df.columns:
-                sample_values = self.df[col].dropna().head(5).tolist()
-                data_types = list(set([type(val).__name__ for val in sample_values if val is not None]))
-                
-                fields_info[col] = {
-                    "type": data_types[0] if len(data_types) == 1 else "mixed",
-                    "sample_values": sample_values[:3],
-                    "null_count": int(self.df[col].isna().sum()),
-                    "unique_count": int(self.df[col].nunique())
-                }
-            
-            # Generate API structure
-            api_structure = {
-                "api_info": {
-                    "version": "1.0",
-                    "title": f"{os.path.splitext(os.path.basename(self.file_path))[0]} API",
-                    "description": f"Generated JSON API from {os.path.splitext(self.file_path)[1]} file",
-                    "generated_at": datetime.now().isoformat(),
-                    "source_file": os.path.basename(self.file_path)
-                },
-                "metadata": {
-                    "total_records": len(records),
-                    "total_fields": len(self.df.columns),
-                    "fields": list(self.df.columns),
-                    "fields_info": fields_info,
-                    "data_quality": {
-                        "empty_rows_removed": 0,  # Could track this
-                        "duplicate_rows": int(self.df.duplicated().sum()),
-                        "completeness_score": round((1 - self.df.isna().sum().sum() / (len(self.df) * len(self.df.columns))) * 100, 2)
-                    }
-                },
-                "endpoints": {
-                    "get_all": "/api/data",
-                    "get_by_id": "/api/data/{id}",
-                    "search": "/api/data/search?q={query}",
-                    "filter": "/api/data/filter?field={field}&value={value}",
-                    "paginate": "/api/data?page={page}&limit={limit}",
-                    "fields": "/api/fields",
-                    "stats": "/api/stats"
-                },
-                "data": records[:self.config.get('preview_limit', 1000)] if self.config.get('preview_only', False) else records
-            }
-            
-            return api_structure
-            
-        except Exception as e:
-            raise Exception(f"JSON API generation error: {str(e)}")
+    def response(self, *args, **kwargs):
+        # Same argument rules as jsonify: one value, several values (a list) or keyword arguments
+        if args and kwargs:
+            raise TypeError("jsonify() behavior undefined when passed both args and kwargs")
+        if len(args) == 1:
+            obj = args[0]
+        else:
+            obj = args or kwargs or None
+        return self._app.response_class(self.dumps(obj, indent=2 if wants_pretty() else None) + '\n',
+                                        mimetype=self.mimetype)
+
+
+def wants_pretty():
+    return has_request_context() and bool(request.args.get('pretty', type=int))
 
 
 class FlaskAPIServer:
-    def __init__(self):
+    def __init__(self, cache_bytes=DEFAULT_CACHE_BYTES, memory_budget=DEFAULT_MEMORY_BUDGET, job_workers=JOB_WORKERS,
+                 job_roots=None):
         self.app = Flask(__name__)
+        self.app.json = SerializerJSONProvider(self.app)
         CORS(self.app)  # Enable CORS for React frontend
-        self.api_data = None
+        self.dataset = None  # the current Dataset version; replaced whole on every load
+        self.publish_lock = threading.Lock()  # serializes loads, never taken by requests
+        # Encoded /api/data pages; the load token keeps ETags unique across restarts
+        self.page_cache = PageCache(cache_bytes)
+        self.load_token = uuid.uuid4().hex[:8]
+        self.data_version = 0
+        # Named datasets served under /api/<name>/, evicted to snapshots beyond memory_budget
+        self.registry = DatasetRegistry(self.build_named_dataset, memory_budget)
+        # Uploads and /api/jobs conversions; job_roots are the directories path jobs may read
+        self.jobs = JobTracker(job_workers)
+        self.job_roots = list(job_roots or [])
+        self.upload_config = {}  # FileProcessor options for uploaded files (e.g. workers)
+        self.http_server = None
         self.setup_routes()
         
+    @property
+    def api_data(self):
+        return self.dataset.api_data if self.dataset is not None else None
+    
+    @property
+    def store(self):
+        return self.dataset.store if self.dataset is not None else None
+    
     def setup_routes(self):
         @self.app.route('/api/status', methods=['GET'])
         def health_check():
             """Health check endpoint for React app"""
             return jsonify({
                 "status": "healthy",
-                "data_loaded": self.api_data is not None,
+                "data_loaded": self.dataset is not None,
                 "timestamp": datetime.now().isoformat()
             })
         
         @self.app.route('/api/data', methods=['GET'])
-        def get_all_data():
-            if not self.api_data:
+        @self.app.route('/api/sheets/<sheet>/data', methods=['GET'])
+        @self.app.route('/api/<name>/data', methods=['GET'])
+        def get_all_data(sheet=None, name=None):
+            dataset = self.resolve_dataset(sheet, name)
+            if dataset is None:
                 return jsonify({"error": "No data loaded"}), 404
             
             try:
                 page = request.args.get('page', 1, type=int)
                 limit = request.args.get('limit', 100, type=int)
+                sort_keys = parse_sort(request.args.get('sort'), dataset.store.field_names)
+                fields = parse_fields(request.args.get('fields'), dataset.store.field_names)
+                view = (sort_keys, fields) if sort_keys or fields else None
                 
-                data = self.api_data.get('data', [])
-                start = (page - 1) * limit
-                end = start + limit
+                if wants_pretty():
+                    # Indented pages are for reading and debugging, so they skip the cache
+                    body = self.encode_page(dataset, page, limit, sort_keys, fields)
+                    return self.app.response_class(serializer.dumps(serializer.loads(body), pretty=True),
+                                                   mimetype='application/json')
                 
-                return jsonify({
-                    "success": True,
-                    "data": data[start:end],
-                    "pagination": {
-                        "page": page,
-                        "limit": limit,
-                        "total": len(data),
-                        "pages": (len(data) + limit - 1) // limit,
-                        "has_next": end < len(data),
-                        "has_prev": page > 1
-                    },
-                    "metadata": self.api_data.get('metadata', {})
-                })
+                # Conditional requests are answered before anything is serialized
+                etag = dataset.etag(page, limit, view)
+                if request.if_none_match.contains_weak(etag):
+                    response = self.app.response_class(status=304)
+                    response.set_etag(etag)
+                    return response
+                
+                key = (dataset.load_token, dataset.version, dataset.sheet, page, limit, view)
+                body = self.page_cache.get(key)
+                if body is None:
+                    body = self.encode_page(dataset, page, limit, sort_keys, fields)
+                    self.page_cache.put(key, body)
+                
+                response = self.app.response_class(body, mimetype='application/json')
+                response.set_etag(etag)
+                return response
+            except SortError as e:
+                return jsonify({"success": False, "error": str(e)}), 400
             except Exception as e:
                 return jsonify({"success": False, "error": str(e)}), 500
         
         @self.app.route('/api/data/<int:record_id>', methods=['GET'])
-        def get_by_id(record_id):
-            if not self.api_data:
+        @self.app.route('/api/sheets/<sheet>/data/<int:record_id>', methods=['GET'])
+        @self.app.route('/api/<name>/data/<int:record_id>', methods=['GET'])
+        def get_by_id(record_id, sheet=None, name=None):
+            dataset = self.resolve_dataset(sheet, name)
+            if dataset is None:
                 return jsonify({"success": False, "error": "No data loaded"}), 404
             
             try:
-                data = self.api_data.get('data', [])
-                if 0 <= record_id < len(data):
+                if 0 <= record_id < len(dataset.store):
                     return jsonify({
                         "success": True,
-                        "data": data[record_id],
+                        "data": dataset.store.row(record_id),
                         "id": record_id
                     })
                 else:
@@ -377,8 +211,11 @@ class FlaskAPIServer:
                 return jsonify({"success": False, "error": str(e)}), 500
         
         @self.app.route('/api/data/search', methods=['GET'])
-        def search_data():
-            if not self.api_data:
+        @self.app.route('/api/sheets/<sheet>/data/search', methods=['GET'])
+        @self.app.route('/api/<name>/data/search', methods=['GET'])
+        def search_data(sheet=None, name=None):
+            dataset = self.resolve_dataset(sheet, name)
+            if dataset is None:
                 return jsonify({"success": False, "error": "No data loaded"}), 404
             
             try:
@@ -386,32 +223,84 @@ class FlaskAPIServer:
                 if not query:
                     return jsonify({"success": False, "error": "Query parameter 'q' is required"}), 400
                 
-                data = self.api_data.get('data', [])
-                results = []
+                matches = dataset.search_index.search(query)
+                total = len(matches)
                 
-                for idx, record in enumerate(data):
-                    for value in record.values():
-                        if value and query in str(value).lower():
-                            results.append({**record, "_id": idx})
-                            break
+                # Without page/limit every match is returned, as before
+                limit = request.args.get('limit', total, type=int)
+                page = request.args.get('page', 1, type=int)
+                start = (page - 1) * limit
+                end = start + limit
+                page_ids = matches[max(start, 0):end]
+                results = [{**record, "_id": int(idx)} for idx, record in zip(page_ids, dataset.store.rows(page_ids))]
                 
                 return jsonify({
                     "success": True,
                     "query": query,
                     "results": results,
-                    "count": len(results)
+                    "count": len(results),
+                    "pagination": {
+                        "page": page,
+                        "limit": limit,
+                        "total": total,
+                        "pages": (total + limit - 1) // limit if limit > 0 else 0,
+                        "has_next": end < total,
+                        "has_prev": page > 1
+                    }
+                })
+            except Exception as e:
+                return jsonify({"success": False, "error": str(e)}), 500
+        
+        @self.app.route('/api/data/filter', methods=['GET'])
+        @self.app.route('/api/sheets/<sheet>/data/filter', methods=['GET'])
+        @self.app.route('/api/<name>/data/filter', methods=['GET'])
+        def filter_data(sheet=None, name=None):
+            """Indexed filtering: ?field=city&value=Paris&field=amount&gt=10&lt=50"""
+            dataset = self.resolve_dataset(sheet, name)
+            if dataset is None:
+                return jsonify({"success": False, "error": "No data loaded"}), 404
+            
+            try:
+                conditions = parse_filter_args(request.query_string)
+                matches = dataset.filter_index.filter(conditions)
+                
+                page = request.args.get('page', 1, type=int)
+                limit = request.args.get('limit', 100, type=int)
+                total = len(matches)
+                start = (page - 1) * limit
+                end = start + limit
+                page_ids = matches[max(start, 0):end]
+                
+                return jsonify({
+                    "success": True,
+                    "filters": conditions,
+                    "data": [{**record, "_id": int(idx)} for idx, record in zip(page_ids, dataset.store.rows(page_ids))],
+                    "count": total,
+                    "pagination": {
+                        "page": page,
+                        "limit": limit,
+                        "total": total,
+                        "pages": (total + limit - 1) // limit if limit > 0 else 0,
+                        "has_next": end < total,
+                        "has_prev": page > 1
+                    }
                 })
+            except FilterError as e:
+                return jsonify({"success": False, "error": str(e)}), 400
             except Exception as e:
                 return jsonify({"success": False, "error": str(e)}), 500
         
         @self.app.route('/api/fields', methods=['GET'])
-        def get_fields():
+        @self.app.route('/api/sheets/<sheet>/fields', methods=['GET'])
+        @self.app.route('/api/<name>/fields', methods=['GET'])
+        def get_fields(sheet=None, name=None):
             """Return fields info compatible with React CSV context"""
-            if not self.api_data:
+            dataset = self.resolve_dataset(sheet, name)
+            if dataset is None:
                 return jsonify({"success": False, "error": "No data loaded"}), 404
             
             try:
-                metadata = self.api_data.get('metadata', {})
+                metadata = dataset.api_data.get('metadata', {})
                 fields_info = metadata.get('fields_info', {})
                 
                 # Format for React compatibility
@@ -423,8 +312,12 @@ class FlaskAPIServer:
                         "sample_values": field_data.get('sample_values', []),
                         "null_count": field_data.get('null_count', 0),
                         "unique_count": field_data.get('unique_count', 0),
+                        "encoding": field_data.get('encoding', 'plain'),
                         "description": f"{field_data.get('type', 'string')} field with {field_data.get('unique_count', 0)} unique values"
                     }
+                    # Numeric summaries and the error bounds of approximate statistics
+                    for key, value in field_data.items():
+                        formatted_fields[field_name].setdefault(key, value)
                 
                 return jsonify({
                     "success": True,
@@ -434,20 +327,23 @@ class FlaskAPIServer:
                     "metadata": {
                         "total_records": metadata.get('total_records', 0),
                         "data_quality": metadata.get('data_quality', {}),
-                        "source_file": self.api_data.get('api_info', {}).get('source_file', 'unknown')
+                        "source_file": dataset.api_data.get('api_info', {}).get('source_file', 'unknown')
                     }
                 })
             except Exception as e:
                 return jsonify({"success": False, "error": str(e)}), 500
         
         @self.app.route('/api/stats', methods=['GET'])
-        def get_stats():
-            if not self.api_data:
+        @self.app.route('/api/sheets/<sheet>/stats', methods=['GET'])
+        @self.app.route('/api/<name>/stats', methods=['GET'])
+        def get_stats(sheet=None, name=None):
+            dataset = self.resolve_dataset(sheet, name)
+            if dataset is None:
                 return jsonify({"success": False, "error": "No data loaded"}), 404
             
             try:
-                metadata = self.api_data.get('metadata', {})
-                api_info = self.api_data.get('api_info', {})
+                metadata = dataset.api_data.get('metadata', {})
+                api_info = dataset.api_data.get('api_info', {})
                 
                 return jsonify({
                     "success": True,
@@ -465,24 +361,23 @@ class FlaskAPIServer:
                 return jsonify({"success": False, "error": str(e)}), 500
         
         @self.app.route('/api/csv-format', methods=['GET'])
-        def get_csv_format():
+        @self.app.route('/api/sheets/<sheet>/csv-format', methods=['GET'])
+        @self.app.route('/api/<name>/csv-format', methods=['GET'])
+        def get_csv_format(sheet=None, name=None):
             """Return data in CSV-like format for React CSV context compatibility"""
-            if not self.api_data:
+            dataset = self.resolve_dataset(sheet, name)
+            if dataset is None:
                 return jsonify({"success": False, "error": "No data loaded"}), 404
             
             try:
-                data = self.api_data.get('data', [])
-                if not data:
+                if not len(dataset.store):
                     return jsonify({"success": False, "error": "No data available"}), 404
                 
-                # Get headers from first record
-                headers = list(data[0].keys()) if data else []
+                headers = list(dataset.store.field_names)
                 
                 # Convert to CSV-like array format
                 csv_array = [headers]  # First row is headers
-                for record in data:
-                    row = [str(record.get(header, '')) for header in headers]
-                    csv_array.append(row)
+                csv_array.extend(dataset.store.string_rows())
                 
                 return jsonify({
                     "success": True,
@@ -494,83 +389,491 @@ class FlaskAPIServer:
             except Exception as e:
                 return jsonify({"success": False, "error": str(e)}), 500
         
+        @self.app.route('/api/export.ndjson', methods=['GET'])
+        @self.app.route('/api/sheets/<sheet>/export.ndjson', methods=['GET'])
+        @self.app.route('/api/<name>/export.ndjson', methods=['GET'])
+        def export_ndjson(sheet=None, name=None):
+            """Stream every record as newline-delimited JSON"""
+            dataset = self.resolve_dataset(sheet, name)
+            if dataset is None:
+                return jsonify({"success": False, "error": "No data loaded"}), 404
+            return self.export_response(dataset, iter_ndjson(dataset.store), 'application/x-ndjson', 'ndjson')
+        
+        @self.app.route('/api/export.csv', methods=['GET'])
+        @self.app.route('/api/sheets/<sheet>/export.csv', methods=['GET'])
+        @self.app.route('/api/<name>/export.csv', methods=['GET'])
+        def export_csv(sheet=None, name=None):
+            """Stream every record as CSV"""
+            dataset = self.resolve_dataset(sheet, name)
+            if dataset is None:
+                return jsonify({"success": False, "error": "No data loaded"}), 404
+            return self.export_response(dataset, iter_csv(dataset.store), 'text/csv', 'csv')
+        
+        @self.app.route('/api/export.json', methods=['GET'])
+        @self.app.route('/api/sheets/<sheet>/export.json', methods=['GET'])
+        @self.app.route('/api/<name>/export.json', methods=['GET'])
+        def export_json(sheet=None, name=None):
+            """Stream the full API document (api_info, endpoints, data, metadata)"""
+            dataset = self.resolve_dataset(sheet, name)
+            if dataset is None:
+                return jsonify({"success": False, "error": "No data loaded"}), 404
+            header = {key: value for key, value in dataset.api_data.items() if key != 'metadata'}
+            body = iter_json_document(header, iter_batches(dataset.store), dataset.api_data.get('metadata', {}))
+            return self.export_response(dataset, body, 'application/json', 'json')
+        
+        @self.app.route('/api/sheets', methods=['GET'])
+        def list_sheets():
+            """Sheets of a multi-sheet workbook; each one is served under /api/sheets/<sheet>/"""
+            dataset = self.dataset
+            if dataset is None:
+                return jsonify({"success": False, "error": "No data loaded"}), 404
+            
+            sheets = []
+            for key, sheet in dataset.sheets.items():
+                api_info = sheet.api_data.get('api_info', {})
+                sheets.append({
+                    "sheet": key,
+                    "title": api_info.get('sheet_title', key),
+                    "records": len(sheet.store),
+                    "fields": len(sheet.store.field_names),
+                    "endpoints": sheet.api_data.get('endpoints', {})
+                })
+            return jsonify({"success": True, "sheets": sheets, "count": len(sheets)})
+        
+        @self.app.route('/api/datasets', methods=['GET'])
+        def list_datasets():
+            """Named datasets with their memory use and hit/miss counters"""
+            return jsonify({"success": True, **self.registry.stats()})
+        
+        @self.app.route('/api/datasets/<name>', methods=['DELETE'])
+        def delete_dataset(name):
+            if not self.registry.remove(name):
+                return jsonify({"success": False, "error": "Dataset not found"}), 404
+            return jsonify({"success": True, "message": f"Dataset '{name}' removed"})
+        
+        @self.app.route('/api/metrics', methods=['GET'])
+        def get_metrics():
+            """Prometheus text format: pipeline stage timings plus serving counters.
+            
+            Counters are per process; with prefork workers each one reports its own.
+            """
+            return Response(prometheus_text(profile_families() + self.metric_families()),
+                            mimetype='text/plain; version=0.0.4')
+        
         @self.app.route('/api/upload', methods=['POST'])
         def handle_csv_upload():
-            """Handle CSV upload from React frontend as fallback"""
+            """Process an uploaded CSV/Excel file with the same pipeline as the desktop app.
+            
+            Large uploads (or ?async=1) are processed in the background: the
+            response is 202 with a job id to poll at /api/upload/<job_id>.
+            ?dataset=<name> serves the file under /api/<name>/ instead of
+            replacing the main data; ?sheets=all (or sheet names) loads
+            several sheets of a workbook.
+            """
             try:
-                if 'file' not in request.files:
-                    return jsonify({"success": False, "error": "No file provided"}), 400
-                
-                file = request.files['file']
-                if file.filename == '':
-                    return jsonify({"success": False, "error": "No file selected"}), 400
+                file = self.uploaded_file()
+                name, config = self.job_options()
+                path = save_upload(file)
+                if request.args.get('async', type=int) or os.path.getsize(path) >= BACKGROUND_UPLOAD_BYTES:
+                    job = self.submit_job(file.filename, path, name, config, True)
+                    return jsonify({
+                        "success": True,
+                        "message": "File uploaded; processing in the background",
+                        **self.job_links(job)
+                    }), 202
                 
-                # Process uploaded CSV
-                if file.filename.lower().endswith('.csv'):
-                    # Read CSV data
-                    csv_content = file.read().decode('utf-8')
-                    lines = csv_content.strip().split('\n')
-                    csv_data = [line.split(',') for line in lines]
+                job = self.jobs.create(file.filename)
+                self.jobs.run(job, self.run_job, path, name, config, True)
+                if job.error:
+                    return jsonify({"success": False, "error": job.error}), 400
+                return jsonify({
+                    "success": True,
+                    "message": "File uploaded and processed successfully",
+                    **job.result
+                })
                     
-                    # Convert to API format
-                    if len(csv_data) > 1:
-                        headers = csv_data[0]
-                        records = []
-                        for row in csv_data[1:]:
-                            record = {}
-                            for i, header in enumerate(headers):
-                                record[header.strip()] = row[i].strip() if i < len(row) else ''
-                            records.append(record)
-                        
-                        # Create API structure
-                        api_structure = {
-                            "api_info": {
-                                "version": "1.0",
-                                "title": f"{file.filename} API",
-                                "description": f"Uploaded CSV file with {len(records)} records",
-                                "generated_at": datetime.now().isoformat(),
-                                "source_file": file.filename
-                            },
-                            "metadata": {
-                                "total_records": len(records),
-                                "total_fields": len(headers),
-                                "fields": headers,
-                                "fields_info": {}
-                            },
-                            "data": records
-                        }
-                        
-                        # Update server data
-                        self.api_data = api_structure
-                        
-                        return jsonify({
-                            "success": True,
-                            "message": "File uploaded and processed successfully",
-                            "records": len(records),
-                            "fields": len(headers)
-                        })
-                    else:
-                        return jsonify({"success": False, "error": "CSV file appears to be empty"}), 400
+            except QueueFull as e:
+                return jsonify({"success": False, "error": str(e)}), 503, {"Retry-After": "5"}
+            except ValueError as e:
+                return jsonify({"success": False, "error": str(e)}), 400
+            except Exception as e:
+                return jsonify({"success": False, "error": str(e)}), 500
+        
+        @self.app.route('/api/jobs', methods=['POST'])
+        def create_job():
+            """Queue a conversion of an uploaded file (multipart 'file') or of a server file ('path').
+            
+            Takes the same dataset and sheets options as /api/upload, as form
+            fields, query parameters or a JSON body. Answers 202 with the job
+            id; 503 when too many jobs are pending.
+            """
+            try:
+                name, config = self.job_options()
+                if 'file' in request.files:
+                    file = self.uploaded_file()
+                    job = self.submit_job(file.filename, save_upload(file), name, config, True)
                 else:
-                    return jsonify({"success": False, "error": "Only CSV files are supported for upload"}), 400
-                    
+                    options = request.get_json(silent=True) or request.values
+                    path = resolve_source_path(options.get('path'), self.job_roots)
+                    job = self.submit_job(os.path.basename(path), path, name, config, False)
+                return jsonify({"success": True, **self.job_links(job)}), 202
+            except QueueFull as e:
+                return jsonify({"success": False, "error": str(e)}), 503, {"Retry-After": "5"}
+            except PermissionError as e:
+                return jsonify({"success": False, "error": str(e)}), 403
+            except FileNotFoundError as e:
+                return jsonify({"success": False, "error": str(e)}), 404
+            except ValueError as e:
+                return jsonify({"success": False, "error": str(e)}), 400
             except Exception as e:
                 return jsonify({"success": False, "error": str(e)}), 500
+        
+        @self.app.route('/api/jobs', methods=['GET'])
+        def list_jobs():
+            return jsonify({
+                "success": True,
+                "jobs": self.jobs.list(),
+                "counts": self.jobs.counts(),
+                "workers": self.jobs.workers,
+                "max_pending": self.jobs.max_pending
+            })
+        
+        @self.app.route('/api/jobs/<job_id>', methods=['GET'])
+        @self.app.route('/api/upload/<job_id>', methods=['GET'])
+        def get_job(job_id):
+            """State and progress (0-100) of a background job"""
+            job = self.jobs.get(job_id)
+            if job is None:
+                return jsonify({"success": False, "error": "Job not found"}), 404
+            return jsonify({"success": True, **job.to_dict()})
+        
+        @self.app.route('/api/jobs/<job_id>', methods=['DELETE'])
+        def cancel_job(job_id):
+            """Cancel a job that is still queued"""
+            job = self.jobs.get(job_id)
+            if job is None:
+                return jsonify({"success": False, "error": "Job not found"}), 404
+            if not job.cancel():
+                return jsonify({"success": False, "error": f"Job is {job.state} and cannot be cancelled"}), 409
+            return jsonify({"success": True, **job.to_dict()})
+        
+        @self.app.route('/api/jobs/<job_id>/events', methods=['GET'])
+        def stream_job_events(job_id):
+            """Server-sent events of a job (state, progress, status, then done/failed).
+            
+            A reconnecting EventSource sends Last-Event-ID and resumes after it;
+            the stream closes once the job has finished.
+            """
+            job = self.jobs.get(job_id)
+            if job is None:
+                return jsonify({"success": False, "error": "Job not found"}), 404
+            after = request.headers.get('Last-Event-ID', 0, type=int)
+            
+            def events():
+                seen = after
+                while True:
+                    new_events, finished = job.wait_events(seen, SSE_KEEPALIVE_SECONDS)
+                    for event in new_events:
+                        yield f"id: {event['id']}\nevent: {event['event']}\ndata: {serializer.dumps_text(event['data'])}\n\n"
+                    seen += len(new_events)
+                    if finished and not new_events:
+                        return
+                    if not new_events:
+                        # Comment line, keeps proxies from closing an idle stream
+                        yield ": keep-alive\n\n"
+            
+            return Response(events(), mimetype='text/event-stream',
+                            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+    
+    def uploaded_file(self):
+        """The 'file' part of a multipart request; ValueError when it is missing or not CSV/Excel"""
+        if 'file' not in request.files:
+            raise ValueError("No file provided")
+        file = request.files['file']
+        if file.filename == '':
+            raise ValueError("No file selected")
+        if not file.filename.lower().endswith(UPLOAD_EXTENSIONS):
+            raise ValueError("Only CSV and Excel files are supported for upload")
+        return file
+    
+    def job_options(self):
+        """(dataset name or None, FileProcessor config) from the dataset and sheets request options"""
+        options = request.get_json(silent=True) or request.values
+        name = options.get('dataset')
+        if name is not None:
+            validate_name(name)
+        config = dict(self.upload_config)
+        if options.get('sheets'):
+            config['sheets'] = options.get('sheets')
+        return name, config
+    
+    def submit_job(self, job_name, path, name, config, upload):
+        try:
+            return self.jobs.submit(job_name, self.run_job, path, name, config, upload)
+        except QueueFull:
+            if upload:
+                os.remove(path)
+            raise
     
-    def update_data(self, api_data):
-        self.api_data = api_data
+    def job_links(self, job):
+        return {
+            "job_id": job.id,
+            "status_url": f"/api/jobs/{job.id}",
+            "events_url": f"/api/jobs/{job.id}/events"
+        }
     
-    def start_server(self, port=5000):
-        self.app.run(host='127.0.0.1', port=port, debug=False, use_reloader=False)
+    def run_job(self, job, path, name=None, config=None, upload=False):
+        """Process a file and serve it (as dataset name when given); errors are recorded on the job.
+        
+        An uploaded file is a temporary copy and is removed afterwards.
+        """
+        try:
+            if upload:
+                processor, api_data = process_upload(path, job.name, config,
+                                                     on_progress=job.set_progress, on_status=job.set_message)
+            else:
+                processor = FileProcessor(path, dict(config or {}, streaming=False, incremental=False),
+                                          on_progress=job.set_progress, on_status=job.set_message)
+                api_data = processor.process()
+            if name is None:
+                self.update_data(api_data, processor.df, processor.sheet_frames, processor.profile)
+            else:
+                self.add_dataset(name, api_data, processor.df, processor.sheet_frames, processor.profile)
+            metadata = api_data['metadata']
+            job.finish({
+                "records": metadata['total_records'],
+                "fields": metadata['total_fields'],
+                "data_quality": metadata.get('data_quality', {}),
+                "dataset": name
+            })
+        except Exception as e:
+            job.fail(str(e))
+        finally:
+            if upload:
+                os.remove(path)
+    
+    def update_data(self, api_data, df=None, sheet_frames=None, profile=None):
+        """Load a generated API structure, keeping its rows in a columnar store.
+        
+        The additional sheets of a multi-sheet workbook (api_data['sheets'])
+        get their own stores, from sheet_frames when the cleaned frames are given.
+        Building the store and indexes is measured into profile (the
+        FileProcessor's, so the server stages follow the pipeline's).
+        """
+        self.load_store(api_data, **self.prepare_data(api_data, df, sheet_frames, profile))
+    
+    def prepare_data(self, api_data, df=None, sheet_frames=None, profile=None):
+        """Store and indexes for update_data, as load_store keyword arguments.
+        
+        Nothing served changes, so this can run on a worker thread while the
+        current data is still being served.
+        """
+        profile = profile or Profile()
+        with profile.stage('store') as stage:
+            store = self.build_store(api_data, df)
+            stage.rows = len(store)
+        with profile.stage('indexes', len(store)):
+            search_index = SearchIndex(store)
+            filter_index = FilterIndex(store, api_data.get('metadata', {}).get('fields_info'))
+        sheets = {}
+        for key, sheet_api in api_data.get('sheets', {}).items():
+            sheets[key] = (sheet_api, self.build_store(sheet_api, (sheet_frames or {}).get(key)))
+        return {"store": store, "search_index": search_index, "filter_index": filter_index, "sheets": sheets}
+    
+    def add_dataset(self, name, api_data, df=None, sheet_frames=None, profile=None):
+        """Serve an API structure under /api/<name>/ without touching the main data.
+        
+        Additional workbook sheets become datasets of their own, named <name>.<sheet>.
+        """
+        profile = profile or Profile()
+        with profile.stage('store') as stage:
+            store = self.build_store(api_data, df)
+            stage.rows = len(store)
+        with profile.stage('indexes', len(store)):
+            search_index = SearchIndex(store)
+            filter_index = FilterIndex(store, api_data.get('metadata', {}).get('fields_info'))
+        self.registry.add(name, self.build_named_dataset(name, api_data, store, search_index, filter_index))
+        for key, sheet_api in api_data.get('sheets', {}).items():
+            sheet_name = f"{name}.{key}"
+            sheet_store = self.build_store(sheet_api, (sheet_frames or {}).get(key))
+            self.registry.add(sheet_name, self.build_named_dataset(sheet_name, sheet_api, sheet_store))
+    
+    def build_named_dataset(self, name, api_data, store, search_index=None, filter_index=None, load_token=None):
+        """Dataset of the registry; each one has its own load token (its snapshot id once saved)"""
+        search_index = search_index or SearchIndex(store)
+        filter_index = filter_index or FilterIndex(store, api_data.get('metadata', {}).get('fields_info'))
+        # Sheets of a named workbook are datasets of their own, not namespaces inside it
+        api_info = {key: value for key, value in api_data.get('api_info', {}).items() if key != 'sheet'}
+        endpoints = {key: re.sub(r'^/api/(sheets/[^/]+/)?', f'/api/{name}/', path)
+                     for key, path in api_data.get('endpoints', {}).items()}
+        return self.build_dataset(dict(api_data, api_info=api_info, endpoints=endpoints), store, search_index,
+                                  filter_index, version=1, load_token=load_token or uuid.uuid4().hex[:8])
+    
+    def metric_families(self):
+        """Serving counters for /api/metrics (see profiling.prometheus_text)"""
+        dataset = self.dataset
+        cache = self.page_cache.stats()
+        registry = self.registry.stats()
+        jobs = self.jobs.counts()
+        return [
+            ("data_version", "gauge", "Version of the main dataset (increments on every load)", [({}, self.data_version)]),
+            ("records", "gauge", "Records in the main dataset", [({}, len(dataset.store) if dataset is not None else 0)]),
+            ("dataset_bytes", "gauge", "Memory used by the main dataset's store and indexes",
+             [({}, dataset.nbytes if dataset is not None else 0)]),
+            ("page_cache_hits_total", "counter", "Encoded /api/data pages served from the cache", [({}, cache['hits'])]),
+            ("page_cache_misses_total", "counter", "Encoded /api/data pages built on request", [({}, cache['misses'])]),
+            ("page_cache_bytes", "gauge", "Bytes held by the page cache", [({}, cache['bytes'])]),
+            ("registry_used_bytes", "gauge", "Memory used by loaded named datasets", [({}, registry['used_bytes'])]),
+            ("registry_memory_budget_bytes", "gauge", "Memory budget of the named datasets", [({}, registry['memory_budget'])]),
+            ("registry_hits_total", "counter", "Requests for a named dataset that was in memory",
+             [({"dataset": entry['name']}, entry['hits']) for entry in registry['datasets']]),
+            ("registry_misses_total", "counter", "Requests for a named dataset that was loaded from its snapshot",
+             [({"dataset": entry['name']}, entry['misses']) for entry in registry['datasets']]),
+            ("registry_evictions_total", "counter", "Evictions of each named dataset",
+             [({"dataset": entry['name']}, entry['evictions']) for entry in registry['datasets']]),
+            ("jobs", "gauge", "Tracked jobs by state", [({"state": state}, count) for state, count in jobs.items()])
+        ]
+    
+    def build_store(self, api_data, df=None):
+        data = api_data.get('data', [])
+        if df is not None:
+            # Preview mode truncates the records, so the store is cut to match
+            return ColumnStore.from_dataframe(df.iloc[:len(data)])
+        return ColumnStore.from_records(data, api_data.get('metadata', {}).get('fields'))
+    
+    def load_store(self, api_data, store, load_token=None, search_index=None, filter_index=None, sheets=None):
+        """Serve an already built store; api_data supplies api_info, metadata and endpoints.
+        
+        Missing indexes are built before the swap, so requests keep using the
+        previous version until the new one is complete. A snapshot passes its
+        id as load_token so every worker serving it sends the same ETags, and
+        its saved indexes. sheets maps sheet keys to (api_data, store) pairs
+        served under /api/sheets/<key>/.
+        """
+        search_index = search_index or SearchIndex(store)
+        filter_index = filter_index or FilterIndex(store, api_data.get('metadata', {}).get('fields_info'))
+        sheets = {key: (sheet_api, sheet_store, SearchIndex(sheet_store),
+                        FilterIndex(sheet_store, sheet_api.get('metadata', {}).get('fields_info')))
+                  for key, (sheet_api, sheet_store) in (sheets or {}).items()}
+        with self.publish_lock:
+            if load_token:
+                self.load_token = load_token
+            self.publish(api_data, store, search_index, filter_index, sheets)
+    
+    def append_data(self, api_data, df):
+        """Serve rows appended to the loaded data (an incremental run) without reloading it.
+        
+        The new rows are added to the store and get their own search and filter
+        index segments; after MAX_SEGMENTS appends the indexes are rebuilt whole.
+        """
+        with self.publish_lock:
+            current = self.dataset
+            appended = api_data.get('appended') or {}
+            if current is None or appended.get('start_row') != len(current.store):
+                raise ValueError("Appended records do not continue the loaded data")
+            
+            store, search_index, filter_index = current.store, current.search_index, current.filter_index
+            if len(df):
+                start = len(store)
+                tail = ColumnStore.from_dataframe(df)
+                store = store.appended(tail)
+                if segment_count(search_index) >= MAX_SEGMENTS:
+                    search_index = SearchIndex(store)
+                    filter_index = FilterIndex(store, api_data.get('metadata', {}).get('fields_info'))
+                else:
+                    search_index = SegmentedSearchIndex.extend(search_index, SearchIndex(tail), start)
+                    filter_index = SegmentedFilterIndex.extend(filter_index, FilterIndex(tail), start)
+            self.publish(api_data, store, search_index, filter_index)
+    
+    def publish(self, api_data, store, search_index, filter_index, sheets=None):
+        """Swap in a new Dataset version (callers hold publish_lock)"""
+        self.data_version += 1
+        dataset = self.build_dataset(api_data, store, search_index, filter_index)
+        if dataset.sheet is not None:
+            # The sheet loaded as the main data is reachable under its own key as well
+            dataset.sheets[dataset.sheet] = dataset
+        for key, (sheet_api, sheet_store, sheet_search, sheet_filter) in (sheets or {}).items():
+            dataset.sheets[key] = self.build_dataset(sheet_api, sheet_store, sheet_search, sheet_filter)
+        # A single reference assignment: requests see either the old or the new version whole
+        self.dataset = dataset
+        # Pages of older versions can no longer be requested
+        self.page_cache.clear()
+    
+    def build_dataset(self, api_data, store, search_index, filter_index, version=None, load_token=None):
+        api_data = {key: value for key, value in api_data.items() if key not in ('data', 'appended', 'sheets')}
+        # Serialized once per load and spliced into every /api/data page
+        metadata_json = serializer.dumps(api_data.get('metadata', {}), sort_keys=True)
+        return Dataset(api_data, store, search_index, filter_index, metadata_json,
+                       version or self.data_version, load_token or self.load_token,
+                       api_data.get('api_info', {}).get('sheet'))
+    
+    def resolve_dataset(self, sheet=None, name=None):
+        """The current Dataset, one of its sheets or a named dataset; None when there is no such data"""
+        dataset = self.dataset if name is None else self.registry.get(name)
+        if dataset is None or sheet is None:
+            return dataset
+        return dataset.sheets.get(sheet)
+    
+    def export_response(self, dataset, chunks, mimetype, extension):
+        """Chunked download; records are serialized batch by batch as the client reads"""
+        source = dataset.api_data.get('api_info', {}).get('source_file', 'data')
+        filename = f"{os.path.splitext(source)[0]}.{extension}"
+        return Response((chunk.encode('utf-8') for chunk in chunks), mimetype=mimetype,
+                        headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+    
+    def encode_page(self, dataset, page, limit, sort_keys=(), fields=None):
+        """Encode one /api/data page; same bytes jsonify would produce (sorted keys, compact).
+        
+        A sorted page slices the dataset's cached sort order, so only its
+        limit rows are read; fields leaves the other columns untouched.
+        """
+        store = dataset.store
+        total = len(store)
+        start = (page - 1) * limit
+        end = start + limit
+        pagination = {
+            "page": page,
+            "limit": limit,
+            "total": total,
+            "pages": (total + limit - 1) // limit,
+            "has_next": end < total,
+            "has_prev": page > 1
+        }
+        if sort_keys:
+            records = store.rows(dataset.sort_orders.order(sort_keys)[max(start, 0):max(end, 0)], fields)
+        else:
+            records = store.slice(start, end, fields)
+        return (b'{"data":' + serializer.dumps(records, sort_keys=True) +
+                b',"metadata":' + dataset.metadata_json +
+                b',"pagination":' + serializer.dumps(pagination, sort_keys=True) +
+                b',"success":true}\n')
+    
+    def start_server(self, port=5000, host='127.0.0.1'):
+        """Serve in a background threaded WSGI server; stop_server shuts it down"""
+        self.stop_server()
+        self.http_server = ThreadedServer(self.app, host, port)
+        self.http_server.start()
+    
+    def stop_server(self):
+        if self.http_server is not None:
+            self.http_server.stop()
+            self.http_server = None
 
 
 class DataToJSONAPIApp(QMainWindow):
+    # Emitted from the watcher thread; Qt delivers it on the GUI thread
+    source_changed = pyqtSignal(str)
+    
     def __init__(self):
         super().__init__()
         self.file_path = None
         self.generated_api = None
+        self.incremental_state = None  # carried between incremental runs
+        self.processor = None
+        self.file_watcher = None
+        self.watch_reload = False  # the running job was started by the watcher
         self.flask_server = FlaskAPIServer()
-        self.server_thread = None
+        self.source_changed.connect(self.on_source_changed)
         self.init_ui()
         
     def init_ui(self):
@@ -599,6 +902,9 @@ class DataToJSONAPIApp(QMainWindow):
         # Preview tab
         self.setup_preview_tab()
         
+        # Stage timings tab
+        self.setup_profile_tab()
+        
         # Flask server tab
         self.setup_server_tab()
         
@@ -647,6 +953,43 @@ class DataToJSONAPIApp(QMainWindow):
         self.preview_limit.setValue(1000)
         config_layout.addWidget(self.preview_limit, 0, 2)
         
+        self.streaming_checkbox = QCheckBox("Streaming mode (large files, writes directly to a JSON/NDJSON file)")
+        config_layout.addWidget(self.streaming_checkbox, 1, 0)
+        
+        config_layout.addWidget(QLabel("Chunk Size:"), 1, 1)
+        self.chunk_size = QSpinBox()
+        self.chunk_size.setRange(1000, 1000000)
+        self.chunk_size.setSingleStep(10000)
+        self.chunk_size.setValue(DEFAULT_CHUNK_SIZE)
+        config_layout.addWidget(self.chunk_size, 1, 2)
+        
+        config_layout.addWidget(QLabel("Worker Processes:"), 2, 1)
+        self.worker_count = QSpinBox()
+        self.worker_count.setRange(0, 256)
+        self.worker_count.setValue(1)
+        self.worker_count.setSpecialValueText("All cores")
+        self.worker_count.setToolTip("Clean columns and compute statistics in parallel (1 = single process)")
+        config_layout.addWidget(self.worker_count, 2, 2)
+        
+        self.incremental_checkbox = QCheckBox("Incremental (only process rows appended since the last run)")
+        self.incremental_checkbox.setToolTip("For CSV files that grow at the end; the server picks up new rows without a reload")
+        config_layout.addWidget(self.incremental_checkbox, 2, 0)
+        
+        self.sheets_checkbox = QCheckBox("All Excel sheets (each served under /api/sheets/<sheet>/)")
+        self.sheets_checkbox.setToolTip("Sheets are read in parallel when more than one worker process is set")
+        config_layout.addWidget(self.sheets_checkbox, 3, 0)
+        
+        config_layout.addWidget(QLabel("Statistics:"), 3, 1)
+        self.statistics_mode = QComboBox()
+        self.statistics_mode.addItems([mode.capitalize() for mode in STATISTICS_MODES])
+        self.statistics_mode.setToolTip("Approximate uses mergeable sketches (distinct counts, samples, quantiles) "
+                                        "whose memory does not grow with the rows; Auto switches to them for very large files")
+        config_layout.addWidget(self.statistics_mode, 3, 2)
+        
+        self.profile_checkbox = QCheckBox("Capture profile (cProfile and tracemalloc reports next to the file)")
+        self.profile_checkbox.setToolTip("Writes <file>_profile.prof and <file>_profile.memory.txt; processing runs slower while capturing")
+        config_layout.addWidget(self.profile_checkbox, 4, 0)
+        
         layout.addWidget(config_group)
         
         # Process button
@@ -681,10 +1024,20 @@ class DataToJSONAPIApp(QMainWindow):
         output_group = QGroupBox("Generated JSON API")
         output_layout = QVBoxLayout(output_group)
         
-        self.output_text = QTextEdit()
-        self.output_text.setFont(QFont("Consolas", 10))
-        self.output_text.setReadOnly(True)
-        output_layout.addWidget(self.output_text)
+        # Lines are formatted as they scroll into view, so large outputs never block the GUI
+        self.output_model = JsonLinesModel(self)
+        # A one-column table: with fixed row heights it never lays out rows it does not show
+        self.output_view = QTableView()
+        self.output_view.setModel(self.output_model)
+        self.output_view.setFont(QFont("Consolas", 10))
+        self.output_view.setShowGrid(False)
+        self.output_view.setWordWrap(False)
+        self.output_view.horizontalHeader().hide()
+        self.output_view.horizontalHeader().setStretchLastSection(True)
+        self.output_view.verticalHeader().hide()
+        self.output_view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.output_view.verticalHeader().setDefaultSectionSize(QFontMetrics(self.output_view.font()).height() + 2)
+        output_layout.addWidget(self.output_view)
         
         # Action buttons
         action_layout = QHBoxLayout()
@@ -712,14 +1065,34 @@ class DataToJSONAPIApp(QMainWindow):
         preview_tab = QWidget()
         layout = QVBoxLayout(preview_tab)
         
-        layout.addWidget(QLabel("Data Preview (First 10 rows)"))
+        self.preview_label = QLabel("Data Preview")
+        layout.addWidget(self.preview_label)
         
-        self.preview_table = QTableWidget()
+        # Backed by the served store; cells are read only for the rows on screen
+        self.preview_model = RecordTableModel(self)
+        self.preview_table = QTableView()
+        self.preview_table.setModel(self.preview_model)
         self.preview_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.preview_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
         layout.addWidget(self.preview_table)
         
         self.tab_widget.addTab(preview_tab, "Preview")
         
+    def setup_profile_tab(self):
+        profile_tab = QWidget()
+        layout = QVBoxLayout(profile_tab)
+        
+        self.profile_label = QLabel("Stage timings of the last run")
+        layout.addWidget(self.profile_label)
+        
+        self.profile_table = QTableWidget()
+        self.profile_table.setColumnCount(6)
+        self.profile_table.setHorizontalHeaderLabels(["Stage", "Wall (s)", "CPU (s)", "Peak memory (MB)", "Rows", "Rows/s"])
+        self.profile_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        layout.addWidget(self.profile_table)
+        
+        self.tab_widget.addTab(profile_tab, "Performance")
+        
     def setup_server_tab(self):
         server_tab = QWidget()
         layout = QVBoxLayout(server_tab)
@@ -742,6 +1115,11 @@ class DataToJSONAPIApp(QMainWindow):
         self.stop_server_btn.setEnabled(False)
         server_layout.addWidget(self.stop_server_btn, 0, 3)
         
+        self.watch_checkbox = QCheckBox("Reload when the source file changes")
+        self.watch_checkbox.setToolTip("Re-runs the pipeline in the background and swaps the served data; requests in flight finish on the old data")
+        self.watch_checkbox.toggled.connect(self.toggle_watch)
+        server_layout.addWidget(self.watch_checkbox, 1, 0, 1, 4)
+        
         layout.addWidget(server_group)
         
         # API endpoints info
@@ -782,6 +1160,8 @@ class DataToJSONAPIApp(QMainWindow):
             self.file_label.setText(filename)
             self.process_btn.setEnabled(True)
             self.statusBar().showMessage(f"File selected: {filename}")
+            if self.watch_checkbox.isChecked():
+                self.toggle_watch(True)
             
     def process_file(self):
         if not self.file_path:
@@ -789,9 +1169,30 @@ class DataToJSONAPIApp(QMainWindow):
         
         config = {
             'preview_only': self.preview_checkbox.isChecked(),
-            'preview_limit': self.preview_limit.value()
+            'preview_limit': self.preview_limit.value(),
+            'streaming': self.streaming_checkbox.isChecked(),
+            'chunk_size': self.chunk_size.value(),
+            'workers': self.worker_count.value(),
+            'incremental': self.incremental_checkbox.isChecked(),
+            'sheets': 'all' if self.sheets_checkbox.isChecked() else None,
+            'statistics': STATISTICS_MODES[self.statistics_mode.currentIndex()],
+            'profile_path': f"{os.path.splitext(self.file_path)[0]}_profile.prof" if self.profile_checkbox.isChecked() else None,
+            # A state is only valid while the records it continues are still loaded
+            'incremental_state': self.incremental_state if self.generated_api else None
         }
         
+        if config['streaming']:
+            default_name = f"{os.path.splitext(os.path.basename(self.file_path))[0]}_api.json"
+            output_path, _ = QFileDialog.getSaveFileName(
+                self,
+                "Stream JSON API To",
+                default_name,
+                "JSON Files (*.json);;NDJSON Files (*.ndjson);;All Files (*)"
+            )
+            if not output_path:
+                return
+            config['output_path'] = output_path
+        
         # Show progress
         self.progress_bar.setVisible(True)
         self.progress_bar.setValue(0)
@@ -799,7 +1200,7 @@ class DataToJSONAPIApp(QMainWindow):
         self.status_label.setText("Starting processing...")
         
         # Start processing
-        self.processor = DataProcessor(self.file_path, config)
+        self.processor = DataProcessor(self.file_path, config, self.flask_server)
         self.processor.progress_updated.connect(self.update_progress)
         self.processor.status_updated.connect(self.update_status)
         self.processor.preview_ready.connect(self.setup_preview_table)
@@ -815,21 +1216,25 @@ class DataToJSONAPIApp(QMainWindow):
         self.statusBar().showMessage(message)
         
     def setup_preview_table(self, headers, data):
-        self.preview_table.setColumnCount(len(headers))
-        self.preview_table.setRowCount(len(data))
-        self.preview_table.setHorizontalHeaderLabels(headers)
-        
-        for row_idx, row_data in enumerate(data):
-            for col_idx, cell_data in enumerate(row_data):
-                item = QTableWidgetItem(str(cell_data))
-                self.preview_table.setItem(row_idx, col_idx, item)
+        # The first rows while processing; replaced by the whole store once it is loaded
+        self.preview_model.set_rows(headers, data)
+        self.preview_label.setText(f"Data Preview (first {len(data)} rows)")
                 
     def on_processing_finished(self, api_data):
+        self.incremental_state = self.processor.core.incremental_state
+        appended = api_data.get('appended')
+        if appended:
+            # Incremental runs only return the new records; keep the ones already generated
+            records = self.generated_api['data']
+            records.extend(api_data['data'])
+            api_data = {key: value for key, value in api_data.items() if key != 'appended'}
+            api_data['data'] = records
         self.generated_api = api_data
         
         # Display JSON
-        json_text = json.dumps(api_data, indent=2, ensure_ascii=False)
-        self.output_text.setPlainText(json_text)
+        profile = self.processor.core.profile
+        with profile.stage('output_view', api_data['metadata']['total_records']):
+            self.output_model.set_document(api_data)
         
         # Enable buttons
         self.copy_btn.setEnabled(True)
@@ -840,27 +1245,88 @@ class DataToJSONAPIApp(QMainWindow):
         # Hide progress
         self.progress_bar.setVisible(False)
         
-        # Update Flask server data
-        self.flask_server.update_data(api_data)
+        # Update Flask server data (the cleaned DataFrame feeds the columnar store directly)
+        if appended and self.flask_server.store is not None and len(self.flask_server.store) == appended['start_row']:
+            self.flask_server.append_data(dict(api_data, appended=appended), self.processor.df)
+        elif appended:
+            self.flask_server.update_data(api_data, profile=profile)
+        else:
+            self.flask_server.load_store(api_data, **self.processor.prepared)
+        self.preview_model.set_store(self.flask_server.store)
+        self.preview_label.setText(f"Data Preview ({len(self.flask_server.store):,} rows)")
+        self.show_profile(profile)
         
         # Update endpoints display
         self.update_endpoints_display()
         
-        # Success message
         record_count = api_data['metadata']['total_records']
+        if self.watch_reload:
+            # Background reloads only leave a log line
+            self.watch_reload = False
+            self.log_server(f"Reloaded {os.path.basename(self.file_path)}: {record_count} records (version {self.flask_server.data_version})")
+            return
+        
+        # Success message
         QMessageBox.information(self, "Success", 
                               f"JSON API generated successfully!\n"
                               f"Records: {record_count}\n"
                               f"Fields: {api_data['metadata']['total_fields']}")
         
+    def show_profile(self, profile):
+        """Fill the Performance tab: one row per stage, then each column conversion"""
+        rows = profile.stages + profile.columns
+        self.profile_table.setRowCount(len(rows))
+        for row_idx, metrics in enumerate(rows):
+            name = metrics.name if row_idx < len(profile.stages) else f"    column {metrics.name}"
+            peak = metrics.peak_memory_bytes
+            rate = metrics.rows_per_second
+            cells = [name, f"{metrics.wall_seconds:.3f}", f"{metrics.cpu_seconds:.3f}",
+                     f"{peak / 1e6:.1f}" if peak is not None else "",
+                     f"{metrics.rows:,}" if metrics.rows is not None else "",
+                     f"{rate:,.0f}" if rate is not None else ""]
+            for col_idx, text in enumerate(cells):
+                self.profile_table.setItem(row_idx, col_idx, QTableWidgetItem(text))
+        self.profile_label.setText(f"Stage timings of {profile.source}: {profile.wall_seconds:.2f}s in total")
+        
     def on_error(self, error_message):
         self.progress_bar.setVisible(False)
         self.process_btn.setEnabled(True)
         self.status_label.setText("Error occurred")
         
+        if self.watch_reload:
+            self.watch_reload = False
+            self.log_server(f"Reload failed, still serving the previous data: {error_message}")
+            return
+        
         QMessageBox.critical(self, "Processing Error", 
                            f"An error occurred:\n\n{error_message}")
         
+    def toggle_watch(self, checked):
+        if self.file_watcher is not None:
+            self.file_watcher.stop()
+            self.file_watcher = None
+        if checked and self.file_path:
+            self.file_watcher = FileWatcher(self.file_path, self.source_changed.emit)
+            self.file_watcher.start()
+            self.log_server(f"Watching {os.path.basename(self.file_path)} for changes")
+    
+    def on_source_changed(self, path):
+        if path != self.file_path:
+            return
+        if self.processor is not None and self.processor.isRunning():
+            # Try again once the current run is done
+            QTimer.singleShot(1000, lambda: self.on_source_changed(path))
+            return
+        if self.streaming_checkbox.isChecked():
+            self.log_server("Source changed; streaming mode output is not reloaded automatically")
+            return
+        self.log_server(f"{os.path.basename(path)} changed, re-processing in the background")
+        self.watch_reload = True
+        self.process_file()
+    
+    def log_server(self, message):
+        self.server_logs.append(f"[{datetime.now().strftime('%H:%M:%S')}] {message}")
+    
     def update_endpoints_display(self):
         if not self.generated_api:
             return
@@ -872,13 +1338,23 @@ class DataToJSONAPIApp(QMainWindow):
 
 Core Data Endpoints:
 GET {base_url}/api/status - Health check and server status
-GET {base_url}/api/data - Get all data (with pagination)
+GET {base_url}/api/data - Get all data (with pagination; sort=field,-field2 and fields=a,b,c)
 GET {base_url}/api/data/{{id}} - Get specific record by ID
-GET {base_url}/api/data/search?q={{query}} - Search data
+GET {base_url}/api/data/search?q={{query}}&page=1&limit=50 - Search data (indexed, paginated)
+GET {base_url}/api/data/filter?field={{field}}&value={{value}} - Filter by field (also gt/gte/lt/lte/between, repeat field for AND)
 GET {base_url}/api/fields - Get field information (React compatible)
 GET {base_url}/api/stats - Get data statistics
 GET {base_url}/api/csv-format - Get data in CSV array format
-POST {base_url}/api/upload - Upload CSV file as fallback
+GET {base_url}/api/export.ndjson - Stream all records as NDJSON
+GET {base_url}/api/export.csv - Stream all records as CSV
+GET {base_url}/api/export.json - Stream the full JSON document
+POST {base_url}/api/upload - Upload a CSV/Excel file (large files return a job id)
+GET {base_url}/api/upload/{{job_id}} - Progress of a background upload
+POST {base_url}/api/jobs - Queue a conversion of an upload or a server file (path)
+GET {base_url}/api/jobs/{{job_id}}/events - Job progress as server-sent events
+GET {base_url}/api/sheets - Sheets of a multi-sheet workbook
+GET {base_url}/api/sheets/{{sheet}}/data - Any endpoint above for one sheet (search, filter, fields, ...)
+GET {base_url}/api/datasets - Named datasets (upload with ?dataset=name), served under /api/{{name}}/data etc.
 
 React Integration Examples:
 fetch('{base_url}/api/fields')
@@ -893,11 +1369,7 @@ CORS enabled for React frontend development.
         try:
             port = int(self.port_input.text())
             
-            def run_server():
-                self.flask_server.start_server(port)
-            
-            self.server_thread = threading.Thread(target=run_server, daemon=True)
-            self.server_thread.start()
+            self.flask_server.start_server(port)
             
             self.start_server_btn.setEnabled(False)
             self.stop_server_btn.setEnabled(True)
@@ -915,16 +1387,19 @@ CORS enabled for React frontend development.
             QMessageBox.critical(self, "Server Error", f"Failed to start server: {str(e)}")
             
     def stop_flask_server(self):
-        # Note: Flask development server doesn't have a clean shutdown method
-        # In production, you'd use a proper WSGI server
-        self.start_server_btn.setEnabled(True)
-        self.stop_server_btn.setEnabled(False)
-        self.server_logs.append(f"[{datetime.now().strftime('%H:%M:%S')}] Server stop requested")
+        try:
+            # Waits for in-flight requests, then releases the port
+            self.flask_server.stop_server()
+            self.start_server_btn.setEnabled(True)
+            self.stop_server_btn.setEnabled(False)
+            self.server_logs.append(f"[{datetime.now().strftime('%H:%M:%S')}] Server stopped")
+        except Exception as e:
+            QMessageBox.critical(self, "Server Error", f"Failed to stop server: {str(e)}")
         
     def copy_to_clipboard(self):
         if self.generated_api:
             clipboard = QApplication.clipboard()
-            json_text = json.dumps(self.generated_api, indent=2, ensure_ascii=False)
+            json_text = serializer.dumps_text(self.generated_api, pretty=True)
             clipboard.setText(json_text)
             QMessageBox.information(self, "Copied", "JSON API copied to clipboard!")
             
@@ -937,41 +1412,44 @@ CORS enabled for React frontend development.
             self,
             "Save JSON API",
             default_name,
-            "JSON Files (*.json);;All Files (*)"
+            "JSON Files (*.json);;NDJSON Files (*.ndjson);;All Files (*)"
         )
         
         if file_path:
             try:
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump(self.generated_api, f, indent=2, ensure_ascii=False)
+                # Records are written batch by batch instead of encoding one big string
+                write_api_file(self.generated_api, file_path)
                 QMessageBox.information(self, "Saved", f"JSON API saved to:\n{file_path}")
                 self.statusBar().showMessage(f"JSON API saved to {os.path.basename(file_path)}")
             except Exception as e:
                 QMessageBox.critical(self, "Save Error", f"Failed to save file:\n{str(e)}")
                 
     def clear_output(self):
-        self.output_text.clear()
+        self.output_model.clear()
         self.generated_api = None
+        self.incremental_state = None
         self.copy_btn.setEnabled(False)
         self.save_btn.setEnabled(False)
         self.start_server_btn.setEnabled(False)
-        self.preview_table.clear()
-        self.preview_table.setRowCount(0)
-        self.preview_table.setColumnCount(0)
+        self.preview_model.clear()
+        self.preview_label.setText("Data Preview")
         self.statusBar().showMessage("Output cleared - Ready for new processing")
         
     def closeEvent(self, event):
         """Handle application close event"""
-        if self.server_thread and self.server_thread.is_alive():
+        if self.flask_server.http_server is not None:
             reply = QMessageBox.question(self, 'Close Application', 
                                        'Flask server is running. Close anyway?',
                                        QMessageBox.Yes | QMessageBox.No, 
                                        QMessageBox.No)
             if reply == QMessageBox.Yes:
+                self.toggle_watch(False)
+                self.flask_server.stop_server()
                 event.accept()
             else:
                 event.ignore()
         else:
+            self.toggle_watch(False)
             event.accept()
 
 
@@ -0,0 +1,60 @@
+"""Compare vectorized column inference against the per-cell smart_convert_value path.
+
+Usage: python benchmarks/bench_inference.py [rows]
+"""
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inference import infer_frame, smart_convert_value
+
+
+def make_frame(rows, seed=0):
+    """Synthetic export with the column shapes we usually see"""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range('2020-01-01', periods=365).strftime('%Y-%m-%d').to_numpy()
+    return pd.DataFrame({
+        'id': np.arange(rows),
+        'amount': rng.normal(100, 25, rows).round(2),
+        'quantity': rng.integers(0, 50, rows).astype(str),
+        'active': rng.choice(['yes', 'no', 'Y', 'N', ''], rows),
+        'created': rng.choice(dates, rows),
+        'category': rng.choice(['alpha', 'beta', 'gamma', 'delta'], rows),
+        'ratio': rng.choice(['0.5', '1e-3', '', '2.25', 'n/a'], rows),
+    })
+
+
+def legacy_clean(df):
+    df = df.copy()
+    for col in df.columns:
+        df[col] = df[col].apply(smart_convert_value)
+    return df
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    df = make_frame(rows)
+    print(f"Rows: {rows:,}  Columns: {len(df.columns)}")
+
+    legacy, legacy_time = timed(legacy_clean, df)
+    (vectorized, column_types), vectorized_time = timed(infer_frame, df.copy())
+
+    print(f"per-cell apply : {legacy_time:8.3f}s  ({rows / legacy_time:,.0f} rows/s)")
+    print(f"vectorized     : {vectorized_time:8.3f}s  ({rows / vectorized_time:,.0f} rows/s)")
+    print(f"speedup        : {legacy_time / vectorized_time:8.1f}x")
+    print(f"identical      : {legacy.equals(vectorized)}")
+    print(f"column types   : {column_types}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Encoding time of each JSON backend for the payloads the API and exports produce.
+
+Usage: python benchmarks/bench_json.py [--rows 100000] [--page 100] [--repeat 5]
+
+The records come from a synthetic 'mixed' dataset (datasets.make_frame)
+cleaned by infer_frame and served from a ColumnStore, like a loaded file.
+Each installed backend of serializer.py encodes an /api/data page, the
+whole record list (compact and pretty), the metadata and a float64 NumPy
+column; json.dumps as the routes called it before is the reference.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from datasets import DatasetSpec, make_frame
+from inference import infer_frame
+from sketches import column_statistics
+from store import ColumnStore
+from serializer import available_backends, get_serializer
+
+
+def best_time(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def stdlib_reference(value, pretty=False):
+    if pretty:
+        return json.dumps(value, indent=2, ensure_ascii=False, default=str).encode('utf-8')
+    return json.dumps(value, ensure_ascii=False, default=str).encode('utf-8')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--page', type=int, default=100, help="rows of the /api/data page")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    df, _ = infer_frame(make_frame(DatasetSpec(args.rows, 8, 'mixed')))
+    store = ColumnStore.from_dataframe(df)
+    records = store.slice(0, len(store))
+    middle = len(store) // 2
+    page = store.slice(middle, middle + args.page)
+    metadata = {"fields": list(df.columns), "fields_info": {col: column_statistics(df[col]) for col in df.columns}}
+    column = np.random.default_rng(0).normal(size=args.rows)
+
+    payloads = [
+        (f"page ({args.page} rows)", page, False, max(args.repeat * 100, 1)),
+        ("records", records, False, args.repeat),
+        ("records pretty", records, True, args.repeat),
+        ("metadata", metadata, False, max(args.repeat * 100, 1)),
+        ("float64 column", column, False, args.repeat),
+    ]
+    encoders = [("json.dumps (before)", stdlib_reference)]
+    for name in available_backends():
+        backend = get_serializer(name)
+        encoders.append((name, lambda value, pretty=False, backend=backend: backend.dumps(value, pretty, True)))
+
+    print(f"Rows: {args.rows:,}  Columns: {len(df.columns)}  Backends: {', '.join(available_backends())}")
+    print(f"{'payload':<22}" + ''.join(f"{name:>22}" for name, _ in encoders))
+    for label, value, pretty, repeat in payloads:
+        cells = []
+        for name, encode in encoders:
+            # The old encoder could not take arrays; it needed tolist() first
+            data = value.tolist() if name.startswith('json.dumps') and isinstance(value, np.ndarray) else value
+            seconds = best_time(lambda: encode(data, pretty), repeat)
+            size = len(encode(data, pretty))
+            cells.append(f"{seconds * 1000:>9.2f} ms {size / 2**20 / seconds if seconds else 0:>6.0f} MB/s")
+        print(f"{label:<22}" + ''.join(f"{cell:>22}" for cell in cells))
+
+
+if __name__ == "__main__":
+    main()
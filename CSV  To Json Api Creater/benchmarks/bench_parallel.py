@@ -0,0 +1,65 @@
+"""Sequential vs parallel cleaning and statistics on a wide frame.
+
+Usage: python benchmarks/bench_parallel.py [rows] [columns] [workers]
+"""
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inference import infer_frame
+from parallel import parallel_infer_frame, column_statistics
+
+
+def make_frame(rows, columns, seed=0):
+    """Raw columns as read_csv would return them: ints, floats with gaps, and text"""
+    rng = np.random.default_rng(seed)
+    words = np.array(['yes', 'no', ' 12 ', '3.5', 'abc', '2024-01-02', None, 'north', 'south'], dtype=object)
+    data = {}
+    for col in range(columns):
+        kind = col % 4
+        if kind == 0:
+            data[f'c{col}'] = rng.integers(0, 1000, rows)
+        elif kind == 1:
+            values = rng.normal(size=rows).round(3)
+            values[rng.random(rows) < 0.05] = np.nan
+            data[f'c{col}'] = values
+        elif kind == 2:
+            data[f'c{col}'] = rng.choice(words, rows)
+        else:
+            data[f'c{col}'] = np.char.add('id', rng.integers(0, rows, rows).astype(str)).astype(object)
+    return pd.DataFrame(data)
+
+
+def sequential(df):
+    df, column_types = infer_frame(df)
+    fields_info = {col: column_statistics(df[col]) for col in df.columns}
+    return df, column_types, {"fields_info": fields_info, "duplicate_rows": int(df.duplicated().sum())}
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    columns = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else (os.cpu_count() or 1)
+    df = make_frame(rows, columns)
+
+    start = time.perf_counter()
+    expected = sequential(df.copy())
+    sequential_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = parallel_infer_frame(df.copy(), workers)
+    parallel_time = time.perf_counter() - start
+
+    identical = (expected[0].equals(result[0]) and expected[1] == result[1] and
+                 (result[2] is None or result[2] == expected[2]))
+    print(f"{rows:,} rows x {columns} columns, {workers} workers")
+    print(f"sequential: {sequential_time:.2f}s")
+    print(f"parallel:   {parallel_time:.2f}s  ({sequential_time / parallel_time:.1f}x, identical: {identical})")
+
+
+if __name__ == '__main__':
+    main()
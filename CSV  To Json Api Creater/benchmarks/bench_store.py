@@ -0,0 +1,101 @@
+"""Memory and latency of the columnar store versus the previous list-of-dicts layout.
+
+Usage: python benchmarks/bench_store.py [rows]
+"""
+import os
+import sys
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inference import infer_frame
+from store import ColumnStore
+from search import SearchIndex
+
+
+def make_frame(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'id': np.arange(rows),
+        'name': rng.choice(['alice', 'bob', 'carol', 'dave', 'erin'], rows),
+        'city': rng.choice(['Paris', 'Rome', 'Berlin', 'Madrid', ''], rows),
+        'amount': rng.normal(100, 25, rows).round(2).astype(str),
+        'quantity': rng.integers(2, 500, rows).astype(str),
+        'active': rng.choice(['yes', 'no'], rows),
+        'created': rng.choice(pd.date_range('2020-01-01', periods=365).strftime('%Y-%m-%d'), rows),
+    })
+    return infer_frame(df)[0]
+
+
+def measure(build):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, elapsed
+
+
+def timed(func, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def legacy_search(records, query):
+    results = []
+    for idx, record in enumerate(records):
+        for value in record.values():
+            if value and query in str(value).lower():
+                results.append({**record, "_id": idx})
+                break
+    return results
+
+
+def legacy_csv(records):
+    headers = list(records[0].keys())
+    return [headers] + [[str(record.get(header, '')) for header in headers] for record in records]
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    df = make_frame(rows)
+    print(f"Rows: {rows:,}  Columns: {len(df.columns)}")
+
+    records, records_bytes, records_time = measure(lambda: df.to_dict('records'))
+    store, store_bytes, store_time = measure(lambda: ColumnStore.from_dataframe(df))
+    print(f"{'layout':<14}{'memory':>14}{'build':>10}")
+    print(f"{'list of dicts':<14}{records_bytes / 2**20:>11.1f} MB{records_time:>9.2f}s")
+    print(f"{'column store':<14}{store_bytes / 2**20:>11.1f} MB{store_time:>9.2f}s")
+    print(f"memory ratio  : {records_bytes / max(store_bytes, 1):.1f}x smaller")
+    print()
+
+    index, index_bytes, index_time = measure(lambda: SearchIndex(store))
+    print(f"search index  : {index_bytes / 2**20:.1f} MB, built in {index_time:.2f}s")
+    print()
+
+    middle = rows // 2
+    cases = [
+        ("page (100 rows)", lambda: records[middle:middle + 100], lambda: store.slice(middle, middle + 100)),
+        ("record by id", lambda: records[middle], lambda: store.row(middle)),
+        ("search 'rom'", lambda: legacy_search(records, 'rom'),
+         lambda: store.rows(store.search('rom'))),
+        ("indexed 'rom'", lambda: legacy_search(records, 'rom')[:50],
+         lambda: store.rows(index.search('rom')[:50])),
+        ("csv-format", lambda: legacy_csv(records), lambda: store.string_rows()),
+    ]
+    print(f"{'operation':<18}{'list of dicts':>16}{'column store':>16}")
+    for label, legacy, columnar in cases:
+        repeat = 1 if label == "csv-format" or label.startswith(("search", "indexed")) else 50
+        print(f"{label:<18}{timed(legacy, repeat) * 1000:>13.3f} ms{timed(columnar, repeat) * 1000:>13.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""Benchmark suite: pipeline stages and every API route on synthetic datasets.
+
+Usage:
+    python benchmarks/bench_suite.py --output results.json
+    python benchmarks/bench_suite.py --rows 200000 --baseline results.json --threshold 0.15
+    python benchmarks/bench_suite.py --quick --only mixed
+
+For each dataset (see datasets.default_specs: type mixes, encodings,
+delimiters, a wide frame and an Excel workbook) FileProcessor's
+load_csv_file / load_excel_file, clean_data and generate_json_api are
+timed on fresh processors, then every FlaskAPIServer route is requested
+through the Flask test client. Each result keeps the median, minimum
+and all run times. --baseline compares medians against a previous
+results file; the exit status is 1 when a benchmark got slower by more
+than --threshold (and by more than --min-delta seconds, so timer noise
+on very fast routes is not reported).
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import quote
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from datasets import DatasetSpec, default_specs, write_dataset
+from detection import clear_format_cache
+from processing import FileProcessor
+from Api import FlaskAPIServer
+
+
+RESULTS_VERSION = 1
+
+
+def timed_runs(func, repeat):
+    """[seconds] of repeat calls; func(run) is given the run number"""
+    times = []
+    for run in range(repeat):
+        started = time.perf_counter()
+        func(run)
+        times.append(time.perf_counter() - started)
+    return times
+
+
+def summary(times, rows=None):
+    median = statistics.median(times)
+    result = {"median": median, "min": min(times), "runs": times}
+    if rows:
+        result["rows_per_second"] = rows / median if median > 0 else None
+    return result
+
+
+def bench_pipeline(path, spec, repeat):
+    """Stage timings on fresh processors; returns (results, processor of the last run, api_data)"""
+    excel = spec.file_format == 'excel'
+    stages = {"load": [], "clean_data": [], "generate_json_api": []}
+    processor = api_data = None
+    for _ in range(repeat):
+        # Each run detects the format again instead of hitting the per-file cache
+        clear_format_cache()
+        processor = FileProcessor(path, {})
+        started = time.perf_counter()
+        processor.df = processor.load_excel_file() if excel else processor.load_csv_file()
+        loaded = time.perf_counter()
+        processor.clean_data()
+        cleaned = time.perf_counter()
+        api_data = processor.generate_json_api()
+        stages["load"].append(loaded - started)
+        stages["clean_data"].append(cleaned - loaded)
+        stages["generate_json_api"].append(time.perf_counter() - cleaned)
+    name = "load_excel_file" if excel else "load_csv_file"
+    results = {name: summary(stages["load"], spec.rows)}
+    results["clean_data"] = summary(stages["clean_data"], spec.rows)
+    results["generate_json_api"] = summary(stages["generate_json_api"], spec.rows)
+    return results, processor, api_data
+
+
+def route_cases(server, api_data, path):
+    """(name, method, url, options) for every route of a loaded server"""
+    fields = api_data['metadata']['fields']
+    first = api_data['data'][0] if api_data['data'] else {}
+    field = next((name for name in fields if isinstance(first.get(name), str)), fields[0])
+    value = first.get(field, '')
+    total = api_data['metadata']['total_records']
+    middle_page = max(total // 100 // 2, 1)
+    query = quote(str(value)[:3] or 'a')
+    uncached = {"before": server.page_cache.clear}
+    upload = {"repeat": 1, "upload": path}
+    return [
+        ("status", 'GET', '/api/status', {}),
+        ("data page", 'GET', '/api/data?page=1&limit=100', {}),
+        ("data page uncached", 'GET', f'/api/data?page={middle_page}&limit=100', uncached),
+        ("data large page uncached", 'GET', '/api/data?page=1&limit=5000', uncached),
+        ("data page sorted", 'GET', f'/api/data?page={middle_page}&limit=100&sort=-{quote(field)}', uncached),
+        ("data page projected", 'GET', f'/api/data?page={middle_page}&limit=100&fields={quote(field)}', uncached),
+        ("record by id", 'GET', f'/api/data/{total // 2}', {}),
+        ("search", 'GET', f'/api/data/search?q={query}&limit=50', {}),
+        ("filter", 'GET', f'/api/data/filter?field={quote(field)}&value={quote(str(value))}&limit=50', {}),
+        ("fields", 'GET', '/api/fields', {}),
+        ("stats", 'GET', '/api/stats', {}),
+        ("csv-format", 'GET', '/api/csv-format', {}),
+        ("export.json", 'GET', '/api/export.json', {"repeat": 3}),
+        ("export.ndjson", 'GET', '/api/export.ndjson', {"repeat": 3}),
+        ("export.csv", 'GET', '/api/export.csv', {"repeat": 3}),
+        ("sheets", 'GET', '/api/sheets', {}),
+        ("datasets", 'GET', '/api/datasets', {}),
+        ("jobs", 'GET', '/api/jobs', {}),
+        ("metrics", 'GET', '/api/metrics', {}),
+        ("upload", 'POST', '/api/upload?dataset=bench', upload),
+    ]
+
+
+def wait_for_job(client, job_id, poll_seconds=0.01):
+    while True:
+        response = client.get(f'/api/jobs/{job_id}')
+        state = response.get_json()['state'] if response.status_code == 200 else None
+        if state not in ('queued', 'running'):
+            if state != 'done':
+                raise RuntimeError(f"Upload job {job_id} ended as {state}")
+            return response
+        time.sleep(poll_seconds)
+
+
+def bench_routes(processor, api_data, path, repeat):
+    """Latency of each route on a server loaded with the processed dataset"""
+    server = FlaskAPIServer()
+    server.update_data(api_data, processor.df, processor.sheet_frames)
+    client = server.app.test_client()
+    results = {}
+    for name, method, url, options in route_cases(server, api_data, path):
+        def request_once(run):
+            if 'before' in options:
+                options['before']()
+            if 'upload' in options:
+                with open(options['upload'], 'rb') as handle:
+                    response = client.post(url, data={"file": (handle, os.path.basename(options['upload']))},
+                                           content_type='multipart/form-data')
+                if response.status_code == 202:
+                    # Large uploads become a background job: time it until the data is served
+                    response = wait_for_job(client, response.get_json()['job_id'])
+            else:
+                response = client.open(url, method=method)
+            # Streamed exports are only produced while the body is read
+            response.get_data()
+            if response.status_code >= 400:
+                raise RuntimeError(f"{method} {url} returned {response.status_code}")
+        # The first request warms Flask's routing and per-route caches
+        request_once(-1)
+        times = timed_runs(request_once, options.get('repeat', repeat))
+        results[f"route {name}"] = summary(times)
+    return results
+
+
+def run_suite(specs, directory, repeat, route_repeat, log=print):
+    results = {}
+    for spec in specs:
+        path = write_dataset(spec, directory)
+        log(f"{spec.name}: {spec.rows:,} rows x {spec.columns} columns ({os.path.getsize(path) / 1e6:.1f} MB)")
+        pipeline, processor, api_data = bench_pipeline(path, spec, repeat)
+        routes = bench_routes(processor, api_data, path, route_repeat)
+        for bench, result in {**pipeline, **routes}.items():
+            key = f"{spec.name}/{bench}"
+            results[key] = dict(result, dataset=spec.to_dict())
+            log(f"  {bench:<30}{result['median'] * 1000:>12.2f} ms" +
+                (f"{result['rows_per_second']:>14,.0f} rows/s" if result.get('rows_per_second') else ""))
+    return results
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "commit": commit,
+        "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S')
+    }
+
+
+def compare(results, baseline, threshold, min_delta):
+    """Rows (key, baseline median, current median, ratio, regressed) for benchmarks in both runs"""
+    rows = []
+    for key, result in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        before, after = previous['median'], result['median']
+        ratio = after / before if before > 0 else float('inf')
+        regressed = ratio > 1 + threshold and after - before > min_delta
+        rows.append((key, before, after, ratio, regressed))
+    return rows
+
+
+def print_comparison(rows, baseline_info):
+    print(f"\nCompared with the baseline from {baseline_info.get('timestamp')} (commit {baseline_info.get('commit')}):")
+    print(f"{'benchmark':<70}{'baseline':>12}{'current':>12}{'change':>9}")
+    for key, before, after, ratio, regressed in rows:
+        print(f"{key:<70}{before * 1000:>9.2f} ms{after * 1000:>9.2f} ms{(ratio - 1) * 100:>+8.1f}%"
+              + ("  REGRESSION" if regressed else ""))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000, help="rows of the main datasets")
+    parser.add_argument('--repeat', type=int, default=3, help="pipeline runs per dataset")
+    parser.add_argument('--route-repeat', type=int, default=20, help="requests per route")
+    parser.add_argument('--quick', action='store_true', help="10,000 rows, 1 pipeline run, 5 requests per route")
+    parser.add_argument('--only', action='append', default=[], metavar='TEXT',
+                        help="only datasets whose name contains TEXT (repeatable)")
+    parser.add_argument('--data-dir', help="where generated datasets are kept (default: a temporary directory)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="write the results as JSON")
+    parser.add_argument('--baseline', help="results JSON of an earlier run to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2, help="relative slowdown reported as a regression")
+    parser.add_argument('--min-delta', type=float, default=0.002, help="ignore slowdowns below this many seconds")
+    args = parser.parse_args(argv)
+    if args.quick:
+        args.rows, args.repeat, args.route_repeat = 10000, 1, 5
+
+    specs = [DatasetSpec(spec.rows, spec.columns, spec.mix, spec.encoding, spec.delimiter, spec.file_format, args.seed)
+             for spec in default_specs(args.rows)]
+    if args.only:
+        specs = [spec for spec in specs if any(text in spec.name for text in args.only)]
+    if not specs:
+        parser.error("no dataset matches --only")
+
+    directory = args.data_dir or tempfile.mkdtemp(prefix='bench-data-')
+    os.makedirs(directory, exist_ok=True)
+    results = run_suite(specs, directory, args.repeat, args.route_repeat)
+    report = {"version": RESULTS_VERSION, "environment": environment(),
+              "settings": {"rows": args.rows, "repeat": args.repeat, "route_repeat": args.route_repeat,
+                           "seed": args.seed},
+              "results": results}
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            json.dump(report, handle, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as handle:
+            baseline = json.load(handle)
+        rows = compare(results, baseline.get('results', {}), args.threshold, args.min_delta)
+        print_comparison(rows, baseline.get('environment', {}))
+        regressions = [row for row in rows if row[4]]
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}")
+            return 1
+        print("\nNo regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
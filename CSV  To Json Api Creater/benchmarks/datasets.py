@@ -0,0 +1,119 @@
+"""Synthetic datasets for the benchmarks: reproducible frames written as CSV or Excel files.
+
+A DatasetSpec fixes rows, columns, type mix, encoding and delimiter; the
+same spec and seed always produce the same bytes, so results of
+different runs (and machines) measure the same input.
+"""
+import os
+import numpy as np
+import pandas as pd
+
+
+# Column kinds cycled through by each type mix
+TYPE_MIXES = {
+    'numeric': ['integer', 'float', 'integer', 'float_gaps'],
+    'text': ['word', 'sentence', 'code', 'accented'],
+    'mixed': ['integer', 'float_gaps', 'word', 'boolean', 'date', 'code', 'numeric_text', 'accented'],
+}
+WORDS = ['north', 'south', 'east', 'west', 'alpha', 'beta', 'gamma', 'delta', 'red', 'green']
+ACCENTED = ['café', 'naïve', 'Zürich', 'São Paulo', 'Málaga', 'Øresund', 'crème', 'Ångström']
+
+
+class DatasetSpec:
+    """Shape and file format of one synthetic dataset"""
+
+    def __init__(self, rows, columns=8, mix='mixed', encoding='utf-8', delimiter=',', file_format='csv', seed=0):
+        if mix not in TYPE_MIXES:
+            raise ValueError(f"Unknown type mix '{mix}' (one of {', '.join(TYPE_MIXES)})")
+        self.rows = rows
+        self.columns = columns
+        self.mix = mix
+        self.encoding = encoding
+        self.delimiter = delimiter
+        self.file_format = file_format
+        self.seed = seed
+
+    @property
+    def name(self):
+        """Stable key of the spec, used to match results against a baseline"""
+        delimiter = {',': 'comma', ';': 'semicolon', '\t': 'tab', '|': 'pipe'}.get(self.delimiter, 'other')
+        if self.file_format != 'csv':
+            return f"{self.mix}-{self.rows}x{self.columns}-{self.file_format}"
+        return f"{self.mix}-{self.rows}x{self.columns}-{self.encoding}-{delimiter}"
+
+    def to_dict(self):
+        return {"rows": self.rows, "columns": self.columns, "mix": self.mix, "encoding": self.encoding,
+                "delimiter": self.delimiter, "format": self.file_format, "seed": self.seed}
+
+
+def make_column(kind, rows, rng):
+    """Raw values of one column, as strings the way they would appear in a file"""
+    if kind == 'integer':
+        return rng.integers(-1000, 100000, rows).astype(str).astype(object)
+    if kind == 'float':
+        return rng.normal(100, 25, rows).round(3).astype(str).astype(object)
+    if kind == 'float_gaps':
+        values = rng.normal(size=rows).round(4).astype(str).astype(object)
+        values[rng.random(rows) < 0.05] = ''
+        return values
+    if kind == 'word':
+        return rng.choice(np.array(WORDS, dtype=object), rows)
+    if kind == 'sentence':
+        first, second = rng.choice(WORDS, rows), rng.choice(WORDS, rows)
+        return np.char.add(np.char.add(first.astype(str), ' and '), second.astype(str)).astype(object)
+    if kind == 'code':
+        return np.char.add('id-', rng.integers(0, rows, rows).astype(str)).astype(object)
+    if kind == 'accented':
+        return rng.choice(np.array(ACCENTED, dtype=object), rows)
+    if kind == 'boolean':
+        return rng.choice(np.array(['yes', 'no', 'true', 'false'], dtype=object), rows)
+    if kind == 'date':
+        return rng.choice(pd.date_range('2020-01-01', periods=1000).strftime('%Y-%m-%d').to_numpy(dtype=object), rows)
+    if kind == 'numeric_text':
+        # Mostly numbers with a few text values: the slow path of the inference
+        values = rng.integers(0, 1000, rows).astype(str).astype(object)
+        values[rng.random(rows) < 0.02] = 'n/a'
+        return values
+    raise ValueError(f"Unknown column kind '{kind}'")
+
+
+def make_frame(spec):
+    """DataFrame of raw string columns for spec"""
+    rng = np.random.default_rng(spec.seed)
+    kinds = TYPE_MIXES[spec.mix]
+    data = {}
+    for col in range(spec.columns):
+        kind = kinds[col % len(kinds)]
+        data[f"{kind} {col}"] = make_column(kind, spec.rows, rng)
+    return pd.DataFrame(data)
+
+
+def write_dataset(spec, directory):
+    """Write spec's file into directory (reused when it already exists); returns the path"""
+    extension = 'xlsx' if spec.file_format == 'excel' else 'csv'
+    path = os.path.join(directory, f"{spec.name}-seed{spec.seed}.{extension}")
+    if os.path.exists(path):
+        return path
+    df = make_frame(spec)
+    # Written under a temporary name so an interrupted run never leaves a truncated dataset behind
+    partial = f"{os.path.splitext(path)[0]}.partial.{extension}"
+    if spec.file_format == 'excel':
+        df.to_excel(partial, index=False, engine='openpyxl')
+    else:
+        df.to_csv(partial, index=False, sep=spec.delimiter, encoding=spec.encoding)
+    os.replace(partial, path)
+    return path
+
+
+def default_specs(rows):
+    """The suite's datasets for a row count: type mixes, encodings, delimiters, a wide frame and Excel"""
+    return [
+        DatasetSpec(rows, 8, 'mixed'),
+        DatasetSpec(rows, 8, 'numeric', delimiter=';'),
+        DatasetSpec(rows, 8, 'text', encoding='latin-1', delimiter='\t'),
+        DatasetSpec(rows, 8, 'mixed', encoding='utf-16', delimiter='|'),
+        DatasetSpec(rows, 8, 'mixed', encoding='utf-8-sig', delimiter=';'),
+        DatasetSpec(max(rows // 8, 1), 64, 'mixed'),
+        # Excel files are slow to write and read; a tenth of the rows keeps the suite short
+        DatasetSpec(max(rows // 10, 1), 8, 'mixed', file_format='excel'),
+    ]
@@ -0,0 +1,91 @@
+"""HTTP load test for a running API server.
+
+Usage: python benchmarks/load_test.py [--url http://127.0.0.1:5000]
+       [--concurrency 16] [--duration 10] [--path /api/data?page=1&limit=100 ...]
+
+Each client thread keeps one connection open and requests the paths in
+turn; throughput and latency percentiles are printed per path and overall.
+"""
+import argparse
+import http.client
+import threading
+import time
+from urllib.parse import urlparse
+import numpy as np
+
+
+DEFAULT_PATHS = [
+    '/api/data?page=1&limit=100',
+    '/api/data?page=7&limit=50',
+    '/api/data/search?q=ro&limit=50',
+    '/api/fields',
+    '/api/stats',
+]
+
+
+def client(host, port, paths, deadline, results, errors, offset):
+    connection = http.client.HTTPConnection(host, port, timeout=30)
+    position = offset
+    while time.perf_counter() < deadline:
+        path = paths[position % len(paths)]
+        position += 1
+        start = time.perf_counter()
+        try:
+            connection.request('GET', path)
+            response = connection.getresponse()
+            response.read()
+            if response.status >= 400:
+                errors[path] = errors.get(path, 0) + 1
+                continue
+        except (OSError, http.client.HTTPException):
+            errors[path] = errors.get(path, 0) + 1
+            connection.close()
+            connection = http.client.HTTPConnection(host, port, timeout=30)
+            continue
+        results[path].append(time.perf_counter() - start)
+    connection.close()
+
+
+def summarize(name, latencies, duration):
+    if not latencies:
+        return f"{name:<40} no successful requests"
+    millis = np.array(latencies) * 1000
+    return (f"{name:<40} {len(latencies) / duration:>9.1f} req/s   "
+            f"p50 {np.percentile(millis, 50):7.2f} ms   p95 {np.percentile(millis, 95):7.2f} ms   "
+            f"p99 {np.percentile(millis, 99):7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--path', action='append', dest='paths')
+    args = parser.parse_args()
+
+    target = urlparse(args.url)
+    paths = args.paths or DEFAULT_PATHS
+    results = {path: [] for path in paths}
+    errors = {}
+
+    deadline = time.perf_counter() + args.duration
+    threads = [threading.Thread(target=client, args=(target.hostname, target.port or 80, paths,
+                                                     deadline, results, errors, i))
+               for i in range(args.concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    duration = time.perf_counter() - started
+
+    print(f"{args.url}: {args.concurrency} clients for {duration:.1f}s")
+    for path in paths:
+        print(summarize(path, results[path], duration))
+    print(summarize('total', [value for values in results.values() for value in values], duration))
+    if errors:
+        print(f"errors: {errors}")
+
+
+if __name__ == '__main__':
+    main()
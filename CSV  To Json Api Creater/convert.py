@@ -0,0 +1,183 @@
+"""Headless batch converter: CSV/Excel files to JSON API files.
+
+Usage:
+    python convert.py data/*.csv reports/ --output-dir out --workers 8
+    python convert.py "exports/**/*.xlsx" --format ndjson --streaming
+    python convert.py big.csv --format snapshot   # then: python serve.py big_api.snapshot
+    python convert.py big.csv --profile           # stage timings, big_api.prof and big_api.memory.txt
+    python convert.py huge.csv --statistics approximate --statistics-error 0.02
+
+Inputs may be files, directories (searched for .csv/.xlsx/.xls, with
+--recursive for subdirectories) or glob patterns. Files are converted in
+parallel by a process pool, each with the same pipeline as the GUI, and
+a timing line is printed per file followed by a throughput summary.
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from export import write_api_file
+from processing import FileProcessor
+from snapshot import save_snapshot
+from store import ColumnStore
+from streaming import DEFAULT_CHUNK_SIZE
+from sketches import STATISTICS_MODES, APPROXIMATE_MIN_ROWS, DEFAULT_ERROR
+
+
+SUPPORTED_EXTENSIONS = ('.csv', '.xlsx', '.xls')
+
+
+def collect_inputs(patterns, recursive=False):
+    """Expand files, directories and globs into a sorted list of unique data files"""
+    files = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            walker = os.walk(pattern) if recursive else [(pattern, [], os.listdir(pattern))]
+            for root, _, names in walker:
+                files.extend(os.path.join(root, name) for name in names)
+        elif os.path.isfile(pattern):
+            files.append(pattern)
+        else:
+            files.extend(glob.glob(pattern, recursive=True))
+    data_files = {os.path.abspath(path) for path in files
+                  if os.path.isfile(path) and path.lower().endswith(SUPPORTED_EXTENSIONS)}
+    return sorted(data_files)
+
+
+def plan_outputs(files, output_dir, file_format):
+    """(input, output) pairs; inputs that would share an output name keep their extension or get a number"""
+    jobs, taken = [], set()
+    for file_path in files:
+        base, ext = os.path.splitext(os.path.basename(file_path))
+        directory = output_dir or os.path.dirname(file_path)
+        candidates = [base, f"{base}_{ext.lstrip('.')}"]
+        candidates += [f"{base}_{ext.lstrip('.')}_{n}" for n in range(2, len(files) + 2)]
+        for candidate in candidates:
+            output_path = os.path.join(directory, f"{candidate}_api.{file_format}")
+            if output_path not in taken:
+                break
+        taken.add(output_path)
+        jobs.append((file_path, output_path))
+    return jobs
+
+
+def convert_file(file_path, output_path, config):
+    """Convert one file; runs in a worker process and never raises"""
+    started = time.perf_counter()
+    result = {"file": file_path, "output": output_path, "records": 0,
+              "input_bytes": os.path.getsize(file_path), "error": None}
+    try:
+        profiling = config.get('profile_path')
+        config = dict(config, output_path=output_path,
+                      profile_path=f"{os.path.splitext(output_path)[0]}.prof" if profiling else None)
+        processor = FileProcessor(file_path, config)
+        api_data = processor.process()
+        with processor.profile.stage('write', api_data['metadata']['total_records']):
+            if output_path.endswith('.snapshot'):
+                store = ColumnStore.from_dataframe(processor.df.iloc[:len(api_data['data'])])
+                save_snapshot(output_path, api_data, store)
+            elif not config.get('streaming'):
+                write_api_file(api_data, output_path)
+        result["records"] = api_data['metadata']['total_records']
+        result["sheets"] = processor.sheet_stats
+        if profiling:
+            result["profile"] = processor.profile.format_table()
+    except Exception as e:
+        result["error"] = str(e)
+    result["seconds"] = time.perf_counter() - started
+    return result
+
+
+def format_result(result):
+    if result["error"]:
+        return f"FAILED {result['file']}: {result['error']} ({result['seconds']:.2f}s)"
+    seconds = max(result["seconds"], 1e-9)
+    line = (f"{result['seconds']:8.2f}s  {result['records']:>10,} records  "
+            f"{result['records'] / seconds:>10,.0f} rec/s  "
+            f"{result['input_bytes'] / seconds / 1e6:7.1f} MB/s  {result['file']}")
+    if len(result.get("sheets", [])) > 1:
+        # Load time of each sheet, before cleaning
+        line += ''.join(f"\n          sheet {sheet['sheet']!r}: {sheet['rows']:,} rows in {sheet['seconds']:.2f}s "
+                        f"({sheet['rows_per_second']:,} rows/s)" for sheet in result["sheets"])
+    if result.get("profile"):
+        line += ''.join(f"\n          {row}" for row in result["profile"].splitlines())
+    return line
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert CSV/Excel files to JSON API files")
+    parser.add_argument('inputs', nargs='+', help="files, directories or glob patterns")
+    parser.add_argument('-o', '--output-dir', help="where to write outputs (default: next to each input)")
+    parser.add_argument('--format', choices=['json', 'ndjson', 'snapshot'], default='json',
+                        help="snapshot writes a memory-mappable directory for serve.py")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="parallel worker processes (default: CPU count)")
+    parser.add_argument('--column-workers', type=int, default=1,
+                        help="processes cleaning the columns of each file (0 = all cores)")
+    parser.add_argument('--sheets', help="Excel sheets to convert: 'all' or comma-separated names "
+                        "(default: the first non-empty sheet; extra sheets are written next to the output)")
+    parser.add_argument('--recursive', action='store_true', help="search directories recursively")
+    parser.add_argument('--streaming', action='store_true', help="process each file in chunks (bounded memory)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--preview-only', action='store_true')
+    parser.add_argument('--preview-limit', type=int, default=1000)
+    parser.add_argument('--statistics', choices=STATISTICS_MODES, default='auto',
+                        help="fields_info from exact counts or mergeable sketches (auto: sketches from "
+                        f"{APPROXIMATE_MIN_ROWS:,} rows)")
+    parser.add_argument('--statistics-error', type=float, default=DEFAULT_ERROR,
+                        help="relative error the sketches are sized for")
+    parser.add_argument('--profile', action='store_true',
+                        help="print stage timings and write cProfile (.prof) and tracemalloc (.memory.txt) "
+                        "reports next to each output")
+    args = parser.parse_args(argv)
+    if args.streaming and args.format == 'snapshot':
+        parser.error("--streaming writes records straight to a file and cannot build a snapshot")
+
+    files = collect_inputs(args.inputs, args.recursive)
+    if not files:
+        print("No CSV/Excel files matched", file=sys.stderr)
+        return 1
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    config = {
+        'preview_only': args.preview_only,
+        'preview_limit': args.preview_limit,
+        'streaming': args.streaming,
+        'chunk_size': args.chunk_size,
+        'workers': args.column_workers,
+        'sheets': args.sheets,
+        'statistics': args.statistics,
+        'statistics_error': args.statistics_error,
+        'profile_path': args.profile  # replaced by a path per output in convert_file
+    }
+    jobs = plan_outputs(files, args.output_dir, args.format)
+    workers = max(1, min(args.workers, len(jobs)))
+    print(f"Converting {len(jobs)} file(s) with {workers} worker(s)")
+
+    started = time.perf_counter()
+    results = []
+    if workers == 1:
+        for path, output_path in jobs:
+            results.append(convert_file(path, output_path, config))
+            print(format_result(results[-1]), flush=True)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(convert_file, path, output_path, config) for path, output_path in jobs]
+            for future in as_completed(futures):
+                results.append(future.result())
+                print(format_result(results[-1]), flush=True)
+    elapsed = time.perf_counter() - started
+
+    failed = [result for result in results if result["error"]]
+    records = sum(result["records"] for result in results)
+    input_bytes = sum(result["input_bytes"] for result in results if not result["error"])
+    print(f"\n{len(results) - len(failed)} converted, {len(failed)} failed in {elapsed:.2f}s: "
+          f"{records:,} records ({records / elapsed:,.0f} rec/s, {input_bytes / elapsed / 1e6:.1f} MB/s)")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,41 @@
+import hashlib
+from sorting import SortOrders
+
+
+class Dataset:
+    """One immutable version of the served data.
+
+    FlaskAPIServer holds a single reference to the current Dataset and
+    replaces it whole on every load. A request reads that reference once
+    and then only uses the object it got, so it finishes against the
+    version it started with while a reload builds the next one, and the
+    request path never takes a lock.
+    """
+
+    def __init__(self, api_data, store, search_index, filter_index, metadata_json, version, load_token, sheet=None):
+        self.api_data = api_data  # api_info, metadata and endpoints; rows live in store
+        self.store = store
+        self.search_index = search_index
+        self.filter_index = filter_index
+        self.metadata_json = metadata_json
+        self.version = version
+        self.load_token = load_token
+        self.sheet = sheet  # key of the workbook sheet this data came from, when several are served
+        self.sheets = {}  # sheet key -> Dataset of the same version, for multi-sheet workbooks
+        self.sort_orders = SortOrders(store)  # sorted /api/data views, computed on first request
+
+    @property
+    def nbytes(self):
+        """Memory held by the rows, both indexes and the cached sort orders (mapped snapshot files included)"""
+        return self.store.nbytes + self.search_index.nbytes + self.filter_index.nbytes + self.sort_orders.nbytes
+
+    def etag(self, page, limit, view=None):
+        """Strong validator of an /api/data page; the load token keeps it unique across restarts.
+
+        view (the sort keys and projected fields) is hashed in, since field
+        names are not necessarily ASCII.
+        """
+        suffix = f"-{hashlib.blake2b(repr(view).encode('utf-8'), digest_size=6).hexdigest()}" if view else ""
+        if self.sheet is not None:
+            return f"{self.load_token}-{self.version}-{self.sheet}-{page}-{limit}{suffix}"
+        return f"{self.load_token}-{self.version}-{page}-{limit}{suffix}"
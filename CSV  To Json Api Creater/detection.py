@@ -0,0 +1,152 @@
+import codecs
+import csv
+import io
+import os
+import threading
+from collections import OrderedDict
+import pandas as pd
+
+
+SAMPLE_SIZE = 64 * 1024
+SAMPLE_ROWS = 50
+DELIMITERS = [',', ';', '\t', '|', ':', ' ']
+
+# Byte order marks, longest first so UTF-32 is not mistaken for UTF-16
+BOMS = [
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+# Bytes that cp1252 maps to printable characters but latin-1 treats as C1 controls
+CP1252_RANGE = bytes(range(0x80, 0xA0))
+
+_format_cache = OrderedDict()
+_cache_lock = threading.Lock()
+CACHE_SIZE = 256
+
+
+def detect_csv_format(file_path):
+    """Detect encoding and delimiter from a single raw byte sample, cached per file version"""
+    key = _cache_key(file_path)
+    with _cache_lock:
+        if key in _format_cache:
+            _format_cache.move_to_end(key)
+            return dict(_format_cache[key], cached=True)
+
+    with open(file_path, 'rb') as file:
+        sample = file.read(SAMPLE_SIZE)
+    truncated = len(sample) == SAMPLE_SIZE
+
+    encoding = detect_encoding(sample)
+    text = codecs.getincrementaldecoder(encoding)(errors='replace').decode(sample, final=not truncated)
+    if truncated:
+        # Drop the last, possibly incomplete, line
+        text = text[:text.rfind('\n') + 1] or text
+
+    delimiter, columns = sniff_delimiter(text)
+    csv_format = {
+        'encoding': encoding,
+        'delimiter': delimiter,
+        # Runs of spaces split into empty fields, so aligned columns can also look space-delimited
+        'fixed_width': (columns <= 1 or delimiter == ' ') and _looks_fixed_width(text),
+    }
+    return remember_format(file_path, csv_format, key)
+
+
+def remember_format(file_path, csv_format, key=None):
+    """Store detected parameters so the next run on an unchanged file skips detection"""
+    key = key or _cache_key(file_path)
+    csv_format = dict(csv_format, cached=False)
+    with _cache_lock:
+        _format_cache[key] = csv_format
+        _format_cache.move_to_end(key)
+        while len(_format_cache) > CACHE_SIZE:
+            _format_cache.popitem(last=False)
+    return dict(csv_format)
+
+
+def clear_format_cache():
+    with _cache_lock:
+        _format_cache.clear()
+
+
+def detect_encoding(sample):
+    """Pick an encoding from BOMs and UTF-8 validity of the raw bytes"""
+    for bom, encoding in BOMS:
+        if sample.startswith(bom):
+            return encoding
+
+    try:
+        # Incremental decoding tolerates a multi-byte character cut at the sample edge
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+
+    if any(byte in CP1252_RANGE for byte in sample):
+        try:
+            sample.decode('cp1252')
+            return 'cp1252'
+        except UnicodeDecodeError:
+            pass
+    return 'latin-1'
+
+
+def sniff_delimiter(text):
+    """Score candidate delimiters by row consistency, then column count.
+
+    Returns (delimiter, columns). A row is consistent when it splits into
+    at least 2 fields and no more than the header, so short trailing rows
+    (missing values) still count. Ties go to the candidate whose rows
+    match the header exactly most often, then to the most columns (the
+    previous max-columns rule), then to the earlier candidate.
+    """
+    best_delimiter = ','
+    best_score = (0.0, 0.0, 0)
+
+    for delimiter in DELIMITERS:
+        counts = []
+        try:
+            for row in csv.reader(io.StringIO(text), delimiter=delimiter):
+                if row:
+                    counts.append(len(row))
+                if len(counts) >= SAMPLE_ROWS:
+                    break
+        except csv.Error:
+            continue
+
+        if not counts:
+            continue
+
+        columns = counts[0]
+        consistency = sum(1 for count in counts if 2 <= count <= columns) / len(counts)
+        # Text with spaces splits into a varying number of fields that can still fit under the header
+        exact = sum(1 for count in counts if count == columns) / len(counts)
+        score = (consistency, exact, columns)
+        if score > best_score:
+            best_delimiter, best_score = delimiter, score
+
+    return best_delimiter, best_score[2]
+
+
+def read_csv_with_format(file_path, csv_format, **kwargs):
+    """Parse a CSV file with previously detected parameters"""
+    if csv_format.get('fixed_width'):
+        return pd.read_fwf(file_path, encoding=csv_format['encoding'], **kwargs)
+    kwargs.setdefault('low_memory', False)
+    return pd.read_csv(file_path, delimiter=csv_format['delimiter'],
+                       encoding=csv_format['encoding'], **kwargs)
+
+
+def _cache_key(file_path):
+    stat = os.stat(file_path)
+    return (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+
+
+def _looks_fixed_width(text):
+    """Aligned columns separated by runs of spaces"""
+    lines = [line for line in text.splitlines()[:SAMPLE_ROWS] if line.strip()]
+    return len(lines) > 1 and sum(1 for line in lines if '  ' in line.strip()) >= len(lines) * 0.9
@@ -0,0 +1,126 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from parallel import resolve_workers
+
+
+# Engines tried per extension; a failing engine only costs opening the file, never a full read
+ENGINES = {
+    '.xls': ['xlrd', 'openpyxl'],
+    '.xlsx': ['openpyxl', 'xlrd'],
+    '.xlsm': ['openpyxl', 'xlrd'],
+}
+
+
+def open_workbook(file_path):
+    """pd.ExcelFile opened once for every sheet read from it.
+
+    openpyxl opens .xlsx files in read-only mode, which streams rows from
+    the sheet XML instead of building the whole workbook in memory.
+    """
+    errors = []
+    for engine in ENGINES.get(os.path.splitext(file_path)[1].lower(), ['openpyxl', 'xlrd']):
+        try:
+            return pd.ExcelFile(file_path, engine=engine)
+        except Exception as e:
+            errors.append(f"{engine}: {str(e)}")
+    raise ValueError(f"Could not open workbook ({'; '.join(errors)})")
+
+
+def select_sheets(sheet_names, selection=None):
+    """Sheets to load: None or 'first' -> the first one, 'all' -> every sheet,
+    otherwise a list or comma-separated string of names"""
+    if selection in (None, '', 'first'):
+        return sheet_names[:1]
+    if selection == 'all':
+        return list(sheet_names)
+    wanted = [name.strip() for name in selection.split(',')] if isinstance(selection, str) else list(selection)
+    missing = [name for name in wanted if name not in sheet_names]
+    if missing:
+        raise ValueError(f"Sheets not found: {', '.join(missing)} (available: {', '.join(sheet_names)})")
+    return wanted
+
+
+def read_sheet(file_path, sheet_name, excel_file=None):
+    """(DataFrame, seconds) for one sheet; opens the workbook when none is given"""
+    started = time.perf_counter()
+    excel_file = excel_file or open_workbook(file_path)
+    df = excel_file.parse(sheet_name)
+    return df, time.perf_counter() - started
+
+
+def read_sheets(file_path, sheet_names, workers=1, excel_file=None):
+    """{sheet: (DataFrame, seconds)} in sheet order.
+
+    With more than one worker the sheets are parsed in separate processes,
+    each opening the workbook on its own (an open workbook cannot be
+    shared), so several large sheets load in the time of the largest.
+    """
+    workers = min(resolve_workers(workers), len(sheet_names))
+    if workers < 2:
+        excel_file = excel_file or open_workbook(file_path)
+        return {name: read_sheet(file_path, name, excel_file) for name in sheet_names}
+
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = {name: pool.submit(read_sheet, file_path, name) for name in sheet_names}
+        return {name: future.result() for name, future in futures.items()}
+
+
+def iter_sheet_chunks(file_path, sheet_name=None, chunk_size=50000):
+    """Yield (chunk, fraction of rows read) from one .xlsx sheet without loading it whole.
+
+    Rows are streamed from openpyxl's read-only mode and cells converted the
+    way pandas' openpyxl reader converts them; the first non-empty row is
+    the header.
+    """
+    from openpyxl import load_workbook
+    from openpyxl.cell.cell import TYPE_ERROR, TYPE_NUMERIC
+
+    def convert(cell):
+        value = cell.value
+        if value is None or value == "":
+            return None
+        if cell.data_type == TYPE_ERROR:
+            return np.nan
+        if cell.data_type == TYPE_NUMERIC:
+            integer = int(value)
+            return integer if integer == value else float(value)
+        return value
+
+    book = load_workbook(file_path, read_only=True, data_only=True, keep_links=False)
+    try:
+        sheet = book[sheet_name] if sheet_name else book.worksheets[0]
+        total = max(sheet.max_row or 0, 1)
+        header, rows = None, []
+        for number, row in enumerate(sheet.iter_rows(), start=1):
+            values = [convert(cell) for cell in row]
+            if header is None:
+                if any(value is not None for value in values):
+                    header = _column_names(values)
+                continue
+            rows.append(values[:len(header)] + [None] * (len(header) - len(values)))
+            if len(rows) >= chunk_size:
+                yield pd.DataFrame(rows, columns=header, dtype=object).infer_objects(), min(number / total, 1.0)
+                rows = []
+        if rows:
+            yield pd.DataFrame(rows, columns=header, dtype=object).infer_objects(), 1.0
+    finally:
+        book.close()
+
+
+def _column_names(values):
+    """Header cells as pandas names them: blanks become 'Unnamed: i', repeats get '.1', '.2'"""
+    names, seen = [], {}
+    for position, value in enumerate(values):
+        name = f"Unnamed: {position}" if value is None else str(value)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
@@ -0,0 +1,88 @@
+import csv
+import io
+import os
+import numpy as np
+from streaming import sink_for_path
+from serializer import dumps_text
+
+
+EXPORT_BATCH_SIZE = 10000
+
+
+def iter_batches(store, batch_size=EXPORT_BATCH_SIZE):
+    """Record dicts of a ColumnStore, built batch_size rows at a time"""
+    for start in range(0, len(store), batch_size):
+        yield store.rows(np.arange(start, min(start + batch_size, len(store))))
+
+
+def iter_ndjson(store, batch_size=EXPORT_BATCH_SIZE):
+    """One JSON record per line"""
+    for records in iter_batches(store, batch_size):
+        yield ''.join(dumps_text(record) + '\n' for record in records)
+
+
+def iter_csv(store, batch_size=EXPORT_BATCH_SIZE):
+    """Header row, then the records; missing values become empty cells"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(store.field_names)
+    for start in range(0, len(store), batch_size):
+        indices = np.arange(start, min(start + batch_size, len(store)))
+        columns = [['' if value is None else value for value in column.take(indices)]
+                   for column in store.columns]
+        writer.writerows(zip(*columns))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def iter_json_document(header, batches, metadata):
+    """The full API document in pieces: header sections, records, then metadata.
+
+    Same layout as streaming.JSONStreamSink, so a download and a streamed
+    file of the same data look alike.
+    """
+    yield '{\n'
+    for key, value in header.items():
+        yield f'  {dumps_text(key)}: {dumps_text(value)},\n'
+    yield '  "data": ['
+    count = 0
+    for records in batches:
+        parts = []
+        for record in records:
+            parts.append(',\n    ' if count else '\n    ')
+            parts.append(dumps_text(record))
+            count += 1
+        yield ''.join(parts)
+    yield '\n  ],\n  "metadata": '
+    yield dumps_text(metadata)
+    yield '\n}\n'
+
+
+def write_api_file(api_data, path, batch_size=EXPORT_BATCH_SIZE):
+    """Write an API structure to .json (or .ndjson plus .meta.json) batch by batch.
+
+    Additional workbook sheets (api_data['sheets']) go to sibling files
+    named after the sheet key: data_api.json -> data_api.<sheet>.json.
+    """
+    for key, sheet_api in api_data.get('sheets', {}).items():
+        write_api_file(sheet_api, sheet_path(path, key), batch_size)
+
+    records = api_data.get('data', [])
+    sink = sink_for_path(path)
+    sink.open(api_data.get('api_info', {}), api_data.get('endpoints', {}))
+    try:
+        for start in range(0, len(records), batch_size):
+            sink.write_records(records[start:start + batch_size])
+    except Exception:
+        sink.file.close()
+        raise
+    sink.close(api_data.get('metadata', {}))
+    return sink.count
+
+
+def sheet_path(path, key):
+    root, extension = os.path.splitext(path)
+    return f"{root}.{key}{extension}"
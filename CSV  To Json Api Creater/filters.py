@@ -0,0 +1,316 @@
+from urllib.parse import parse_qsl
+import numpy as np
+import pandas as pd
+from inference import smart_convert_value, DATE_PATTERN
+from search import PostingLists
+from store import NumericColumn, DictionaryColumn
+
+
+# Fields with at most this many distinct values get a hash index. Dictionary encoding
+# (store.dictionary_encode) uses its own limits: at most DICTIONARY_MAX_RATIO of the
+# values and DICTIONARY_MAX_UNIQUE distinct strings
+LOW_CARDINALITY = 1000
+RANGE_OPERATORS = ['gt', 'gte', 'lt', 'lte', 'between']
+OPERATORS = ['eq'] + RANGE_OPERATORS
+
+
+class FilterError(ValueError):
+    """Raised for filters that cannot be answered (unknown field, bad value, ...)"""
+
+
+class HashIndex:
+    """Exact-match index: value -> sorted row postings"""
+
+    def __init__(self, keys, codes, key_count):
+        valid_rows = np.flatnonzero(codes >= 0)
+        self.keys = keys
+        self.postings = PostingLists(codes[valid_rows], valid_rows, key_count)
+
+    @classmethod
+    def from_postings(cls, keys, postings):
+        index = cls.__new__(cls)
+        index.keys = keys
+        index.postings = postings
+        return index
+
+    @property
+    def nbytes(self):
+        # Key dicts are small next to the postings; only array-backed keys are counted
+        keys = self.keys.distinct.nbytes if isinstance(self.keys, NumericKeys) else 0
+        return self.postings.nbytes + keys
+
+    def lookup(self, value):
+        code = self.keys.get(value)
+        if code is None:
+            return np.empty(0, dtype=np.int64)
+        return self.postings.get(code).astype(np.int64)
+
+
+class SortedIndex:
+    """Rows ordered by value, answering equality and ranges with bisection"""
+
+    def __init__(self, values, null_mask, to_key=float):
+        rows = np.flatnonzero(~null_mask)
+        order = np.argsort(values[rows], kind='stable')
+        self.rows = rows[order]
+        self.values = values[self.rows]
+        self.row_count = len(values)
+        self.to_key = to_key
+
+    @classmethod
+    def from_arrays(cls, rows, values, row_count, to_key=float):
+        """Rebuild from saved arrays (e.g. memory-mapped snapshot files)"""
+        index = cls.__new__(cls)
+        index.rows = rows
+        index.values = values
+        index.row_count = row_count
+        index.to_key = to_key
+        return index
+
+    @property
+    def nbytes(self):
+        return self.rows.nbytes + self.values.nbytes
+
+    def range(self, low=None, high=None, include_low=True, include_high=True):
+        start = 0 if low is None else np.searchsorted(self.values, low, side='left' if include_low else 'right')
+        end = len(self.values) if high is None else np.searchsorted(self.values, high, side='right' if include_high else 'left')
+        rows = self.rows[start:max(start, end)]
+        if len(rows) > self.row_count // 16:
+            # Large ranges are cheaper to put back in row order through a mask
+            mask = np.zeros(self.row_count, dtype=bool)
+            mask[rows] = True
+            return np.flatnonzero(mask)
+        return np.sort(rows)
+
+
+class FilterIndex:
+    """Per-field indexes for /api/data/filter.
+
+    Fields with at most LOW_CARDINALITY distinct values (taken from
+    fields_info when available) and all string fields get a hash index;
+    numeric, date and the numbers of mixed fields get a sorted index for
+    ranges. Conditions are combined with AND by intersecting row postings,
+    smallest first.
+    """
+
+    def __init__(self, store, fields_info=None):
+        fields_info = fields_info or {}
+        self.row_count = len(store)
+        self.hash_indexes = {}
+        self.sorted_indexes = {}
+        self.field_kinds = {}
+
+        for column in store.columns:
+            unique_count = fields_info.get(column.name, {}).get('unique_count')
+            self._index_column(column, unique_count)
+
+    @classmethod
+    def from_parts(cls, row_count, hash_indexes, sorted_indexes, field_kinds):
+        index = cls.__new__(cls)
+        index.row_count = row_count
+        index.hash_indexes = hash_indexes
+        index.sorted_indexes = sorted_indexes
+        index.field_kinds = field_kinds
+        return index
+
+    @property
+    def nbytes(self):
+        indexes = list(self.hash_indexes.values()) + list(self.sorted_indexes.values())
+        return sum(index.nbytes for index in indexes)
+
+    def describe(self):
+        return {name: {
+            "kind": self.field_kinds[name],
+            "hash_index": name in self.hash_indexes,
+            "sorted_index": name in self.sorted_indexes
+        } for name in self.field_kinds}
+
+    def filter(self, conditions):
+        """Row positions matching every condition ({'field', 'op', 'value'})"""
+        if not conditions:
+            raise FilterError("At least one filter condition is required")
+
+        results = sorted((self._apply(condition) for condition in conditions), key=len)
+        rows = results[0]
+        for other in results[1:]:
+            if not len(rows):
+                break
+            rows = np.intersect1d(rows, other, assume_unique=True)
+        return rows
+
+    def _apply(self, condition):
+        field = condition['field']
+        op = condition.get('op', 'eq')
+        value = condition.get('value')
+        if field not in self.field_kinds:
+            raise FilterError(f"Unknown field '{field}'")
+        if op not in OPERATORS:
+            raise FilterError(f"Unsupported operator '{op}'")
+
+        if op == 'eq':
+            return self._equal(field, value)
+
+        index = self.sorted_indexes.get(field)
+        if index is None:
+            raise FilterError(f"Range filters need a numeric or date field; '{field}' is {self.field_kinds[field]}")
+        if op == 'between':
+            parts = str(value).split(',')
+            if len(parts) != 2:
+                raise FilterError("'between' expects two comma-separated values")
+            return index.range(self._key(index, parts[0]), self._key(index, parts[1]))
+
+        key = self._key(index, value)
+        if op in ('gt', 'gte'):
+            return index.range(low=key, include_low=(op == 'gte'))
+        return index.range(high=key, include_high=(op == 'lte'))
+
+    def _equal(self, field, value):
+        # The query value goes through the same conversion as the data
+        converted = smart_convert_value(value)
+        hash_index = self.hash_indexes.get(field)
+        if hash_index is not None:
+            return hash_index.lookup(converted)
+
+        # High-cardinality numbers only have the sorted index
+        if converted is None or isinstance(converted, str):
+            return np.empty(0, dtype=np.int64)
+        return self.sorted_indexes[field].range(converted, converted)
+
+    def _key(self, index, value):
+        try:
+            return index.to_key(str(value).strip())
+        except (ValueError, TypeError):
+            raise FilterError(f"Invalid value '{value}' for this field")
+
+    def _index_column(self, column, unique_count):
+        name = column.name
+        if isinstance(column, DictionaryColumn):
+            keys = {value: code for code, value in enumerate(column.dictionary.tolist())}
+            self.hash_indexes[name] = HashIndex(keys, column.codes.astype(np.int64), len(keys))
+            dates = self._parse_dates(column)
+            if dates is not None:
+                self.field_kinds[name] = 'date'
+                self.sorted_indexes[name] = SortedIndex(dates, dates == np.iinfo(np.int64).min, date_key)
+            else:
+                self.field_kinds[name] = 'string'
+            return
+
+        if isinstance(column, NumericColumn):
+            null_mask = column.null_mask()
+            kind = column.values.dtype.kind
+            self.field_kinds[name] = 'boolean' if kind == 'b' else 'number'
+            if unique_count is None:
+                unique_count = len(np.unique(column.values[~null_mask]))
+            if kind == 'b' or unique_count <= LOW_CARDINALITY:
+                distinct, codes = np.unique(column.values, return_inverse=True)
+                codes = np.where(null_mask, -1, codes.reshape(-1))
+                self.hash_indexes[name] = HashIndex(NumericKeys(distinct), codes, len(distinct))
+            if kind != 'b':
+                self.sorted_indexes[name] = SortedIndex(column.values, null_mask)
+            return
+
+        # Mixed columns: Python hashing keeps 1 == 1.0 == True, as the values compare
+        self.field_kinds[name] = 'mixed'
+        keys = {}
+        codes = np.full(len(column), -1, dtype=np.int64)
+        numbers = np.zeros(len(column), dtype=np.float64)
+        is_number = np.zeros(len(column), dtype=bool)
+        for position, value in enumerate(column.take(np.arange(len(column)))):
+            if value is None:
+                continue
+            codes[position] = keys.setdefault(value, len(keys))
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                numbers[position] = value
+                is_number[position] = True
+        self.hash_indexes[name] = HashIndex(keys, codes, len(keys))
+        if is_number.any():
+            # Ranges only consider the numeric values of the column
+            self.sorted_indexes[name] = SortedIndex(numbers, ~is_number)
+
+    def _parse_dates(self, column):
+        """Date columns: every dictionary value looks like a date and parses"""
+        dictionary = pd.Series(column.dictionary, dtype=object)
+        if not len(dictionary) or not dictionary.str.fullmatch(DATE_PATTERN).all():
+            return None
+        parsed = pd.to_datetime(dictionary, errors='coerce')
+        if parsed.isna().any():
+            return None
+        stamps = parsed.to_numpy(dtype='datetime64[ns]').astype(np.int64)
+        codes = column.codes.astype(np.int64)
+        return np.where(codes >= 0, stamps[np.maximum(codes, 0)], np.iinfo(np.int64).min)
+
+
+class SegmentedFilterIndex:
+    """One FilterIndex per block of appended rows, queried as a single index.
+
+    A block may lack an index another block has (a field that only became
+    numeric later, or is empty in the block); such a block simply has no
+    matches. A condition is rejected only when every block rejects it.
+    """
+
+    def __init__(self, segments):
+        self.segments = segments
+
+    @classmethod
+    def extend(cls, index, tail_index, start):
+        segments = index.segments if isinstance(index, cls) else [(0, index)]
+        return cls(segments + [(start, tail_index)])
+
+    @property
+    def nbytes(self):
+        return sum(index.nbytes for _, index in self.segments)
+
+    def filter(self, conditions):
+        results, errors = [], []
+        for start, index in self.segments:
+            try:
+                results.append(index.filter(conditions) + start)
+            except FilterError as e:
+                errors.append(e)
+        if len(errors) == len(self.segments):
+            raise errors[0]
+        return np.concatenate(results).astype(np.int64)
+
+
+class NumericKeys:
+    """dict-like lookup of a number in a sorted array of distinct values"""
+
+    def __init__(self, distinct):
+        self.distinct = distinct
+
+    def get(self, value):
+        if value is None or isinstance(value, str):
+            return None
+        position = np.searchsorted(self.distinct, value)
+        if position < len(self.distinct) and self.distinct[position] == value:
+            return int(position)
+        return None
+
+
+def date_key(value):
+    return pd.Timestamp(value).value
+
+
+def parse_filter_args(query_string):
+    """Turn a raw query string into conditions.
+
+    Each 'field' parameter starts a condition and the operator parameters
+    that follow it (value, gt, gte, lt, lte, between) apply to that field:
+    ?field=city&value=Paris&field=amount&gt=10&lt=50
+    The raw string is parsed because request.args groups values by key
+    and loses that order.
+    """
+    if isinstance(query_string, bytes):
+        query_string = query_string.decode('utf-8', errors='replace')
+    conditions = []
+    current = None
+    for key, value in parse_qsl(query_string, keep_blank_values=True):
+        if key == 'field':
+            current = value
+            continue
+        if key not in ['value'] + RANGE_OPERATORS:
+            continue
+        if current is None:
+            raise FilterError(f"'{key}' must follow a 'field' parameter")
+        conditions.append({"field": current, "op": 'eq' if key == 'value' else key, "value": value})
+    return conditions
@@ -0,0 +1,196 @@
+import hashlib
+import io
+import os
+import pandas as pd
+from detection import detect_csv_format, read_csv_with_format
+from inference import infer_frame
+from streaming import api_header, build_metadata
+from sketches import FieldAggregator, DuplicateEstimator, DEFAULT_ERROR
+
+
+FINGERPRINT_BYTES = 4096
+# Encodings whose appended bytes decode on their own (no BOM or byte-order state)
+TAIL_ENCODINGS = {'utf-8': 'utf-8', 'utf-8-sig': 'utf-8', 'cp1252': 'cp1252', 'latin-1': 'latin-1'}
+
+
+class IncrementalState:
+    """What a run remembers about a CSV file so the next run only parses appended lines.
+
+    The byte offset, row count and mergeable statistics (field aggregators,
+    duplicate filter, null cells) are kept between runs, together with a
+    fingerprint of the consumed bytes that detects files rewritten in place.
+    """
+
+    def __init__(self, file_path, csv_format, raw_columns, columns, error=DEFAULT_ERROR):
+        self.file_path = os.path.abspath(file_path)
+        self.csv_format = csv_format
+        self.raw_columns = raw_columns
+        self.columns = columns
+        self.text_columns = set()  # positions pandas read as text in the first run
+        self.float_columns = set()  # positions pandas read as floats in the first run
+        self.offset = 0
+        self.row_count = 0
+        self.null_cells = 0
+        self.unterminated = False  # the consumed bytes did not end with a newline
+        self.aggregators = {col: FieldAggregator(error=error) for col in columns}
+        self.duplicates = DuplicateEstimator()
+        self.fingerprint = None
+
+    def matches(self, file_path):
+        """True when file_path still starts with the bytes this state has consumed"""
+        if os.path.abspath(file_path) != self.file_path:
+            return False
+        try:
+            if os.path.getsize(file_path) < self.offset:
+                return False
+            return _fingerprint(file_path, self.offset) == self.fingerprint
+        except OSError:
+            return False
+
+    def add_rows(self, df):
+        """Fold a cleaned block of new rows into the statistics"""
+        for position, col in enumerate(self.columns):
+            self.aggregators[col].update(df.iloc[:, position].to_numpy())
+        self.null_cells += int(df.isna().sum().sum())
+        self.duplicates.update(pd.util.hash_pandas_object(df, index=False).to_numpy())
+        self.row_count += len(df)
+
+    def metadata(self):
+        return build_metadata(self.columns, self.aggregators, self.row_count, self.null_cells, self.duplicates)
+
+
+def supports_incremental(file_path):
+    """Delimited CSV files in an encoding whose tail can be decoded separately"""
+    if os.path.splitext(file_path)[1].lower() != '.csv':
+        return False
+    csv_format = detect_csv_format(file_path)
+    return not csv_format['fixed_width'] and csv_format['encoding'] in TAIL_ENCODINGS
+
+
+def process_incremental(file_path, state, clean_column_name, on_status=None, error=DEFAULT_ERROR):
+    """Process the lines appended since state was taken; returns (api_data, new rows, column types, state).
+
+    Without a usable state (first run, another file, or a file that was
+    truncated or rewritten) the whole file is processed and a fresh state
+    is returned. Otherwise only the bytes after state.offset are parsed and
+    api_data carries the new records plus an 'appended' block
+    ({'start_row', 'rows'}); its metadata covers the whole file.
+    Values are parsed with pandas dtypes and converted like the normal
+    pipeline; appended columns keep the text or float dtype of the first run.
+    Statistics come from the mergeable aggregators, as in streaming mode,
+    sized for error when a fresh state is taken.
+    """
+    if state is not None and not state.matches(file_path):
+        if on_status:
+            on_status("File changed before the last processed position; re-processing from the start")
+        state = None
+
+    if state is not None:
+        try:
+            start_row = state.row_count
+            df, column_types = _read_appended(file_path, state)
+            if on_status:
+                on_status(f"Parsed {len(df):,} appended records")
+            api_data = _api_data(file_path, state, df)
+            api_data["appended"] = {"start_row": start_row, "rows": len(df)}
+            return api_data, df, column_types, state
+        except _NotAppendable as e:
+            if on_status:
+                on_status(f"{str(e)}; re-processing from the start")
+
+    df, column_types, state = _read_full(file_path, clean_column_name, error)
+    return _api_data(file_path, state, df), df, column_types, state
+
+
+class _NotAppendable(Exception):
+    """The new bytes cannot be treated as rows appended to the consumed ones"""
+
+
+def _read_full(file_path, clean_column_name, error):
+    csv_format = detect_csv_format(file_path)
+    data = _read_bytes(file_path, 0)
+    raw = read_csv_with_format(io.BytesIO(data), csv_format)
+    columns = [clean_column_name(col) for col in raw.columns]
+    state = IncrementalState(file_path, csv_format, list(raw.columns), columns, error)
+    state.text_columns = {position for position, dtype in enumerate(raw.dtypes) if dtype.kind == 'O'}
+    state.float_columns = {position for position, dtype in enumerate(raw.dtypes) if dtype.kind == 'f'}
+    df, column_types = _clean(raw, state)
+    _advance(state, file_path, data)
+    return df, column_types, state
+
+
+def _read_appended(file_path, state):
+    data = _read_bytes(file_path, state.offset)
+    body = data
+    if state.unterminated and data:
+        # The previous last line had no newline; new rows must start on a new line
+        if data.startswith(b'\r\n'):
+            body = data[2:]
+        elif data.startswith(b'\n'):
+            body = data[1:]
+        else:
+            raise _NotAppendable("The last record was extended")
+
+    if not body.strip():
+        df, column_types = pd.DataFrame(columns=state.columns, dtype=object), {}
+    else:
+        csv_format = dict(state.csv_format, encoding=TAIL_ENCODINGS[state.csv_format['encoding']])
+        try:
+            # Text columns are read as text so a tail of digits converts as it would within the file
+            raw = read_csv_with_format(io.BytesIO(body), csv_format, header=None,
+                                       names=list(range(len(state.columns))), index_col=False,
+                                       dtype={position: str for position in state.text_columns})
+        except (pd.errors.ParserError, UnicodeDecodeError, ValueError) as e:
+            raise _NotAppendable(f"Appended lines could not be parsed ({str(e)})")
+        for position in state.float_columns:
+            # Whole numbers appended to a float column stay floats (2.0, not 2)
+            if raw[position].dtype.kind in 'iu':
+                raw[position] = raw[position].astype(float)
+        df, column_types = _clean(raw, state)
+
+    _advance(state, file_path, data)
+    return df, column_types
+
+
+def _clean(raw, state):
+    raw.columns = state.columns
+    raw = raw.dropna(how='all')
+    if raw.empty:
+        return raw, {}
+    df, column_types = infer_frame(raw, infer_dtypes=False)
+    state.add_rows(df)
+    return df, column_types
+
+
+def _advance(state, file_path, data):
+    state.offset += len(data)
+    if data:
+        state.unterminated = not data.endswith(b'\n')
+    state.fingerprint = _fingerprint(file_path, state.offset)
+
+
+def _api_data(file_path, state, df):
+    api_info, endpoints = api_header(file_path)
+    return {
+        "api_info": api_info,
+        "metadata": state.metadata(),
+        "endpoints": endpoints,
+        "data": df.to_dict('records')
+    }
+
+
+def _read_bytes(file_path, offset):
+    with open(file_path, 'rb') as file:
+        file.seek(offset)
+        return file.read()
+
+
+def _fingerprint(file_path, offset):
+    """Hash of the first and last FINGERPRINT_BYTES before offset"""
+    digest = hashlib.sha1(str(offset).encode())
+    with open(file_path, 'rb') as file:
+        digest.update(file.read(min(offset, FINGERPRINT_BYTES)))
+        tail_start = max(offset - FINGERPRINT_BYTES, 0)
+        file.seek(tail_start)
+        digest.update(file.read(offset - tail_start))
+    return digest.hexdigest()
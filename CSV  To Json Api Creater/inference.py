@@ -0,0 +1,280 @@
+import re
+from contextlib import nullcontext
+import numpy as np
+import pandas as pd
+
+
+# Tokens recognised as booleans (compared case-insensitively after stripping)
+TRUE_TOKENS = ['true', 'yes', '1', 'on', 'y']
+FALSE_TOKENS = ['false', 'no', '0', 'off', 'n']
+
+# Compiled once instead of per cell
+DATE_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2}|\d{2}/\d{2}/\d{4}|\d{2}-\d{2}-\d{4}')
+FLOAT_MARKERS = r'[.eE]'
+NUMERIC_LIKE = re.compile(r'[+-]?(?=[\d_.eE+-]*\d)[\d_.eE+-]+')
+
+
+def smart_convert_value(value):
+    """Intelligently convert a single value to the appropriate type (reference path)"""
+    if pd.isna(value):
+        return None
+
+    # Convert to string first
+    str_value = str(value).strip()
+
+    if not str_value:
+        return None
+
+    # Boolean conversion
+    if str_value.lower() in TRUE_TOKENS:
+        return True
+    elif str_value.lower() in FALSE_TOKENS:
+        return False
+
+    # Numeric conversion
+    try:
+        # Try integer first
+        if '.' not in str_value and 'e' not in str_value.lower():
+            return int(float(str_value))
+        else:
+            return float(str_value)
+    except (ValueError, OverflowError):
+        pass
+
+    # Date-like strings are kept as strings for JSON compatibility
+    return str_value
+
+
+def infer_column(series, infer_dtypes=True):
+    """Convert a whole column at once with vectorized masks.
+
+    Returns the converted Series and the inferred column kind
+    ('empty', 'boolean', 'integer', 'float', 'date', 'string' or 'mixed').
+    Cell values are identical to applying smart_convert_value to every cell.
+    With infer_dtypes=False the column stays an object column of Python
+    values, so blanks remain None instead of being widened to NaN.
+    """
+    values, kinds = convert_values(series)
+    converted = pd.Series(values, index=series.index, name=series.name, dtype=object)
+    if infer_dtypes:
+        converted = converted.infer_objects()
+    return converted, column_kind(kinds)
+
+
+def convert_values(series):
+    """Converted cells as an object array plus the set of kinds seen.
+
+    Kinds of separately converted row blocks can be unioned and passed to
+    column_kind, which is how parallel.py merges blocks.
+    """
+    kind = series.dtype.kind
+
+    if kind == 'b':
+        return series.to_numpy(dtype=object), {'boolean'}
+    if kind in 'iu':
+        return _convert_integers(series.to_numpy())
+    if kind == 'f':
+        return _convert_floats(series.to_numpy())
+    if kind == 'O':
+        return _convert_objects(series)
+    # Datetimes, categoricals, etc. keep the per-cell path
+    values = series.map(smart_convert_value).to_numpy(dtype=object)
+    return values, _kinds_of(values)
+
+
+def infer_frame(df, infer_dtypes=True, profile=None):
+    """Convert every column of a DataFrame, returning (df, {column: kind}).
+
+    With a profiling.Profile each column's conversion is measured.
+    """
+    column_types = {}
+    columns = []
+    # Positional access keeps duplicate column names working
+    for position in range(df.shape[1]):
+        with profile.column(str(df.columns[position]), len(df)) if profile is not None else nullcontext():
+            converted, kind = infer_column(df.iloc[:, position], infer_dtypes)
+        columns.append(converted)
+        column_types[df.columns[position]] = kind
+    if columns:
+        df = pd.concat(columns, axis=1)
+    return df, column_types
+
+
+def _convert_integers(arr):
+    """Integer columns: 1/0 become booleans, everything else stays an int"""
+    values = arr.astype(object)
+    true_mask = arr == 1
+    false_mask = arr == 0
+    values[true_mask] = True
+    values[false_mask] = False
+
+    kinds = set()
+    if (true_mask | false_mask).any():
+        kinds.add('boolean')
+    if not (true_mask | false_mask).all():
+        kinds.add('integer')
+    return values, kinds
+
+
+def _convert_floats(arr):
+    """Float columns: NaN becomes None, infinities fall through as strings"""
+    values = np.empty(len(arr), dtype=object)
+    finite = np.isfinite(arr)
+    values[finite] = arr[finite].tolist()
+
+    null_mask = np.isnan(arr)
+    values[null_mask] = None
+
+    kinds = {'float'} if finite.any() else set()
+    inf_mask = ~finite & ~null_mask
+    if inf_mask.any():
+        values[inf_mask] = [str(v) for v in arr[inf_mask]]
+        kinds.add('string')
+    return values, kinds
+
+
+def _convert_objects(series):
+    """Object columns: convert each distinct value once, then broadcast by code"""
+    values = np.empty(len(series), dtype=object)
+    values[:] = None
+
+    null_mask = series.isna().to_numpy()
+    present = series[~null_mask]
+    if present.empty:
+        return values, set()
+
+    # Factorizing mixed objects would merge 1, 1.0 and True, so stringify those first
+    if pd.api.types.infer_dtype(present, skipna=False) != 'string':
+        present = present.map(str)
+    codes, uniques = pd.factorize(present)
+
+    converted, kinds = _convert_strings(pd.Series(uniques, dtype=object))
+    values[~null_mask] = converted[codes]
+    return values, kinds
+
+
+def _convert_strings(strings):
+    """Convert a Series of distinct raw strings with vectorized masks"""
+    kinds = set()
+    text = strings.str.strip()
+    text_arr = text.to_numpy(dtype=object)
+    lowered = text.str.lower()
+    true_mask = lowered.isin(TRUE_TOKENS).to_numpy()
+    false_mask = lowered.isin(FALSE_TOKENS).to_numpy()
+    blank_mask = (text.str.len() == 0).to_numpy()
+
+    result = text_arr.copy()
+    result[blank_mask] = None
+    result[true_mask] = True
+    result[false_mask] = False
+    if (true_mask | false_mask).any():
+        kinds.add('boolean')
+
+    # Cells that are still plain text once numbers have been taken out
+    text_mask = ~(blank_mask | true_mask | false_mask)
+    candidates = np.flatnonzero(text_mask)
+    if len(candidates):
+        cand_text = text[text_mask]
+        parsed = pd.to_numeric(cand_text, errors='coerce').notna().to_numpy()
+
+        if parsed.any():
+            numeric_text = cand_text[parsed]
+            numbers = _parse_floats(numeric_text.to_numpy(dtype=object))
+            is_float = numeric_text.str.contains(FLOAT_MARKERS).to_numpy()
+            boxed, converted = _box_numbers(numbers, is_float, numeric_text.to_numpy(dtype=object))
+            result[candidates[parsed]] = boxed
+            text_mask[candidates[parsed][converted]] = False
+            if (converted & is_float).any():
+                kinds.add('float')
+            if (converted & ~is_float).any():
+                kinds.add('integer')
+
+        # Strings pandas rejects but Python's float() accepts (underscores, non-ASCII digits)
+        leftover = ~parsed
+        if leftover.any():
+            retry = cand_text[leftover].str.fullmatch(NUMERIC_LIKE).to_numpy()
+            if retry.any():
+                retry_idx = candidates[np.flatnonzero(leftover)[retry]]
+                retried = [smart_convert_value(v) for v in text_arr[retry_idx]]
+                result[retry_idx] = retried
+                numeric = np.array([not isinstance(v, str) for v in retried], dtype=bool)
+                text_mask[retry_idx[numeric]] = False
+                kinds.update(_kinds_of(np.array(retried, dtype=object)[numeric]))
+
+    if text_mask.any():
+        is_date = text[text_mask].str.match(DATE_PATTERN).to_numpy()
+        if is_date.any():
+            kinds.add('date')
+        if not is_date.all():
+            kinds.add('string')
+
+    return result, kinds
+
+
+def _parse_floats(strings):
+    """Parse numeric strings with correctly rounded results, matching float()"""
+    try:
+        return np.asarray(strings, dtype=str).astype(np.float64)
+    except ValueError:
+        return np.array([_safe_float(s) for s in strings], dtype=np.float64)
+
+
+def _safe_float(text):
+    try:
+        return float(text)
+    except ValueError:
+        return np.nan
+
+
+def _box_numbers(numbers, is_float, text):
+    """Turn parsed floats into Python ints/floats following smart_convert_value's rules.
+
+    Returns the boxed values and a mask of the cells that became numbers.
+    """
+    boxed = np.empty(len(numbers), dtype=object)
+
+    float_mask = is_float & ~np.isnan(numbers)
+    boxed[float_mask] = numbers[float_mask].tolist()
+
+    int_mask = ~is_float & np.isfinite(numbers)
+    if int_mask.any():
+        ints = numbers[int_mask]
+        if np.all(np.abs(ints) < 2 ** 63):
+            boxed[int_mask] = ints.astype(np.int64).tolist()
+        else:
+            boxed[int_mask] = [int(v) for v in ints]
+
+    # int(float('inf')) and float('nan') conversions fail, so the text is kept
+    converted = float_mask | int_mask
+    boxed[~converted] = text[~converted]
+    return boxed, converted
+
+
+def _kinds_of(values):
+    """Kinds present in an array of already converted values"""
+    kinds = set()
+    for value in values:
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            kinds.add('boolean')
+        elif isinstance(value, int):
+            kinds.add('integer')
+        elif isinstance(value, float):
+            kinds.add('float')
+        elif DATE_PATTERN.match(str(value)):
+            kinds.add('date')
+        else:
+            kinds.add('string')
+    return kinds
+
+
+def column_kind(kinds):
+    """Collapse the set of kinds seen in a column to a single label"""
+    if not kinds:
+        return 'empty'
+    if kinds == {'integer', 'float'}:
+        return 'float'
+    if len(kinds) > 1:
+        return 'mixed'
+    return next(iter(kinds))
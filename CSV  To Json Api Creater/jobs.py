@@ -0,0 +1,190 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+JOB_WORKERS = 2
+MAX_PENDING_JOBS = 64
+MAX_FINISHED_JOBS = 100
+
+
+class QueueFull(Exception):
+    """Raised when MAX_PENDING_JOBS jobs are already queued or running"""
+
+
+class Job:
+    """Progress of one background task, polled or streamed by clients through the API.
+
+    Every change is also appended to events ({'id', 'event', 'data'}, ids
+    counting from 1) so a stream can resume after the last id it saw: 'state'
+    on queue/start/cancel, 'progress' and 'status' as the pipeline reports
+    them, and finally 'done' or 'failed'.
+    """
+
+    def __init__(self, name):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.state = 'queued'  # queued -> running -> done | failed, or queued -> cancelled
+        self.progress = 0
+        self.message = ""
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.future = None
+        self.events = []
+        self.condition = threading.Condition()
+        with self.condition:
+            self._emit('state', state=self.state)
+
+    @property
+    def finished(self):
+        return self.state in ('done', 'failed', 'cancelled')
+
+    def start(self):
+        """Mark the job running; False when it was cancelled first"""
+        with self.condition:
+            if self.state != 'queued':
+                return False
+            self.state = 'running'
+            self.started_at = time.time()
+            self._emit('state', state=self.state)
+            return True
+
+    def set_progress(self, value):
+        with self.condition:
+            value = max(self.progress, min(int(value), 100))
+            if value != self.progress:
+                self.progress = value
+                self._emit('progress', progress=value)
+
+    def set_message(self, message):
+        with self.condition:
+            self.message = message
+            self._emit('status', message=message)
+
+    def finish(self, result):
+        with self.condition:
+            self.state = 'done'
+            self.progress = 100
+            self.result = result
+            self.finished_at = time.time()
+            self._emit('done', result=result)
+
+    def fail(self, error):
+        with self.condition:
+            self.state = 'failed'
+            self.error = error
+            self.finished_at = time.time()
+            self._emit('failed', error=error)
+
+    def cancel(self):
+        """Cancel a job that has not started; returns False once it is running"""
+        with self.condition:
+            if self.state != 'queued' or (self.future is not None and not self.future.cancel()):
+                return False
+            self.state = 'cancelled'
+            self.finished_at = time.time()
+            self._emit('state', state=self.state)
+            return True
+
+    def wait_events(self, after, timeout):
+        """(events after id after, finished), waiting up to timeout seconds for new ones"""
+        with self.condition:
+            self.condition.wait_for(lambda: len(self.events) > after or self.finished, timeout)
+            return self.events[after:], self.finished
+
+    def to_dict(self):
+        with self.condition:
+            return {
+                "job_id": self.id,
+                "name": self.name,
+                "state": self.state,
+                "progress": self.progress,
+                "message": self.message,
+                "result": self.result,
+                "error": self.error,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at
+            }
+
+    def _emit(self, event, **data):
+        # Callers hold self.condition
+        self.events.append({"id": len(self.events) + 1, "event": event, "data": data})
+        self.condition.notify_all()
+
+
+class JobTracker:
+    """Jobs by id, run on a bounded thread pool.
+
+    At most workers jobs run at once and at most max_pending are queued or
+    running; submit raises QueueFull beyond that. Threads run in the server
+    process because a finished job publishes its data there; the pool is
+    created on the first submit, so a process that forks workers has no
+    threads yet. Only the most recent max_finished finished jobs are kept.
+    """
+
+    def __init__(self, workers=JOB_WORKERS, max_pending=MAX_PENDING_JOBS, max_finished=MAX_FINISHED_JOBS):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_finished = max_finished
+        self.jobs = OrderedDict()
+        self.lock = threading.Lock()
+        self.executor = None
+
+    def create(self, name):
+        """Track a job that the caller runs itself (see run)"""
+        with self.lock:
+            return self._track(Job(name))
+
+    def submit(self, name, target, *args):
+        """Queue target(job, *args) on the pool; returns the Job"""
+        with self.lock:
+            pending = sum(1 for job in self.jobs.values() if not job.finished)
+            if pending >= self.max_pending:
+                raise QueueFull(f"{pending} jobs are already queued or running")
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='job')
+            job = self._track(Job(name))
+        job.future = self.executor.submit(self._run, job, target, args)
+        return job
+
+    def run(self, job, target, *args):
+        """Run target(job, *args) in the calling thread"""
+        self._run(job, target, args)
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def list(self):
+        with self.lock:
+            jobs = list(self.jobs.values())
+        return [job.to_dict() for job in reversed(jobs)]
+
+    def counts(self):
+        with self.lock:
+            states = [job.state for job in self.jobs.values()]
+        return {state: states.count(state) for state in ('queued', 'running', 'done', 'failed', 'cancelled')}
+
+    def _track(self, job):
+        # Callers hold self.lock
+        finished = [job_id for job_id, old in self.jobs.items() if old.finished]
+        for job_id in finished[:max(len(finished) - self.max_finished + 1, 0)]:
+            del self.jobs[job_id]
+        self.jobs[job.id] = job
+        return job
+
+    def _run(self, job, target, args):
+        if not job.start():
+            return
+        try:
+            target(job, *args)
+        except Exception as e:
+            job.fail(str(e))
+        if not job.finished:
+            job.fail("Job ended without a result")
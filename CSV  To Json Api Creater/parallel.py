@@ -0,0 +1,246 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from inference import infer_frame, infer_column, convert_values, column_kind
+from sketches import column_statistics, count_duplicates, FieldAggregator, DEFAULT_ERROR, SAMPLE_SEED
+
+
+# Below this many cells the pool costs more than it saves
+PARALLEL_MIN_CELLS = 1000000
+# Row blocks are used when there are fewer columns than workers and at least this many rows
+ROW_BLOCK_MIN_ROWS = 1000000
+HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+# Fixed-width text may take at most this many times the column's own memory; longer outliers stay local
+SHARED_TEXT_MAX_RATIO = 4
+
+
+def resolve_workers(workers):
+    """0 or None means one worker per CPU"""
+    if not workers:
+        return os.cpu_count() or 1
+    return max(1, int(workers))
+
+
+def parallel_infer_frame(df, workers, profile=None, approximate=False, error=DEFAULT_ERROR):
+    """infer_frame across a process pool; returns (df, column_types, statistics).
+
+    Raw columns are copied once into a shared memory segment and workers
+    read their shard from it without pickling. Wide frames are sharded by
+    column and the workers also compute each column's fields_info entry and
+    a row hash used to count duplicate rows; tall, narrow frames are split
+    into row blocks. Shards are merged in column/row order, so the output
+    is identical to infer_frame. statistics is None when they still need
+    computing ({'fields_info', 'duplicate_rows'} otherwise). With
+    approximate statistics (sketches.column_statistics) the row hash is
+    built from value hashes instead of factorized codes and its repeats
+    are found with a Bloom filter, and row block workers also return
+    mergeable per-column aggregators, so tall frames get statistics too.
+    Columns are only measured into profile when the frame is converted in
+    this process.
+    """
+    workers = resolve_workers(workers)
+    rows, cols = df.shape
+    if workers < 2 or rows * cols < PARALLEL_MIN_CELLS:
+        df, column_types = infer_frame(df, profile=profile)
+        return df, column_types, None
+
+    shared, layout, local = _share_columns(df)
+    if shared is None:
+        df, column_types = infer_frame(df, profile=profile)
+        return df, column_types, None
+    try:
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            if cols < workers and rows >= ROW_BLOCK_MIN_ROWS:
+                return _by_row_blocks(df, pool, workers, shared, layout, local, approximate, error)
+            return _by_columns(df, pool, workers, shared, layout, local, approximate, error)
+    finally:
+        shared.close()
+        shared.unlink()
+
+
+def _by_columns(df, pool, workers, shared, layout, local, approximate, error):
+    positions = sorted(layout)
+    # Interleaved shards balance the wide text columns across workers
+    shards = [positions[i::workers] for i in range(workers) if positions[i::workers]]
+    futures = [pool.submit(_convert_columns, shared.name, {p: layout[p] for p in shard}, len(df), approximate, error)
+               for shard in shards]
+
+    results = {}
+    for future in futures:
+        results.update(future.result())
+    for position in local:
+        converted, kind = infer_column(df.iloc[:, position])
+        results[position] = (converted.to_numpy(), kind, column_statistics(converted, approximate, error),
+                             _row_codes(converted, approximate))
+
+    columns, column_types, fields_info = [], {}, {}
+    row_hash = np.zeros(len(df), dtype=np.uint64)
+    for position in range(df.shape[1]):
+        values, kind, stats, codes = results[position]
+        name = df.columns[position]
+        columns.append(pd.Series(values, index=df.index, name=name))
+        column_types[name] = kind
+        fields_info[name] = stats
+        with np.errstate(over='ignore'):
+            row_hash = row_hash * HASH_MULTIPLIER + codes
+
+    result = pd.concat(columns, axis=1) if columns else df
+    duplicate_rows = count_duplicates(result, row_hash, error) if approximate else _count_duplicates(result, row_hash)
+    return result, column_types, {"fields_info": fields_info, "duplicate_rows": duplicate_rows}
+
+
+def _by_row_blocks(df, pool, workers, shared, layout, local, approximate, error):
+    bounds = np.linspace(0, len(df), workers + 1).astype(int)
+    blocks = [(int(start), int(end)) for start, end in zip(bounds[:-1], bounds[1:]) if end > start]
+    futures = [pool.submit(_convert_rows, shared.name, layout, len(df), start, end, approximate, error)
+               for start, end in blocks]
+    block_results = [future.result() for future in futures]
+
+    columns, column_types, fields_info = [], {}, {}
+    row_hash = np.zeros(len(df), dtype=np.uint64)
+    for position in range(df.shape[1]):
+        name = df.columns[position]
+        if position in local:
+            converted, kind = infer_column(df.iloc[:, position])
+            if approximate:
+                fields_info[name] = column_statistics(converted, approximate, error)
+        else:
+            values = np.concatenate([block[position][0] for block in block_results])
+            kinds = set().union(*[block[position][1] for block in block_results])
+            converted = pd.Series(values, index=df.index, name=name, dtype=object).infer_objects()
+            kind = column_kind(kinds)
+            if approximate:
+                # Block aggregators merged in row order are the aggregator of the whole column
+                aggregator = block_results[0][position][2]
+                for block in block_results[1:]:
+                    aggregator.merge(block[position][2])
+                fields_info[name] = aggregator.to_field_info(as_float=converted.dtype.kind == 'f')
+        if approximate:
+            # Hashed after merging: a value's type can change when the blocks are combined (1 and 1.0)
+            with np.errstate(over='ignore'):
+                row_hash = row_hash * HASH_MULTIPLIER + _row_codes(converted, True)
+        columns.append(converted)
+        column_types[name] = kind
+    result = pd.concat(columns, axis=1)
+    if not approximate:
+        return result, column_types, None
+    return result, column_types, {"fields_info": fields_info,
+                                  "duplicate_rows": count_duplicates(result, row_hash, error)}
+
+
+def _row_codes(converted, approximate):
+    """Per-row values combined into the row hash: factorize codes, or value hashes when approximate"""
+    if approximate:
+        # No hash table of the whole column; equal values still hash equally
+        return pd.util.hash_array(converted.to_numpy()) + np.uint64(1)
+    return (pd.factorize(converted)[0].astype(np.int64) + 1).astype(np.uint64)
+
+
+def _count_duplicates(df, row_hash):
+    """Exact df.duplicated().sum(): only rows sharing a hash are compared"""
+    candidates = pd.Series(row_hash).duplicated(keep=False).to_numpy()
+    if not candidates.any():
+        return 0
+    return int(df.iloc[np.flatnonzero(candidates)].duplicated().sum())
+
+
+def _share_columns(df):
+    """Copy raw columns into one shared memory segment.
+
+    Numeric columns are stored as-is and text columns as fixed-width
+    UTF-32 with a null mask. Columns that cannot round-trip that way
+    (mixed Python objects, strings ending in NUL) are returned in `local`
+    and converted in this process, as are text columns whose width (set by
+    their longest value) would need more than SHARED_TEXT_MAX_RATIO times
+    the memory of the column itself.
+    """
+    layout, local, arrays = {}, [], []
+    offset = 0
+    for position in range(df.shape[1]):
+        series = df.iloc[:, position]
+        if series.dtype.kind in 'biuf':
+            data, nulls = series.to_numpy(), None
+        elif series.dtype.kind == 'O' and pd.api.types.infer_dtype(series, skipna=True) in ('string', 'empty'):
+            null_mask = series.isna().to_numpy()
+            text = series.where(~null_mask, '')
+            if text.str.endswith('\x00').any():
+                local.append(position)
+                continue
+            width = max(int(text.str.len().max() or 0), 1)
+            if len(text) * width * 4 > SHARED_TEXT_MAX_RATIO * series.memory_usage(index=False, deep=True):
+                local.append(position)
+                continue
+            data, nulls = text.to_numpy(dtype=f'U{width}'), null_mask
+        else:
+            local.append(position)
+            continue
+
+        entry = {"dtype": data.dtype.str, "offset": offset, "nulls": None}
+        arrays.append((offset, data))
+        offset += data.nbytes
+        if nulls is not None:
+            entry["nulls"] = offset
+            arrays.append((offset, nulls))
+            offset += nulls.nbytes
+        layout[position] = entry
+
+    if not layout:
+        return None, layout, local
+    shared = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    for start, data in arrays:
+        np.ndarray(data.shape, dtype=data.dtype, buffer=shared.buf, offset=start)[:] = data
+    return shared, layout, local
+
+
+def _read_column(shared, entry, rows, start=0, end=None):
+    end = rows if end is None else end
+    dtype = np.dtype(entry["dtype"])
+    data = np.ndarray((rows,), dtype=dtype, buffer=shared.buf, offset=entry["offset"])[start:end]
+    if entry["nulls"] is None:
+        return pd.Series(data.copy())
+    nulls = np.ndarray((rows,), dtype=bool, buffer=shared.buf, offset=entry["nulls"])[start:end]
+    values = data.astype(object)
+    values[nulls] = np.nan
+    return pd.Series(values, dtype=object)
+
+
+def _convert_columns(name, layout, rows, approximate, error):
+    """Worker: convert whole columns and compute their statistics"""
+    # Workers share the parent's resource tracker, which unlinks the segment only once
+    shared = shared_memory.SharedMemory(name=name)
+    try:
+        results = {}
+        for position, entry in layout.items():
+            converted, kind = infer_column(_read_column(shared, entry, rows))
+            results[position] = (converted.to_numpy(), kind, column_statistics(converted, approximate, error),
+                                 _row_codes(converted, approximate))
+        return results
+    finally:
+        shared.close()
+
+
+def _convert_rows(name, layout, rows, start, end, approximate, error):
+    """Worker: convert one row block of every shared column.
+
+    With approximate statistics each column also gets a FieldAggregator of
+    the block, sampled with a seed of its own so blocks are independent.
+    """
+    # Workers share the parent's resource tracker, which unlinks the segment only once
+    shared = shared_memory.SharedMemory(name=name)
+    try:
+        results = {}
+        for position, entry in layout.items():
+            values, kinds = convert_values(_read_column(shared, entry, rows, start, end))
+            if not approximate:
+                results[position] = (values, kinds)
+                continue
+            aggregator = FieldAggregator(error=error, seed=(SAMPLE_SEED, start))
+            aggregator.update(pd.Series(values, dtype=object))
+            results[position] = (values, kinds, aggregator)
+        return results
+    finally:
+        shared.close()
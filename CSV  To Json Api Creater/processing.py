@@ -0,0 +1,444 @@
+import os
+import re
+from datetime import datetime
+import pandas as pd
+from inference import infer_frame, smart_convert_value
+from detection import detect_csv_format, read_csv_with_format, remember_format
+from streaming import stream_to_sink, sink_for_path
+from parallel import parallel_infer_frame
+from store import dictionary_encode, frame_records
+from sketches import column_statistics, count_duplicates, row_hashes, resolve_mode, DEFAULT_ERROR
+from incremental import process_incremental, supports_incremental
+from excel import open_workbook, select_sheets, read_sheet, read_sheets
+from profiling import Profile, capture, history
+
+
+class FileProcessor:
+    """Loading, cleaning and JSON API generation without any Qt dependency.
+
+    Progress, status and preview updates go to optional callbacks, so the
+    same core runs inside the GUI's DataProcessor thread, the batch
+    converter and the headless server.
+    """
+    
+    def __init__(self, file_path, config, on_progress=None, on_status=None, on_preview=None):
+        self.file_path = file_path
+        self.config = config
+        self.df = None
+        self.column_types = {}
+        self.column_statistics = None  # fields_info and duplicate count when workers computed them
+        self.incremental_state = None  # offset and statistics for the next incremental run
+        self.sheet_frames = {}  # cleaned frames of the additional Excel sheets, by sheet key
+        self.sheet_titles = {}  # sheet key -> name in the workbook
+        self.primary_sheet = None  # key of the sheet loaded into self.df when several are read
+        self.sheet_stats = []  # rows and load time per Excel sheet
+        # Wall/CPU time, peak memory and rows/s of each stage and column conversion;
+        # process() reports it to profiling.history
+        self.profile = Profile(os.path.basename(file_path))
+        self.on_progress = on_progress
+        self.on_status = on_status
+        self.on_preview = on_preview
+    
+    def report_progress(self, value):
+        if self.on_progress:
+            self.on_progress(value)
+    
+    def report_status(self, message):
+        if self.on_status:
+            self.on_status(message)
+    
+    def report_preview(self, headers, data):
+        if self.on_preview:
+            self.on_preview(headers, data)
+    
+    def process(self):
+        """Run the whole pipeline and return the API structure.
+        
+        With config['profile_path'] the run is also captured with cProfile and
+        tracemalloc, both reports written when it ends (see profiling.capture).
+        """
+        self.profile.attach(history)
+        profile_path = self.config.get('profile_path')
+        if not profile_path:
+            return self.run_pipeline()
+        with capture(profile_path):
+            api_data = self.run_pipeline()
+        self.report_status(f"Profile written to {os.path.basename(profile_path)}")
+        return api_data
+    
+    def run_pipeline(self):
+        self.report_status("Starting file processing...")
+        self.report_progress(5)
+        
+        if self.config.get('streaming', False):
+            return self.run_streaming()
+        
+        if self.config.get('incremental', False) and not self.config.get('preview_only', False):
+            if supports_incremental(self.file_path):
+                return self.run_incremental()
+            self.report_status("Incremental mode needs a delimited CSV file; processing it in full")
+        
+        # Load file based on extension
+        file_ext = os.path.splitext(self.file_path)[1].lower()
+        
+        if file_ext == '.csv':
+            self.df = self.load_csv_file()
+        elif file_ext in ['.xlsx', '.xls']:
+            with self.profile.stage('load') as stage:
+                self.df = self.load_excel_file()
+                stage.rows = len(self.df)
+        else:
+            raise ValueError(f"Unsupported file format: {file_ext}")
+        
+        self.report_progress(30)
+        self.report_status("Processing data...")
+        
+        # Clean and process data
+        with self.profile.stage('clean') as stage:
+            self.clean_data()
+            stage.rows = len(self.df)
+        self.report_progress(60)
+        
+        # Generate preview
+        with self.profile.stage('preview'):
+            headers = list(self.df.columns)
+            preview_data = []
+            for _, row in self.df.head(10).iterrows():
+                preview_data.append([str(val) if pd.notna(val) else "" for val in row])
+        
+        self.report_preview(headers, preview_data)
+        self.report_progress(80)
+        
+        # Generate JSON API
+        api_data = self.generate_json_api()
+        if self.sheet_titles:
+            api_data['api_info']['sheet'] = self.primary_sheet
+            api_data['api_info']['sheet_title'] = self.sheet_titles[self.primary_sheet]
+            api_data['sheets'] = self.process_sheets()
+        self.report_progress(100)
+        
+        self.report_status("Processing completed successfully!")
+        return api_data
+    
+    def run_streaming(self):
+        """Process the file in chunks, writing records straight to the output file"""
+        output_path = self.config.get('output_path')
+        if not output_path:
+            raise ValueError("Streaming mode requires an output file")
+        
+        self.report_status("Streaming file in chunks...")
+        with self.profile.stage('stream') as stage:
+            api_data = stream_to_sink(
+                self.file_path,
+                sink_for_path(output_path),
+                self.clean_column_name,
+                self.config,
+                on_progress=lambda fraction: self.report_progress(5 + int(fraction * 90)),
+                on_status=self.report_status
+            )
+            stage.rows = api_data['metadata']['total_records']
+        
+        headers = api_data['metadata']['fields']
+        preview_data = [["" if record.get(col) is None else str(record.get(col)) for col in headers]
+                        for record in api_data['data'][:10]]
+        self.report_preview(headers, preview_data)
+        self.report_progress(100)
+        
+        self.report_status(f"Streaming completed: {api_data['metadata']['total_records']:,} records written to {os.path.basename(output_path)}")
+        return api_data
+    
+    def run_incremental(self):
+        """Parse only the lines appended since the previous run (config['incremental_state'])"""
+        self.report_status("Checking for appended records...")
+        with self.profile.stage('incremental') as stage:
+            api_data, self.df, self.column_types, self.incremental_state = process_incremental(
+                self.file_path,
+                self.config.get('incremental_state'),
+                self.clean_column_name,
+                on_status=self.report_status,
+                error=self.statistics_error()
+            )
+            stage.rows = len(self.df)
+        self.report_progress(80)
+        
+        headers = list(self.df.columns)
+        preview_data = [[str(val) if pd.notna(val) else "" for val in row]
+                        for row in self.df.head(10).itertuples(index=False)]
+        self.report_preview(headers, preview_data)
+        self.report_progress(100)
+        
+        appended = api_data.get('appended')
+        if appended:
+            self.report_status(f"Appended {appended['rows']:,} records ({api_data['metadata']['total_records']:,} in total)")
+        else:
+            self.report_status("Processing completed successfully!")
+        return api_data
+    
+    def load_csv_file(self):
+        """Load CSV file using one-pass encoding and delimiter detection"""
+        try:
+            self.report_status("Analyzing CSV structure...")
+            
+            # Detection reads a single byte sample and is cached per file version
+            with self.profile.stage('detect'):
+                csv_format = detect_csv_format(self.file_path)
+            
+            with self.profile.stage('parse') as stage:
+                try:
+                    df = self.read_csv(csv_format)
+                except UnicodeDecodeError:
+                    # The sample was valid UTF-8 but a later byte is not; latin-1 decodes anything
+                    csv_format = remember_format(self.file_path, dict(csv_format, encoding='latin-1'))
+                    df = self.read_csv(csv_format)
+                stage.rows = len(df)
+            
+            if csv_format['fixed_width']:
+                self.report_status(f"CSV loaded as fixed-width with {csv_format['encoding']} encoding")
+            else:
+                self.report_status(f"CSV loaded with {csv_format['encoding']} encoding and '{csv_format['delimiter']}' delimiter")
+            
+            return df
+            
+        except Exception as e:
+            raise Exception(f"CSV loading error: {str(e)}")
+    
+    def read_csv(self, csv_format):
+        """Parse the whole file, reporting progress (5-30%) as the parser consumes its blocks"""
+        if not self.on_progress:
+            return read_csv_with_format(self.file_path, csv_format)
+        size = os.path.getsize(self.file_path) or 1
+        with open(self.file_path, 'rb') as handle:
+            reader = _ProgressReader(handle, lambda position: self.report_progress(5 + 25 * min(position, size) // size))
+            return read_csv_with_format(reader, csv_format)
+    
+    def load_excel_file(self):
+        """Load the selected sheet(s), opening the workbook only once.
+        
+        config['sheets'] is None/'first' (the first non-empty sheet), 'all',
+        or a list / comma-separated string of sheet names. With several
+        sheets the first non-empty one becomes self.df and the others are
+        kept in self.sheet_frames, each served under its own namespace.
+        """
+        try:
+            self.report_status("Loading Excel file...")
+            excel_file = open_workbook(self.file_path)
+            selection = self.config.get('sheets')
+            
+            if selection in (None, '', 'first'):
+                # Later sheets are only parsed while the earlier ones are empty
+                for sheet_name in excel_file.sheet_names:
+                    df, seconds = read_sheet(self.file_path, sheet_name, excel_file)
+                    if not df.empty:
+                        break
+                self.record_sheet(sheet_name, df, seconds)
+                if sheet_name != excel_file.sheet_names[0]:
+                    self.report_status(f"Using sheet: {sheet_name}")
+                return df
+            
+            sheet_names = select_sheets(excel_file.sheet_names, selection)
+            loaded = read_sheets(self.file_path, sheet_names, self.config.get('workers', 1), excel_file)
+            frames = {}
+            for sheet_name, (df, seconds) in loaded.items():
+                self.record_sheet(sheet_name, df, seconds)
+                if df.empty:
+                    self.report_status(f"Skipping empty sheet: {sheet_name}")
+                    continue
+                key = self.clean_column_name(sheet_name)
+                while key in frames:
+                    key += '_'
+                frames[key] = df
+                self.sheet_titles[key] = sheet_name
+            
+            if not frames:
+                raise ValueError("No readable sheets found in Excel file")
+            self.primary_sheet = next(iter(frames))
+            df = frames.pop(self.primary_sheet)
+            self.sheet_frames = frames
+            return df
+            
+        except Exception as e:
+            raise Exception(f"Excel loading error: {str(e)}")
+    
+    def record_sheet(self, sheet_name, df, seconds):
+        rate = len(df) / seconds if seconds > 0 else 0
+        self.sheet_stats.append({"sheet": sheet_name, "rows": len(df), "seconds": round(seconds, 3),
+                                 "rows_per_second": round(rate)})
+        self.report_status(f"Sheet '{sheet_name}': {len(df):,} rows in {seconds:.2f}s ({rate:,.0f} rows/s)")
+    
+    def process_sheets(self):
+        """Clean each additional sheet and build its own API structure, keyed like /api/sheets/<key>/"""
+        sheets = {}
+        for key, df in self.sheet_frames.items():
+            self.report_status(f"Processing sheet '{self.sheet_titles[key]}'...")
+            sheet = FileProcessor(self.file_path, dict(self.config, sheets=None))
+            sheet.df = df
+            with self.profile.stage(f"sheet:{key}", len(df)):
+                sheet.clean_data()
+                sheet_api = sheet.generate_json_api()
+            for column in sheet.profile.columns:
+                column.name = f"{key}.{column.name}"
+                self.profile.columns.append(column)
+            sheet_api['api_info']['sheet'] = key
+            sheet_api['api_info']['sheet_title'] = self.sheet_titles[key]
+            sheet_api['endpoints'] = {name: path.replace('/api/', f'/api/sheets/{key}/', 1)
+                                      for name, path in sheet_api['endpoints'].items()}
+            sheets[key] = sheet_api
+            self.sheet_frames[key] = sheet.df
+        return sheets
+    
+    def clean_data(self):
+        """Clean and standardize data"""
+        try:
+            self.report_status("Cleaning data...")
+            
+            # Clean column names
+            self.df.columns = [self.clean_column_name(col) for col in self.df.columns]
+            
+            # Remove completely empty rows and columns
+            self.df = self.df.dropna(how='all').dropna(axis=1, how='all')
+            
+            # Convert data types intelligently, one vectorized pass per column
+            workers = self.config.get('workers', 1)
+            if workers == 1:
+                self.df, self.column_types = infer_frame(self.df, profile=self.profile)
+            else:
+                self.report_status("Cleaning data in parallel...")
+                self.df, self.column_types, self.column_statistics = parallel_infer_frame(
+                    self.df, workers, self.profile, self.approximate_statistics(), self.statistics_error())
+            
+            self.report_status(f"Data cleaned: {len(self.df)} rows, {len(self.df.columns)} columns")
+            
+        except Exception as e:
+            raise Exception(f"Data cleaning error: {str(e)}")
+    
+    def clean_column_name(self, name):
+        """Clean column names for API compatibility"""
+        # Convert to string and strip whitespace
+        name = str(name).strip()
+        
+        # Replace spaces and special characters with underscores
+        name = re.sub(r'[^\w]', '_', name)
+        
+        # Remove multiple consecutive underscores
+        name = re.sub(r'_+', '_', name)
+        
+        # Remove leading/trailing underscores
+        name = name.strip('_')
+        
+        # Ensure it doesn't start with a number
+        if name and name[0].isdigit():
+            name = 'col_' + name
+        
+        # Handle empty names
+        if not name:
+            name = 'unnamed_column'
+        
+        return name.lower()
+    
+    def approximate_statistics(self):
+        """Whether fields_info and duplicates come from sketches (config['statistics']: auto, exact or approximate)"""
+        return resolve_mode(self.config.get('statistics'), len(self.df)) == 'approximate'
+    
+    def statistics_error(self):
+        return self.config.get('statistics_error', DEFAULT_ERROR)
+    
+    def smart_convert_value(self, value):
+        """Intelligently convert values to appropriate types"""
+        return smart_convert_value(value)
+    
+    def generate_json_api(self):
+        """Generate comprehensive JSON API structure"""
+        try:
+            self.report_status("Generating JSON API...")
+            
+            # Generate field information (already done by the workers in parallel mode)
+            if self.column_statistics:
+                fields_info = self.column_statistics['fields_info']
+                duplicate_rows = self.column_statistics['duplicate_rows']
+            else:
+                approximate, error = self.approximate_statistics(), self.statistics_error()
+                with self.profile.stage('statistics', len(self.df)):
+                    fields_info = {col: column_statistics(self.df[col], approximate, error) for col in self.df.columns}
+                with self.profile.stage('duplicates', len(self.df)):
+                    if approximate:
+                        # Still exact, but only rows whose hashes repeat are compared
+                        duplicate_rows = count_duplicates(self.df, row_hashes(self.df), error)
+                    else:
+                        duplicate_rows = int(self.df.duplicated().sum())
+            
+            # Low-cardinality strings are held once, in the frame and in the records built from it
+            with self.profile.stage('encoding', len(self.df)):
+                self.df, encoding = dictionary_encode(self.df, fields_info)
+            
+            # Convert DataFrame to records
+            with self.profile.stage('records', len(self.df)):
+                records = frame_records(self.df)
+            
+            # Null counts are exact in both modes, so the frame is not scanned again
+            if len(fields_info) == len(self.df.columns):
+                null_cells = sum(info['null_count'] for info in fields_info.values())
+            else:
+                null_cells = int(self.df.isna().sum().sum())
+            cells = len(self.df) * len(self.df.columns)
+            
+            # Generate API structure
+            api_structure = {
+                "api_info": {
+                    "version": "1.0",
+                    "title": f"{os.path.splitext(os.path.basename(self.file_path))[0]} API",
+                    "description": f"Generated JSON API from {os.path.splitext(self.file_path)[1]} file",
+                    "generated_at": datetime.now().isoformat(),
+                    "source_file": os.path.basename(self.file_path)
+                },
+                "metadata": {
+                    "total_records": len(records),
+                    "total_fields": len(self.df.columns),
+                    "fields": list(self.df.columns),
+                    "fields_info": fields_info,
+                    "data_quality": {
+                        "empty_rows_removed": 0,  # Could track this
+                        "duplicate_rows": duplicate_rows,
+                        "completeness_score": round((1 - null_cells / cells) * 100, 2) if cells else 0.0,
+                        **encoding
+                    }
+                },
+                "endpoints": {
+                    "get_all": "/api/data",
+                    "get_by_id": "/api/data/{id}",
+                    "search": "/api/data/search?q={query}",
+                    "filter": "/api/data/filter?field={field}&value={value}",
+                    "paginate": "/api/data?page={page}&limit={limit}",
+                    "fields": "/api/fields",
+                    "stats": "/api/stats"
+                },
+                "data": records[:self.config.get('preview_limit', 1000)] if self.config.get('preview_only', False) else records
+            }
+            
+            return api_structure
+            
+        except Exception as e:
+            raise Exception(f"JSON API generation error: {str(e)}")
+
+
+class _ProgressReader:
+    """Binary file wrapper calling on_read(position) after each block the CSV parser reads"""
+    
+    def __init__(self, handle, on_read):
+        self.handle = handle
+        self.on_read = on_read
+    
+    def read(self, size=-1):
+        data = self.handle.read(size)
+        self.on_read(self.handle.tell())
+        return data
+    
+    def read1(self, size=-1):
+        data = self.handle.read1(size)
+        self.on_read(self.handle.tell())
+        return data
+    
+    def __iter__(self):
+        return iter(self.handle)
+    
+    def __getattr__(self, name):
+        return getattr(self.handle, name)
@@ -0,0 +1,284 @@
+import cProfile
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+# Frames kept per allocation in capture mode, and allocation sites listed in the memory report
+TRACEMALLOC_FRAMES = 10
+MEMORY_REPORT_LINES = 30
+METRIC_PREFIX = 'csvapi'
+
+
+class StageMetrics:
+    """Wall time, CPU time, peak memory and rows of one measured stage or column conversion"""
+
+    def __init__(self, name, rows=None):
+        self.name = name
+        self.rows = rows  # set by the caller when the row count is only known afterwards
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.peak_memory_bytes = None
+
+    @property
+    def rows_per_second(self):
+        if not self.rows or self.wall_seconds <= 0:
+            return None
+        return self.rows / self.wall_seconds
+
+    def to_dict(self):
+        rate = self.rows_per_second
+        return {
+            "name": self.name,
+            "wall_seconds": round(self.wall_seconds, 6),
+            "cpu_seconds": round(self.cpu_seconds, 6),
+            "peak_memory_bytes": self.peak_memory_bytes,
+            "rows": self.rows,
+            "rows_per_second": round(rate) if rate is not None else None
+        }
+
+
+class Profile:
+    """Stage and column timings of one pipeline run.
+
+    CPU time is that of the calling thread, so requests served by other
+    threads meanwhile are not counted (work done by worker processes is not
+    either). Peak memory is the tracemalloc peak during the stage while
+    tracemalloc is tracing (capture mode), otherwise the process's
+    resident-set high-water mark when the stage ends, which is only a
+    stage's own peak when it set a new record; None where neither is
+    available. Stages measured after the pipeline returns (serializing,
+    building the server's indexes) are added to the same profile, and each
+    finished stage is added to history's totals.
+    """
+
+    def __init__(self, source=None, history=None):
+        self.source = source
+        self.history = history
+        self.started_at = time.time()
+        self.stages = []
+        self.columns = []
+        self._peaks = []  # tracemalloc peaks seen by the enclosing measurements
+        if history is not None:
+            self.attach(history)
+
+    def attach(self, history):
+        """Report this profile, and the stages finished from now on, to history"""
+        self.history = history
+        history.begin(self)
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        """Measure the block as a pipeline stage; yields its StageMetrics"""
+        with self._measure(self.stages, name, rows) as metrics:
+            yield metrics
+        if self.history is not None:
+            self.history.add(metrics)
+
+    @contextmanager
+    def column(self, name, rows=None):
+        """Measure the block as the conversion of one column"""
+        with self._measure(self.columns, name, rows) as metrics:
+            yield metrics
+
+    @property
+    def wall_seconds(self):
+        return sum(stage.wall_seconds for stage in self.stages)
+
+    def to_dict(self):
+        return {
+            "source": self.source,
+            "started_at": self.started_at,
+            "wall_seconds": round(self.wall_seconds, 6),
+            "stages": [stage.to_dict() for stage in self.stages],
+            "columns": [column.to_dict() for column in self.columns]
+        }
+
+    def format_table(self):
+        """Plain-text table of the stages, slowest columns last"""
+        lines = [f"{'stage':<24}{'wall s':>10}{'cpu s':>10}{'peak MB':>10}{'rows':>12}{'rows/s':>14}"]
+        rows = self.stages + sorted(self.columns, key=lambda column: -column.wall_seconds)[:10]
+        for position, metrics in enumerate(rows):
+            if position == len(self.stages):
+                lines.append("slowest columns:")
+            peak = f"{metrics.peak_memory_bytes / 1e6:.1f}" if metrics.peak_memory_bytes is not None else "-"
+            rate = f"{metrics.rows_per_second:,.0f}" if metrics.rows_per_second is not None else "-"
+            count = f"{metrics.rows:,}" if metrics.rows is not None else "-"
+            lines.append(f"{metrics.name[:23]:<24}{metrics.wall_seconds:>10.3f}{metrics.cpu_seconds:>10.3f}"
+                         f"{peak:>10}{count:>12}{rate:>14}")
+        return "\n".join(lines)
+
+    @contextmanager
+    def _measure(self, target, name, rows):
+        metrics = StageMetrics(name, rows)
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            # reset_peak is global: keep the peak the enclosing measurement had reached so far
+            if self._peaks:
+                self._peaks[-1] = max(self._peaks[-1], tracemalloc.get_traced_memory()[1])
+            self._peaks.append(0)
+            tracemalloc.reset_peak()
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield metrics
+        finally:
+            metrics.wall_seconds = time.perf_counter() - wall
+            metrics.cpu_seconds = time.thread_time() - cpu
+            if tracing:
+                peak = max(self._peaks.pop(), tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else 0)
+                if self._peaks:
+                    self._peaks[-1] = max(self._peaks[-1], peak)
+                metrics.peak_memory_bytes = peak
+            else:
+                metrics.peak_memory_bytes = max_rss_bytes()
+            target.append(metrics)
+
+
+def max_rss_bytes():
+    """High-water mark of the process's resident set size (None without the resource module)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+@contextmanager
+def capture(path):
+    """Run the block under cProfile and tracemalloc, writing both reports when it ends.
+
+    path receives the cProfile statistics (open them with pstats or
+    snakeviz); the tracemalloc report, the allocation sites holding the
+    most memory at the end plus the peak, goes next to it as
+    <path without extension>.memory.txt. Only the calling thread is
+    profiled; tracemalloc sees every thread.
+    """
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        if started_tracing:
+            tracemalloc.stop()
+        profiler.dump_stats(path)
+        write_memory_report(memory_report_path(path), snapshot, current, peak)
+
+
+def memory_report_path(path):
+    return f"{os.path.splitext(path)[0]}.memory.txt"
+
+
+def write_memory_report(path, snapshot, current, peak):
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__)
+    ])
+    with open(path, 'w', encoding='utf-8') as handle:
+        handle.write(f"traced memory: {current / 1e6:.1f} MB at the end, {peak / 1e6:.1f} MB peak\n\n")
+        handle.write(f"top {MEMORY_REPORT_LINES} allocation sites still holding memory:\n")
+        for statistic in snapshot.statistics('lineno')[:MEMORY_REPORT_LINES]:
+            handle.write(f"{statistic}\n")
+
+
+class ProfileHistory:
+    """The latest profile and per-stage running totals of every run in this process"""
+
+    def __init__(self):
+        self.last = None
+        self.runs = 0
+        self.totals = {}  # stage -> {'count', 'wall_seconds', 'cpu_seconds', 'rows'}
+        self.lock = threading.Lock()
+
+    def begin(self, profile):
+        with self.lock:
+            self.last = profile
+            self.runs += 1
+
+    def add(self, stage):
+        with self.lock:
+            total = self.totals.setdefault(stage.name, {"count": 0, "wall_seconds": 0.0,
+                                                        "cpu_seconds": 0.0, "rows": 0})
+            total["count"] += 1
+            total["wall_seconds"] += stage.wall_seconds
+            total["cpu_seconds"] += stage.cpu_seconds
+            total["rows"] += stage.rows or 0
+
+    def snapshot(self):
+        with self.lock:
+            return self.last, self.runs, {name: dict(total) for name, total in self.totals.items()}
+
+
+# Every FileProcessor run in this process; /api/metrics reports it
+history = ProfileHistory()
+
+
+def prometheus_text(families):
+    """Prometheus text exposition of [(name, type, help, [(labels, value)])]"""
+    lines = []
+    for name, kind, description, samples in families:
+        name = f"{METRIC_PREFIX}_{name}"
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            if value is None:
+                continue
+            label_text = ','.join(f'{key}="{_escape_label(label)}"' for key, label in labels.items())
+            lines.append(f"{name}{{{label_text}}} {value!r}" if label_text else f"{name} {value!r}")
+    return "\n".join(lines) + "\n"
+
+
+def profile_families(history=history):
+    """Metric families of the pipeline runs: last run per stage and column, totals per stage"""
+    last, runs, totals = history.snapshot()
+    # Lists are only appended to, so copies are consistent enough for a scrape
+    stages, columns = (list(last.stages), list(last.columns)) if last is not None else ([], [])
+    families = [("pipeline_runs_total", "counter", "Pipeline runs in this process", [({}, runs)])]
+    total_metrics = [
+        ("stage_runs_total", "counter", "Runs of each pipeline stage", "count"),
+        ("stage_wall_seconds_total", "counter", "Wall time spent in each pipeline stage", "wall_seconds"),
+        ("stage_cpu_seconds_total", "counter", "CPU time spent in each pipeline stage", "cpu_seconds"),
+        ("stage_rows_total", "counter", "Rows handled by each pipeline stage", "rows")
+    ]
+    for name, kind, description, key in total_metrics:
+        families.append((name, kind, description,
+                         [({"stage": stage}, _number(total[key])) for stage, total in totals.items()]))
+    if last is None:
+        return families
+
+    source = last.source or ""
+    last_metrics = [
+        ("wall_seconds", "Wall time", lambda m: m.wall_seconds),
+        ("cpu_seconds", "CPU time", lambda m: m.cpu_seconds),
+        ("peak_memory_bytes", "Peak memory", lambda m: m.peak_memory_bytes),
+        ("rows_per_second", "Throughput", lambda m: m.rows_per_second)
+    ]
+    for kind, items, label in (("stage", stages, "stage"), ("column", columns, "column")):
+        for suffix, description, value in last_metrics:
+            families.append((f"last_{kind}_{suffix}", "gauge", f"{description} of each {kind} in the last run",
+                             [({"source": source, label: metrics.name}, _number(value(metrics)))
+                              for metrics in items]))
+    return families
+
+
+def _number(value):
+    if value is None:
+        return None
+    return round(value, 6) if isinstance(value, float) else value
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
@@ -0,0 +1,207 @@
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from snapshot import save_snapshot, load_snapshot, snapshot_version
+
+
+DEFAULT_MEMORY_BUDGET = 1024 * 1024 * 1024
+# Path segments of the unnamed routes; a dataset with one of these names could never be reached
+RESERVED_NAMES = {'data', 'fields', 'stats', 'csv-format', 'status', 'upload', 'sheets', 'datasets', 'jobs', 'metrics',
+                  'export.json', 'export.csv', 'export.ndjson'}
+NAME_PATTERN = re.compile(r'^[A-Za-z0-9][A-Za-z0-9_.-]*$')
+
+
+class RegistryEntry:
+    """A named dataset: its Dataset while in memory, its snapshot directory once saved"""
+
+    def __init__(self, name, snapshot_path=None, dataset=None):
+        self.name = name
+        self.snapshot_path = snapshot_path
+        self.snapshot_version = snapshot_version(snapshot_path) if snapshot_path else None
+        self.dataset = dataset
+        self.nbytes = dataset.nbytes if dataset is not None else 0
+        self.owns_snapshot = False  # written by the registry, removed with the entry
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.evictions = 0
+        self.last_used = None
+        self.load_lock = threading.Lock()  # one load or eviction of this entry at a time
+
+    def stats(self):
+        return {
+            "name": self.name,
+            "loaded": self.dataset is not None,
+            "records": len(self.dataset.store) if self.dataset is not None else None,
+            "nbytes": self.nbytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "loads": self.loads,
+            "evictions": self.evictions,
+            "last_used": self.last_used,
+            "snapshot": self.snapshot_path
+        }
+
+
+class DatasetRegistry:
+    """Named datasets under a shared memory budget, evicted least recently used first.
+
+    An evicted dataset keeps only its snapshot directory (saved on first
+    eviction for datasets that were added in memory) and is mapped again by
+    the next request for it, so cold feeds cost disk space instead of RAM.
+    A request that already holds a Dataset keeps using it even if the entry
+    is evicted meanwhile; Datasets are never modified. build(name,
+    api_data, store, search_index, filter_index, load_token) turns a loaded
+    snapshot into a Dataset.
+    """
+
+    def __init__(self, build, memory_budget=DEFAULT_MEMORY_BUDGET, directory=None, log=print):
+        self.build = build
+        self.memory_budget = memory_budget
+        self.directory = directory
+        self.log = log
+        self.entries = OrderedDict()  # least recently used first
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, name):
+        return name in self.entries
+
+    @property
+    def used_bytes(self):
+        with self.lock:
+            return sum(entry.nbytes for entry in self.entries.values() if entry.dataset is not None)
+
+    def register(self, name, snapshot_path):
+        """Serve a snapshot under name; it is mapped on the first request"""
+        self._put(RegistryEntry(validate_name(name), snapshot_path=snapshot_path))
+
+    def refresh(self, name, snapshot_path):
+        """Register name unless it already serves this snapshot unchanged; True when it was (re)registered.
+
+        An unchanged dataset keeps its entry, so it stays mapped and its counters keep counting.
+        """
+        with self.lock:
+            entry = self.entries.get(name)
+            current = (entry is not None and entry.snapshot_path == snapshot_path and
+                       entry.snapshot_version == snapshot_version(snapshot_path))
+        if current:
+            return False
+        self.register(name, snapshot_path)
+        return True
+
+    def add(self, name, dataset):
+        """Serve an in-memory Dataset under name, replacing any dataset of that name"""
+        entry = RegistryEntry(validate_name(name), dataset=dataset)
+        entry.loads = 1
+        entry.last_used = time.time()
+        self._put(entry)
+        self.enforce_budget(keep=name)
+
+    def remove(self, name):
+        with self.lock:
+            entry = self.entries.pop(name, None)
+        if entry is None:
+            return False
+        self._discard(entry)
+        return True
+
+    def get(self, name):
+        """The Dataset for name, loading it from its snapshot when evicted (None if unknown)"""
+        with self.lock:
+            entry = self.entries.get(name)
+            if entry is None:
+                return None
+            self.entries.move_to_end(name)
+            entry.last_used = time.time()
+            dataset = entry.dataset
+            if dataset is not None:
+                entry.hits += 1
+                return dataset
+
+        with entry.load_lock:
+            # Concurrent misses wait here; only the first one reads the snapshot
+            dataset = entry.dataset
+            if dataset is None:
+                api_data, store, snapshot_id, search_index, filter_index = load_snapshot(entry.snapshot_path)
+                dataset = self.build(name, api_data, store, search_index, filter_index, snapshot_id)
+                with self.lock:
+                    entry.dataset = dataset
+                    entry.nbytes = dataset.nbytes
+                    entry.loads += 1
+                    entry.misses += 1
+            else:
+                with self.lock:
+                    entry.hits += 1
+        self.enforce_budget(keep=name)
+        return dataset
+
+    def enforce_budget(self, keep=None):
+        """Evict least recently used datasets until the loaded ones fit the budget"""
+        while True:
+            with self.lock:
+                loaded = [entry for entry in self.entries.values() if entry.dataset is not None]
+                if sum(entry.nbytes for entry in loaded) <= self.memory_budget:
+                    return
+                victim = next((entry for entry in loaded if entry.name != keep), None)
+            if victim is None or not self.evict(victim):
+                return
+
+    def evict(self, entry):
+        """Drop entry's Dataset, saving it first when it only exists in memory"""
+        with entry.load_lock:
+            dataset = entry.dataset
+            if dataset is None:
+                return True
+            if entry.snapshot_path is None:
+                try:
+                    entry.snapshot_path = self._save(entry.name, dataset)
+                    entry.owns_snapshot = True
+                except Exception as e:
+                    self.log(f"Could not evict dataset '{entry.name}': {str(e)}")
+                    return False
+            with self.lock:
+                entry.dataset = None
+                entry.evictions += 1
+        return True
+
+    def stats(self):
+        with self.lock:
+            datasets = [entry.stats() for entry in reversed(self.entries.values())]
+        return {
+            "datasets": datasets,
+            "memory_budget": self.memory_budget,
+            "used_bytes": sum(entry["nbytes"] for entry in datasets if entry["loaded"])
+        }
+
+    def _put(self, entry):
+        with self.lock:
+            old = self.entries.pop(entry.name, None)
+            self.entries[entry.name] = entry
+        if old is not None:
+            self._discard(old)
+
+    def _save(self, name, dataset):
+        if self.directory is None:
+            self.directory = tempfile.mkdtemp(prefix='datasets-')
+        path = os.path.join(self.directory, f"{name}.snapshot")
+        save_snapshot(path, dataset.api_data, dataset.store, dataset.search_index, dataset.filter_index)
+        return path
+
+    def _discard(self, entry):
+        if entry.owns_snapshot:
+            # Requests still holding the mapped arrays keep the deleted files alive
+            shutil.rmtree(entry.snapshot_path, ignore_errors=True)
+
+
+def validate_name(name):
+    if not NAME_PATTERN.match(name or '') or name in RESERVED_NAMES:
+        raise ValueError(f"Invalid dataset name '{name}' (letters, digits, '_', '-' and '.'; "
+                         f"not one of {', '.join(sorted(RESERVED_NAMES))})")
+    return name
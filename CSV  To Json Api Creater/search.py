@@ -0,0 +1,259 @@
+import numpy as np
+import pandas as pd
+
+
+# Code points fit in 21 bits, so up to three characters pack into one int64 key
+CHAR_BITS = 21
+BIGRAM_PAD = (1 << CHAR_BITS) - 1  # above the last Unicode code point
+BATCH_CHARS = 1 << 23
+# Appended blocks kept as separate index segments before the index is rebuilt in one piece
+MAX_SEGMENTS = 8
+
+
+class PostingLists:
+    """Compact CSR layout: the postings of key k are values[offsets[k]:offsets[k + 1]]"""
+
+    def __init__(self, keys, values, key_count, dtype=np.int32):
+        keys = np.asarray(keys, dtype=np.int64)
+        values = np.asarray(values, dtype=np.int64)
+        order = np.lexsort((values, keys))
+        keys, values = keys[order], values[order]
+        if len(keys):
+            # Drop repeated (key, value) pairs
+            keep = np.ones(len(keys), dtype=bool)
+            keep[1:] = (keys[1:] != keys[:-1]) | (values[1:] != values[:-1])
+            keys, values = keys[keep], values[keep]
+        self.values = values.astype(dtype)
+        self.offsets = np.zeros(key_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys, minlength=key_count), out=self.offsets[1:])
+
+    @classmethod
+    def from_arrays(cls, values, offsets):
+        """Rebuild from saved arrays (e.g. memory-mapped snapshot files)"""
+        postings = cls.__new__(cls)
+        postings.values = values
+        postings.offsets = offsets
+        return postings
+
+    def get(self, key):
+        return self.values[self.offsets[key]:self.offsets[key + 1]]
+
+    def gather(self, keys):
+        """Concatenated postings of many keys, without a Python loop"""
+        keys = np.asarray(keys, dtype=np.int64)
+        starts = self.offsets[keys]
+        lengths = self.offsets[keys + 1] - starts
+        total = int(lengths.sum())
+        if not total:
+            return self.values[:0]
+        shifts = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        return self.values[shifts + np.arange(total)]
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes + self.offsets.nbytes
+
+
+class SearchIndex:
+    """Substring search over a ColumnStore without scanning rows.
+
+    Every distinct lowercase value ("term") has an inverted list of the rows
+    holding it in each column, and every term is indexed by its character
+    bigrams and trigrams. A query intersects the trigram postings of its
+    trigrams (bigram/character lookups for shorter queries) and only the
+    surviving candidate terms are checked with a real substring test.
+    Matches follow the old scan: a row matches when any truthy value
+    contains the query in its lowercase text.
+    """
+
+    def __init__(self, store):
+        self.row_count = len(store)
+        self.column_count = max(len(store.columns), 1)
+
+        column_codes, local_terms = [], []
+        for column in store.columns:
+            codes, terms = column.search_terms()
+            column_codes.append(codes)
+            local_terms.append(terms)
+
+        # One global term table shared by all columns
+        all_terms = pd.Series([term for terms in local_terms for term in terms], dtype=object)
+        global_ids, uniques = pd.factorize(all_terms)
+        self.terms = uniques.tolist()
+
+        self.column_postings = []
+        ref_terms, ref_packed = [], []
+        offset = 0
+        for column_idx, (codes, terms) in enumerate(zip(column_codes, local_terms)):
+            valid_rows = np.flatnonzero(codes >= 0)
+            self.column_postings.append(PostingLists(codes[valid_rows], valid_rows, len(terms)))
+            local_ids = np.arange(len(terms), dtype=np.int64)
+            ref_terms.append(global_ids[offset:offset + len(terms)])
+            ref_packed.append(local_ids * self.column_count + column_idx)
+            offset += len(terms)
+
+        # term -> (local code, column) references, packed into one integer
+        self.term_refs = PostingLists(_concat(ref_terms), _concat(ref_packed), len(self.terms), dtype=np.int64)
+
+        gram_keys, gram_terms = _extract_grams(self.terms)
+        self.gram_keys, dense_keys = np.unique(gram_keys, return_inverse=True)
+        self.gram_terms = PostingLists(dense_keys.reshape(-1), gram_terms, len(self.gram_keys))
+        self.single_chars = _single_chars(self.terms)
+
+    @classmethod
+    def from_parts(cls, row_count, column_count, terms, column_postings, term_refs, gram_keys, gram_terms):
+        """Rebuild a saved index without re-extracting terms and grams"""
+        index = cls.__new__(cls)
+        index.row_count = row_count
+        index.column_count = column_count
+        index.terms = terms
+        index.column_postings = column_postings
+        index.term_refs = term_refs
+        index.gram_keys = gram_keys
+        index.gram_terms = gram_terms
+        index.single_chars = _single_chars(terms)
+        return index
+
+    def search(self, query):
+        """Sorted row positions matching the (already lowercased) query"""
+        term_ids = self.matching_terms(query)
+        if not len(term_ids):
+            return np.empty(0, dtype=np.int64)
+
+        codes, columns = np.divmod(self.term_refs.gather(term_ids), self.column_count)
+        mask = np.zeros(self.row_count, dtype=bool)
+        for column_idx in np.unique(columns).tolist():
+            mask[self.column_postings[column_idx].gather(codes[columns == column_idx])] = True
+        return np.flatnonzero(mask)
+
+    def matching_terms(self, query):
+        if len(query) == 1:
+            return self._terms_with_char(query)
+        if len(query) == 2:
+            return self._postings(_gram_key(query, 2))
+
+        candidates = None
+        for gram in set(query[i:i + 3] for i in range(len(query) - 2)):
+            postings = self._postings(_gram_key(gram, 3))
+            candidates = postings if candidates is None else np.intersect1d(candidates, postings, assume_unique=True)
+            if not len(candidates):
+                return candidates
+        if len(query) == 3:
+            return candidates
+        terms = self.terms
+        return np.array([term_id for term_id in candidates.tolist() if query in terms[term_id]], dtype=np.int64)
+
+    def _postings(self, key):
+        position = np.searchsorted(self.gram_keys, key)
+        if position == len(self.gram_keys) or self.gram_keys[position] != key:
+            return np.empty(0, dtype=np.int64)
+        return self.gram_terms.get(position).astype(np.int64)
+
+    def _terms_with_char(self, char):
+        """Terms containing one character: any bigram holding it, plus the term equal to it"""
+        code = ord(char)
+        bigrams = (self.gram_keys & BIGRAM_PAD) == BIGRAM_PAD
+        first = (self.gram_keys >> (2 * CHAR_BITS)) & BIGRAM_PAD
+        second = (self.gram_keys >> CHAR_BITS) & BIGRAM_PAD
+        keys = np.flatnonzero(bigrams & ((first == code) | (second == code)))
+
+        mask = np.zeros(len(self.terms), dtype=bool)
+        mask[self.gram_terms.gather(keys)] = True
+        if char in self.single_chars:
+            mask[self.single_chars[char]] = True
+        return np.flatnonzero(mask)
+
+    @property
+    def nbytes(self):
+        postings = sum(p.nbytes for p in self.column_postings)
+        return postings + self.term_refs.nbytes + self.gram_terms.nbytes + self.gram_keys.nbytes
+
+
+class SegmentedSearchIndex:
+    """One SearchIndex per block of appended rows, queried as a single index.
+
+    segments is a list of (first row, index) in row order, so the shifted
+    results of each segment concatenate into sorted row positions.
+    """
+
+    def __init__(self, segments):
+        self.segments = segments
+
+    @classmethod
+    def extend(cls, index, tail_index, start):
+        """index (plain or segmented) followed by tail_index for the rows from start"""
+        segments = index.segments if isinstance(index, cls) else [(0, index)]
+        return cls(segments + [(start, tail_index)])
+
+    def search(self, query):
+        return _concat([index.search(query) + start for start, index in self.segments])
+
+    @property
+    def nbytes(self):
+        return sum(index.nbytes for _, index in self.segments)
+
+
+def segment_count(index):
+    return len(index.segments) if hasattr(index, 'segments') else 1
+
+
+def _single_chars(terms):
+    return {term: term_id for term_id, term in enumerate(terms) if len(term) == 1}
+
+
+def _gram_key(gram, size):
+    codes = [ord(char) for char in gram]
+    if size == 2:
+        codes.append(BIGRAM_PAD)
+    return (codes[0] << (2 * CHAR_BITS)) | (codes[1] << CHAR_BITS) | codes[2]
+
+
+def _extract_grams(terms):
+    """(gram key, term id) pairs for every bigram and trigram, built with NumPy.
+
+    Terms are grouped by length so the fixed-width code point matrix of each
+    batch wastes little space even when a few terms are very long.
+    """
+    keys, owners = [], []
+    if not terms:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    lengths = np.fromiter((len(term) for term in terms), dtype=np.int64, count=len(terms))
+    order = np.argsort(lengths, kind='stable')
+    sorted_lengths = lengths[order]
+    terms_array = np.asarray(terms, dtype=object)
+
+    start = 0
+    while start < len(order):
+        width = max(int(sorted_lengths[start]), 1)
+        # Batch terms up to twice the shortest length, capped by the character budget
+        end = int(np.searchsorted(sorted_lengths, 2 * width, side='left'))
+        end = min(max(end, start + 1), start + max(BATCH_CHARS // (2 * width), 1))
+        batch = order[start:end]
+        start = end
+
+        batch_lengths = lengths[batch]
+        max_length = int(batch_lengths.max())
+        if max_length < 2:
+            continue
+        chars = np.asarray(terms_array[batch].tolist(), dtype=f'U{max_length}')
+        chars = chars.view(np.uint32).reshape(len(batch), max_length).astype(np.int64)
+
+        for size in (2, 3):
+            for position in range(max_length - size + 1):
+                valid = batch_lengths >= position + size
+                if not valid.any():
+                    break
+                first = chars[valid, position]
+                second = chars[valid, position + 1]
+                third = chars[valid, position + 2] if size == 3 else BIGRAM_PAD
+                keys.append((first << (2 * CHAR_BITS)) | (second << CHAR_BITS) | third)
+                owners.append(batch[valid])
+
+    return _concat(keys), _concat(owners)
+
+
+def _concat(arrays):
+    if not arrays:
+        return np.empty(0, dtype=np.int64)
+    return np.concatenate([np.asarray(array, dtype=np.int64) for array in arrays])
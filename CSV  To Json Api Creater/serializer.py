@@ -0,0 +1,154 @@
+"""JSON encoding through the fastest installed backend: orjson, then msgspec, then the standard library.
+
+Every backend writes UTF-8 bytes, compact unless pretty=True (2-space
+indent), and encodes NumPy scalars and arrays: orjson reads their
+buffers directly, the others convert them with .item()/.tolist().
+Values no backend knows (timestamps, Decimals) become str(value), as
+json.dumps(default=str) did, and NaN and infinities become null (orjson
+and msgspec write them that way), so all backends produce the same document.
+"""
+import json
+import math
+import os
+import numpy as np
+
+
+# Backends tried in this order; CSV_API_JSON_BACKEND picks one by name
+BACKEND_ORDER = ('orjson', 'msgspec', 'json')
+BACKEND_ENV = 'CSV_API_JSON_BACKEND'
+
+
+def encode_default(value):
+    """Fallback for values a backend cannot encode itself"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return str(value)
+
+
+def finite_or_none(value):
+    """value with every NaN and infinity (also inside containers and NumPy values) replaced by None"""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: finite_or_none(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [finite_or_none(item) for item in value]
+    if isinstance(value, (np.generic, np.ndarray)):
+        return finite_or_none(encode_default(value))
+    return value
+
+
+class StdlibSerializer:
+    name = 'json'
+
+    def dumps(self, value, pretty=False, sort_keys=False):
+        try:
+            text = self._dumps(value, pretty, sort_keys)
+        except ValueError:
+            # Out of range floats; the document is only copied when it has some
+            text = self._dumps(finite_or_none(value), pretty, sort_keys)
+        return text.encode('utf-8')
+
+    def _dumps(self, value, pretty, sort_keys):
+        if pretty:
+            return json.dumps(value, ensure_ascii=False, sort_keys=sort_keys, indent=2, allow_nan=False,
+                              default=encode_default)
+        return json.dumps(value, ensure_ascii=False, sort_keys=sort_keys, separators=(',', ':'), allow_nan=False,
+                          default=encode_default)
+
+    def loads(self, data):
+        return json.loads(data)
+
+
+class OrjsonSerializer:
+    name = 'orjson'
+
+    def __init__(self):
+        import orjson
+        self.orjson = orjson
+        # Datetimes go through encode_default so they read like str(value) on every backend
+        self.option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def dumps(self, value, pretty=False, sort_keys=False):
+        option = self.option
+        if pretty:
+            option |= self.orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= self.orjson.OPT_SORT_KEYS
+        try:
+            return self.orjson.dumps(value, default=encode_default, option=option)
+        except self.orjson.JSONEncodeError:
+            # Integers beyond 64 bits, for one
+            return STDLIB.dumps(value, pretty, sort_keys)
+
+    def loads(self, data):
+        return self.orjson.loads(data)
+
+
+class MsgspecSerializer:
+    name = 'msgspec'
+
+    def __init__(self):
+        import msgspec
+        self.msgspec = msgspec
+        self.encoder = msgspec.json.Encoder(enc_hook=encode_default)
+        self.sorted_encoder = msgspec.json.Encoder(enc_hook=encode_default, order='sorted')
+        self.decoder = msgspec.json.Decoder()
+
+    def dumps(self, value, pretty=False, sort_keys=False):
+        encoder = self.sorted_encoder if sort_keys else self.encoder
+        try:
+            data = encoder.encode(value)
+        except (self.msgspec.EncodeError, OverflowError, TypeError):
+            return STDLIB.dumps(value, pretty, sort_keys)
+        return self.msgspec.json.format(data, indent=2) if pretty else data
+
+    def loads(self, data):
+        return self.decoder.decode(data)
+
+
+STDLIB = StdlibSerializer()
+BACKENDS = {'orjson': OrjsonSerializer, 'msgspec': MsgspecSerializer, 'json': StdlibSerializer}
+
+
+def available_backends():
+    """Names of the backends that can be used here, fastest first"""
+    names = []
+    for name in BACKEND_ORDER:
+        try:
+            get_serializer(name)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def get_serializer(name=None):
+    """The named backend (ImportError when it is not installed), or the fastest installed one"""
+    if name:
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown JSON backend '{name}' (one of {', '.join(BACKEND_ORDER)})")
+        return STDLIB if name == 'json' else BACKENDS[name]()
+    for candidate in BACKEND_ORDER:
+        try:
+            return get_serializer(candidate)
+        except ImportError:
+            continue
+
+
+SERIALIZER = get_serializer(os.environ.get(BACKEND_ENV))
+
+
+def dumps(value, pretty=False, sort_keys=False):
+    """value as UTF-8 JSON bytes"""
+    return SERIALIZER.dumps(value, pretty, sort_keys)
+
+
+def dumps_text(value, pretty=False, sort_keys=False):
+    return SERIALIZER.dumps(value, pretty, sort_keys).decode('utf-8')
+
+
+def loads(data):
+    return SERIALIZER.loads(data)
@@ -0,0 +1,171 @@
+"""Headless API server for a converted dataset.
+
+Usage:
+    python serve.py data.csv [--workers 4] [--port 5000]
+    python serve.py data.snapshot --workers 4
+    python serve.py --dataset sales=sales.csv --dataset stock=stock.snapshot --memory-mb 512
+
+A data file is converted once and written to a snapshot directory
+(data.snapshot next to it unless --snapshot is given); the server then
+memory-maps that snapshot, including its search and filter indexes,
+so startup does no parsing or index building. With --workers 1 requests are served by
+threads in this process, otherwise by pre-forked worker processes that
+share the mapped dataset.
+
+Signals: SIGINT/SIGTERM drain in-flight requests and stop; SIGHUP
+reloads the snapshot (re-converting the data file if it changed)
+without closing the listening socket. --watch does the same reload
+automatically once the source has stopped changing for --debounce
+seconds; requests already running finish against the previous data.
+
+Each --dataset NAME=PATH is converted to a snapshot the same way and
+served under /api/NAME/; it is only mapped when first requested, and the
+least recently used datasets are unmapped again once the loaded ones
+exceed --memory-mb (per process). A reload only replaces the datasets
+whose file or snapshot changed; the others stay mapped and keep their
+counters.
+
+POST /api/jobs queues conversions of uploads, and of files under the
+--job-root directories, on --job-workers threads. Jobs and the data they
+load live in the process that accepted them, so use --workers 1 when
+clients submit jobs.
+"""
+import argparse
+import os
+import sys
+import threading
+from Api import FlaskAPIServer
+from page_cache import DEFAULT_CACHE_BYTES
+from jobs import JOB_WORKERS
+from processing import FileProcessor
+from registry import DEFAULT_MEMORY_BUDGET, validate_name
+from serving import ThreadedServer, WorkerPool
+from snapshot import save_snapshot, load_snapshot, is_snapshot
+from store import ColumnStore
+from watcher import FileWatcher, DEBOUNCE_SECONDS
+
+
+def convert_to_snapshot(source, snapshot_path, config=None):
+    """Run the normal conversion pipeline on source and save the result as a snapshot"""
+    processor = FileProcessor(source, config or {}, on_status=print)
+    api_data = processor.process()
+    with processor.profile.stage('snapshot', api_data['metadata']['total_records']):
+        store = ColumnStore.from_dataframe(processor.df.iloc[:len(api_data.get('data', []))])
+        save_snapshot(snapshot_path, api_data, store)
+    print(f"Snapshot written to {snapshot_path} ({len(store):,} records)")
+
+
+def prepare_snapshot(source, snapshot_path):
+    """Path of an up-to-date snapshot for source (a data file or a snapshot directory)"""
+    if is_snapshot(source):
+        return source
+    stale = (not is_snapshot(snapshot_path) or
+             os.path.getmtime(source) > os.path.getmtime(os.path.join(snapshot_path, 'meta.json')))
+    if stale:
+        convert_to_snapshot(source, snapshot_path)
+    return snapshot_path
+
+
+def load_server(source, snapshot_path, server=None, datasets=None, **options):
+    """Load source and register datasets on server (a new FlaskAPIServer(**options) when None)"""
+    server = server or FlaskAPIServer(**options)
+    if source:
+        api_data, store, snapshot_id, search_index, filter_index = load_snapshot(prepare_snapshot(source, snapshot_path))
+        server.load_store(api_data, store, snapshot_id, search_index, filter_index)
+    for name, path in (datasets or {}).items():
+        # Registered by path only; the first request for the dataset maps it. On reload
+        # only datasets whose snapshot changed are registered again.
+        server.registry.refresh(name, prepare_snapshot(path, f"{os.path.splitext(path)[0]}.snapshot"))
+    return server
+
+
+def parse_datasets(values):
+    """{name: absolute path} from NAME=PATH arguments"""
+    datasets = {}
+    for value in values:
+        name, separator, path = value.partition('=')
+        if not separator or not path:
+            raise ValueError(f"--dataset expects NAME=PATH, got '{value}'")
+        datasets[validate_name(name)] = os.path.abspath(path)
+    return datasets
+
+
+def watch_path(source):
+    """The file whose changes trigger a reload; a snapshot is replaced along with its meta.json"""
+    return os.path.join(source, 'meta.json') if is_snapshot(source) else source
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a CSV/Excel file or snapshot as a JSON API")
+    parser.add_argument('source', nargs='?', help="CSV/Excel file or snapshot directory served under /api/")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=1,
+                        help="worker processes (1 = threads in this process)")
+    parser.add_argument('--snapshot', help="snapshot directory for a data file (default: <file>.snapshot)")
+    parser.add_argument('--cache-mb', type=int, default=DEFAULT_CACHE_BYTES // (1024 * 1024),
+                        help="page cache budget per worker, in MB")
+    parser.add_argument('--dataset', action='append', default=[], metavar='NAME=PATH',
+                        help="also serve a file or snapshot under /api/NAME/ (repeatable)")
+    parser.add_argument('--memory-mb', type=int, default=DEFAULT_MEMORY_BUDGET // (1024 * 1024),
+                        help="memory budget of the named datasets per worker, in MB")
+    parser.add_argument('--job-root', action='append', default=[], metavar='DIR',
+                        help="directory whose files POST /api/jobs may convert by path (repeatable)")
+    parser.add_argument('--job-workers', type=int, default=JOB_WORKERS,
+                        help="conversion jobs running at once")
+    parser.add_argument('--watch', action='store_true', help="reload when the source file changes")
+    parser.add_argument('--debounce', type=float, default=DEBOUNCE_SECONDS,
+                        help="seconds the source must be unchanged before a reload")
+    args = parser.parse_args(argv)
+    if not args.source and not args.dataset:
+        parser.error("give a source file, one or more --dataset NAME=PATH, or both")
+    if args.watch and not args.source:
+        parser.error("--watch follows the source file")
+    try:
+        datasets = parse_datasets(args.dataset)
+    except ValueError as e:
+        parser.error(str(e))
+
+    source = os.path.abspath(args.source) if args.source else None
+    snapshot_path = args.snapshot or (f"{os.path.splitext(source)[0]}.snapshot" if source else None)
+    options = {
+        'cache_bytes': args.cache_mb * 1024 * 1024,
+        'memory_budget': args.memory_mb * 1024 * 1024,
+        'job_workers': args.job_workers,
+        'job_roots': [os.path.abspath(root) for root in args.job_root]
+    }
+
+    try:
+        if args.workers > 1:
+            pool = WorkerPool(lambda: load_server(source, snapshot_path, datasets=datasets, **options).app,
+                              args.host, args.port, args.workers)
+            if args.watch:
+                # Polled from the supervisor loop: the workers are forked, so no watcher thread
+                watcher = FileWatcher(watch_path(source), lambda path: pool.request_reload(), debounce=args.debounce)
+                pool.on_tick = watcher.poll
+            print(f"Serving http://{args.host}:{args.port} with {args.workers} worker processes")
+            pool.run()
+        else:
+            server = load_server(source, snapshot_path, datasets=datasets, **options)
+            http_server = ThreadedServer(server.app, args.host, args.port)
+            reload_lock = threading.Lock()
+
+            def reload(*unused):
+                # SIGHUP and the watcher may fire together; one conversion at a time
+                with reload_lock:
+                    load_server(source, snapshot_path, server=server, datasets=datasets)
+
+            if args.watch:
+                FileWatcher(watch_path(source), reload, debounce=args.debounce).start()
+                print(f"Watching {source} for changes")
+            print(f"Serving http://{args.host}:{args.port} (threaded)")
+            http_server.serve_forever(on_reload=reload)
+    except Exception as e:
+        print(f"Server error: {str(e)}", file=sys.stderr)
+        return 1
+    print("Server stopped")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,228 @@
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from werkzeug.serving import ThreadedWSGIServer, WSGIRequestHandler
+
+
+KEEPALIVE_TIMEOUT = 5
+SHUTDOWN_TIMEOUT = 30
+
+
+class RequestHandler(WSGIRequestHandler):
+    # Idle keep-alive connections are dropped so shutdown never waits on them forever
+    timeout = KEEPALIVE_TIMEOUT
+
+    def log_request(self, *args, **kwargs):
+        # Per-request logging costs more than most of the cached responses
+        pass
+
+
+class DrainingWSGIServer(ThreadedWSGIServer):
+    """Threaded WSGI server whose server_close waits for in-flight requests"""
+
+    daemon_threads = False
+    block_on_close = True
+
+
+def bind_socket(host, port, backlog=128):
+    """Listening socket shared by every worker of a server"""
+    sock = socket.socket(socket.AF_INET6 if ':' in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    try:
+        sock.bind((host, port))
+        sock.listen(backlog)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+class ThreadedServer:
+    """The API in a threaded WSGI server inside this process.
+
+    Unlike app.run() it can be stopped: stop() lets running requests
+    finish and releases the port, so the same object can start again.
+    """
+
+    def __init__(self, app, host='127.0.0.1', port=5000):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.server = None
+        self.thread = None
+
+    @property
+    def running(self):
+        return self.server is not None
+
+    def start(self):
+        """Serve on a background thread"""
+        if self.running:
+            return
+        sock = bind_socket(self.host, self.port)
+        try:
+            self.server = DrainingWSGIServer(self.host, self.port, self.app, handler=RequestHandler, fd=sock.fileno())
+        finally:
+            sock.close()  # the server holds its own duplicate of the descriptor
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if not self.running:
+            return
+        server, self.server = self.server, None
+        server.shutdown()
+        server.server_close()
+        self.thread.join(SHUTDOWN_TIMEOUT)
+        self.thread = None
+
+    def restart(self):
+        self.stop()
+        self.start()
+
+    def serve_forever(self, on_reload=None):
+        """Block until SIGINT/SIGTERM; SIGHUP calls on_reload"""
+        stop_requested = threading.Event()
+        signal.signal(signal.SIGINT, lambda *args: stop_requested.set())
+        signal.signal(signal.SIGTERM, lambda *args: stop_requested.set())
+        if on_reload and hasattr(signal, 'SIGHUP'):
+            signal.signal(signal.SIGHUP, lambda *args: threading.Thread(target=on_reload).start())
+        self.start()
+        while not stop_requested.wait(0.5):
+            pass
+        self.stop()
+
+
+class WorkerPool:
+    """Pre-forked worker processes sharing one listening socket.
+
+    load_app() runs in the parent before forking, so the dataset it loads
+    (memory-mapped snapshot columns, indexes) is shared by all workers
+    instead of being copied into each. SIGHUP starts a new generation of
+    workers from a fresh load_app() and then retires the old one, so the
+    port never stops accepting; SIGINT/SIGTERM drain and stop every worker.
+    on_tick, if given, is called from the supervisor loop a few times a
+    second (the file watcher polls there, so no thread exists at fork time).
+    """
+
+    def __init__(self, load_app, host='127.0.0.1', port=5000, workers=2, log=print, on_tick=None):
+        if not hasattr(os, 'fork'):
+            raise RuntimeError("Worker processes need os.fork; use ThreadedServer on this platform")
+        self.load_app = load_app
+        self.host = host
+        self.port = port
+        self.worker_count = workers
+        self.log = log
+        self.on_tick = on_tick
+        self.sock = None
+        self.app = None
+        self.workers = {}  # pid -> generation
+        self.generation = 0
+        self.stopping = False
+        self.reload_requested = False
+
+    def run(self):
+        self.sock = bind_socket(self.host, self.port)
+        signal.signal(signal.SIGINT, self._request_stop)
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGHUP, lambda *args: self.request_reload())
+        try:
+            self.app = self.load_app()
+            self._spawn_generation()
+            while not self.stopping:
+                if self.on_tick:
+                    self.on_tick()
+                if self.reload_requested:
+                    self.reload_requested = False
+                    self._reload()
+                self._reap()
+                time.sleep(0.2)
+        finally:
+            self._stop_workers(list(self.workers))
+            self.sock.close()
+
+    def _request_stop(self, *args):
+        self.stopping = True
+
+    def request_reload(self):
+        """Reload on the next supervisor loop iteration (safe from signal handlers)"""
+        self.reload_requested = True
+
+    def _reload(self):
+        try:
+            app = self.load_app()
+        except Exception as e:
+            self.log(f"Reload failed, keeping current workers: {str(e)}")
+            return
+        old_workers = [pid for pid, generation in self.workers.items() if generation == self.generation]
+        self.app = app
+        self._spawn_generation()
+        self._stop_workers(old_workers)
+        self.log(f"Reloaded: generation {self.generation} serving with {self.worker_count} workers")
+
+    def _spawn_generation(self):
+        self.generation += 1
+        for _ in range(self.worker_count):
+            self._spawn()
+
+    def _spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            self._worker_main()
+        self.workers[pid] = self.generation
+
+    def _worker_main(self):
+        status = 0
+        try:
+            server = DrainingWSGIServer(self.host, self.port, self.app, handler=RequestHandler, fd=self.sock.fileno())
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            signal.signal(signal.SIGHUP, signal.SIG_IGN)
+            # shutdown() waits for serve_forever, so it must not run on the serving thread
+            signal.signal(signal.SIGTERM, lambda *args: threading.Thread(target=server.shutdown).start())
+            server.serve_forever()
+            server.server_close()
+        except Exception as e:
+            print(f"Worker {os.getpid()} error: {str(e)}", file=sys.stderr)
+            status = 1
+        finally:
+            os._exit(status)
+
+    def _reap(self):
+        """Replace workers of the current generation that died unexpectedly"""
+        while self.workers:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                return
+            generation = self.workers.pop(pid, None)
+            if generation == self.generation and not self.stopping:
+                self.log(f"Worker {pid} exited with status {status}; starting a replacement")
+                self._spawn()
+
+    def _stop_workers(self, pids):
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+        deadline = time.monotonic() + SHUTDOWN_TIMEOUT + KEEPALIVE_TIMEOUT
+        remaining = set(pids)
+        while remaining and time.monotonic() < deadline:
+            for pid in list(remaining):
+                try:
+                    done, _ = os.waitpid(pid, os.WNOHANG)
+                except ChildProcessError:
+                    done = pid
+                if done:
+                    remaining.discard(pid)
+                    self.workers.pop(pid, None)
+            time.sleep(0.05)
+
+        for pid in remaining:
+            # Still busy after the grace period
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+            self.workers.pop(pid, None)
@@ -0,0 +1,526 @@
+import math
+import numpy as np
+import pandas as pd
+
+
+# Relative error the sketches are sized for unless config['statistics_error'] says otherwise
+DEFAULT_ERROR = 0.01
+STATISTICS_MODES = ('auto', 'exact', 'approximate')
+# statistics='auto' switches to the sketches from this many rows
+APPROXIMATE_MIN_ROWS = 1000000
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+SAMPLE_SEED = 0x5EED
+# Numbers closer to zero than this share the zero bucket of a QuantileSketch
+MIN_MAGNITUDE = 1e-12
+# Rows hashed and checked against the duplicate filter at a time, bounding the temporary arrays
+DUPLICATE_BLOCK_ROWS = 1 << 20
+# Leading values looked at to decide whether a text column is repetitive
+REPETITION_SAMPLE = 1 << 16
+# Bits a row sets in its word of the duplicate filter: 6 bits of the remixed hash each
+MAX_WORD_HASHES = 10
+
+
+def resolve_mode(mode, rows):
+    """'exact' or 'approximate' for a statistics setting and the number of rows"""
+    mode = mode or 'auto'
+    if mode not in STATISTICS_MODES:
+        raise ValueError(f"Unknown statistics mode '{mode}' (one of {', '.join(STATISTICS_MODES)})")
+    if mode == 'auto':
+        return 'approximate' if rows >= APPROXIMATE_MIN_ROWS else 'exact'
+    return mode
+
+
+def precision_for_error(error):
+    """Smallest HyperLogLog precision whose standard error is at most error (4 to 18)"""
+    return int(min(max(math.ceil(math.log2((1.04 / error) ** 2)), 4), 18))
+
+
+class HyperLogLog:
+    """Mergeable distinct-count sketch over 64-bit hashes"""
+
+    def __init__(self, precision=14):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add_hashes(self, hashes):
+        if len(hashes) == 0:
+            return
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        shift = np.uint64(64 - self.precision)
+        index = (hashes >> shift).astype(np.int64)
+        remainder = hashes & np.uint64((1 << (64 - self.precision)) - 1)
+        if self.precision >= 11:
+            # Remainders below 2**53 convert to float exactly, and frexp's exponent is the bit length
+            length = np.frexp(remainder.astype(np.float64))[1]
+        else:
+            length = _bit_length(remainder)
+        rank = (64 - self.precision) - length + 1
+        np.maximum.at(self.registers, index, rank.astype(np.uint8))
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.power(2.0, -self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            # Linear counting is more accurate for small cardinalities
+            return int(round(m * np.log(m / zeros)))
+        return int(round(raw))
+
+    def relative_error(self):
+        return 1.04 / np.sqrt(len(self.registers))
+
+
+class ReservoirSample:
+    """Uniform sample of a stream's values that merges with the samples of later parts.
+
+    Each value gets a uniform random key and the size smallest keys are
+    kept (bottom-k sampling), so keeping the smallest keys of two merged
+    samples is the same as sampling both parts at once. Only the size
+    smallest keys of a part are drawn, as order statistics, so a part of
+    any length costs O(size). Values come back in stream order.
+    """
+
+    def __init__(self, size=5, seed=SAMPLE_SEED):
+        self.size = size
+        self.rng = np.random.default_rng(seed)
+        self.seen = 0
+        self.keys = np.empty(0)
+        self.positions = np.empty(0, dtype=np.int64)
+        self.values = []
+
+    def update(self, values):
+        """Add an array of present values"""
+        count = len(values)
+        if count == 0:
+            return
+        take = min(self.size, count)
+        chosen = np.sort(self.rng.choice(count, take, replace=False))
+        self._keep(self._smallest_keys(count, take), chosen + self.seen, np.asarray(values)[chosen].tolist())
+        self.seen += count
+
+    def merge(self, other):
+        """Fold in the sample of the values that follow this one's"""
+        self._keep(other.keys, other.positions + self.seen, other.values)
+        self.seen += other.seen
+
+    def sample(self):
+        order = np.argsort(self.positions, kind='stable')
+        return [self.values[i] for i in order]
+
+    def _smallest_keys(self, count, take):
+        # Successive minima of count uniforms: each is the smallest of the remaining ones above the last
+        keys, key = np.empty(take), 0.0
+        for i in range(take):
+            key += (1 - key) * (1 - self.rng.random() ** (1 / (count - i)))
+            keys[i] = key
+        # Which chosen value gets which key does not matter: keys are independent of positions
+        return self.rng.permutation(keys)
+
+    def _keep(self, keys, positions, values):
+        keys = np.concatenate([self.keys, keys])
+        positions = np.concatenate([self.positions, positions])
+        values = self.values + list(values)
+        if len(keys) > self.size:
+            chosen = np.argsort(keys, kind='stable')[:self.size]
+            keys, positions, values = keys[chosen], positions[chosen], [values[i] for i in chosen]
+        self.keys, self.positions, self.values = keys, positions, values
+
+
+class QuantileSketch:
+    """Quantiles within a relative error, from logarithmic buckets (as in DDSketch).
+
+    A number x is counted in bucket ceil(log_gamma(|x|)) with
+    gamma = (1 + error) / (1 - error); every bucket's representative is
+    within error of all the numbers it holds, so each quantile is within
+    error * |value| of a value ranked at that quantile. Buckets are counts,
+    so sketches of separate chunks merge by adding them.
+    """
+
+    def __init__(self, error=DEFAULT_ERROR):
+        self.error = error
+        self.gamma = (1 + error) / (1 - error)
+        self.log_gamma = math.log(self.gamma)
+        self.positive = {}  # bucket -> count
+        self.negative = {}  # bucket of |x| -> count
+        self.zero_count = 0
+        self.count = 0
+
+    def update(self, numbers):
+        """Add a float array of finite numbers"""
+        if len(numbers) == 0:
+            return
+        magnitudes = np.abs(numbers)
+        zeros = magnitudes < MIN_MAGNITUDE
+        self.zero_count += int(zeros.sum())
+        for buckets, mask in ((self.positive, numbers > 0), (self.negative, numbers < 0)):
+            mask &= ~zeros
+            if not mask.any():
+                continue
+            indexes = np.ceil(np.log(magnitudes[mask]) / self.log_gamma).astype(np.int64)
+            # Indexes span a few thousand buckets at most, so bincount beats sorting
+            low = int(indexes.min())
+            counts = np.bincount(indexes - low)
+            for offset in np.flatnonzero(counts).tolist():
+                buckets[low + offset] = buckets.get(low + offset, 0) + int(counts[offset])
+        self.count += len(numbers)
+
+    def merge(self, other):
+        for buckets, others in ((self.positive, other.positive), (self.negative, other.negative)):
+            for bucket, count in others.items():
+                buckets[bucket] = buckets.get(bucket, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+
+    def quantiles(self, fractions):
+        """Estimates for ascending fractions, in one walk over the buckets"""
+        if not self.count:
+            return [None] * len(fractions)
+        # Negative numbers first (largest magnitude first), then zeros, then positive numbers
+        walk = [(-self._value(bucket), self.negative[bucket]) for bucket in sorted(self.negative, reverse=True)]
+        walk.append((0.0, self.zero_count))
+        walk.extend((self._value(bucket), self.positive[bucket]) for bucket in sorted(self.positive))
+
+        results, seen, position = [], 0, 0
+        for fraction in fractions:
+            rank = fraction * (self.count - 1)
+            while position < len(walk) - 1 and seen + walk[position][1] <= rank:
+                seen += walk[position][1]
+                position += 1
+            results.append(walk[position][0])
+        return results
+
+    def _value(self, bucket):
+        return 2 * self.gamma ** bucket / (self.gamma + 1)
+
+
+class NumericSummary:
+    """Count, min, max, mean and quantile sketch of a column's numbers, mergeable"""
+
+    def __init__(self, error=DEFAULT_ERROR):
+        self.count = 0
+        self.total = 0.0
+        self.minimum = None
+        self.maximum = None
+        self.integers = True  # every number seen so far was an integer
+        self.sketch = QuantileSketch(error)
+
+    def update(self, numbers, integers=False):
+        numbers = numbers[np.isfinite(numbers)]
+        if len(numbers) == 0:
+            return
+        self.count += len(numbers)
+        self.total += float(numbers.sum())
+        low, high = float(numbers.min()), float(numbers.max())
+        self.minimum = low if self.minimum is None else min(self.minimum, low)
+        self.maximum = high if self.maximum is None else max(self.maximum, high)
+        self.integers = self.integers and integers
+        self.sketch.update(numbers)
+
+    def merge(self, other):
+        if not other.count:
+            return
+        self.count += other.count
+        self.total += other.total
+        self.minimum = other.minimum if self.minimum is None else min(self.minimum, other.minimum)
+        self.maximum = other.maximum if self.maximum is None else max(self.maximum, other.maximum)
+        self.integers = self.integers and other.integers
+        self.sketch.merge(other.sketch)
+
+    def to_dict(self, as_float=False):
+        # The extremes are exact, so they also bound the bucket estimates; digits beyond the error are noise
+        digits = max(math.ceil(-math.log10(self.sketch.error)), 0) + 2
+        quantiles = [_significant(min(max(value, self.minimum), self.maximum), digits)
+                     for value in self.sketch.quantiles(QUANTILES)]
+        summary = _summary(self.minimum, self.maximum, self.total / self.count, quantiles, self.integers and not as_float)
+        summary["quantiles_approximate"] = True
+        summary["quantiles_error"] = self.sketch.error
+        return summary
+
+
+class FieldAggregator:
+    """Per-column statistics that can be updated chunk by chunk and merged.
+
+    Distinct values are counted exactly (by their 64-bit hashes) until
+    there are more than exact_limit of them, then estimated by a
+    HyperLogLog sketch sized for error; sample values are a reservoir sample, and numeric columns get
+    exact min/max/mean plus quantile sketches.
+    """
+
+    def __init__(self, sample_size=5, exact_limit=10000, error=DEFAULT_ERROR, seed=SAMPLE_SEED):
+        self.sample_size = sample_size
+        self.exact_limit = exact_limit
+        self.null_count = 0
+        self.samples = ReservoirSample(sample_size, seed)
+        self.exact_hashes = set()  # 64-bit hashes of the distinct values while there are few
+        self.exact = True
+        self.sketch = HyperLogLog(precision_for_error(error))
+        self.numeric = True  # every value seen so far was a number
+        self.numbers = NumericSummary(error)
+
+    def update(self, values):
+        """Add a chunk of converted values (None or NaN for blanks)"""
+        values = values if isinstance(values, pd.Series) else pd.Series(values)
+        null_mask = values.isna()
+        self.null_count += int(null_mask.sum())
+        present = values[~null_mask]
+        if present.empty:
+            return
+
+        array = present.to_numpy()
+        self.samples.update(array)
+        # Factorizing text first is fastest when values repeat, but builds a table of every distinct one
+        hashes = pd.util.hash_array(array, categorize=self.exact and _repetitive(array))
+        self.sketch.add_hashes(hashes)
+        if self.exact and len(hashes) > self.exact_limit and self.sketch.estimate() > 2 * self.exact_limit:
+            # Clearly past the limit: skip collecting the distinct hashes
+            self._drop_exact()
+        if self.exact:
+            self.exact_hashes.update(pd.unique(hashes).tolist())
+            self._check_exact_limit()
+
+        numbers, integers = _numbers(present)
+        self.numeric = self.numeric and numbers is not None
+        if self.numeric:
+            self.numbers.update(numbers, integers)
+
+    def merge(self, other):
+        """Fold in statistics from a later chunk or another worker"""
+        self.null_count += other.null_count
+        self.samples.merge(other.samples)
+        self.sketch.merge(other.sketch)
+        if self.exact and other.exact:
+            self.exact_hashes.update(other.exact_hashes)
+            self._check_exact_limit()
+        else:
+            self._drop_exact()
+        self.numeric = self.numeric and other.numeric
+        self.numbers.merge(other.numbers)
+
+    def unique_count(self):
+        if self.exact:
+            return len(self.exact_hashes)
+        return self.sketch.estimate()
+
+    def to_field_info(self, as_float=False):
+        """Same shape as column_statistics' entries.
+
+        as_float reports the sample numbers as floats, for blocks merged
+        into a column that was widened to float64.
+        """
+        samples = self.samples.sample()
+        if as_float:
+            samples = [float(val) if isinstance(val, int) and not isinstance(val, bool) else val for val in samples]
+        data_types = list(set([type(val).__name__ for val in samples if val is not None]))
+        info = {
+            "type": data_types[0] if len(data_types) == 1 else "mixed",
+            "sample_values": samples[:3],
+            "null_count": self.null_count,
+            "unique_count": self.unique_count()
+        }
+        if not self.exact:
+            info["unique_count_approximate"] = True
+            info["unique_count_error"] = round(float(self.sketch.relative_error()), 4)
+        if self.numeric and self.numbers.count:
+            info.update(self.numbers.to_dict(as_float))
+        return info
+
+    def _check_exact_limit(self):
+        if len(self.exact_hashes) > self.exact_limit:
+            self._drop_exact()
+
+    def _drop_exact(self):
+        self.exact = False
+        self.exact_hashes = set()
+
+
+class DuplicateEstimator:
+    """Counts repeated rows with a fixed-size Bloom filter over row hashes.
+
+    The filter is blocked: a hash sets hash_count bits of a single 64-bit
+    word, so checking and adding a row touches one word. A row whose bits
+    are all set already is counted as a duplicate, so the count can only
+    be too high, by the rows the filter mistook for seen.
+    """
+
+    def __init__(self, bits=1 << 27, hashes=6):
+        self.words = 1 << max(int(bits // 64) - 1, 1).bit_length()
+        self.hash_count = min(max(hashes, 1), MAX_WORD_HASHES)
+        self.filter = np.zeros(self.words, dtype=np.uint64)
+        self.duplicates = 0
+        self.false_positives = 0.0  # expected number of rows wrongly counted so far
+
+    @classmethod
+    def for_rows(cls, rows, error=DEFAULT_ERROR):
+        """A filter for rows rows that mistakes about error of the new ones for repeats"""
+        # A blocked filter needs about a quarter more bits than a classic one for the same rate
+        bits_per_row = -math.log(error) / math.log(2) ** 2 * 1.25
+        return cls(max(int(rows * bits_per_row), 1 << 16), int(round(bits_per_row * math.log(2))))
+
+    def update(self, row_hashes):
+        """Add row hashes in order; returns the mask of rows counted as repeats"""
+        row_hashes = np.asarray(row_hashes, dtype=np.uint64)
+        repeated = np.zeros(len(row_hashes), dtype=bool)
+        for start in range(0, len(row_hashes), DUPLICATE_BLOCK_ROWS):
+            repeated[start:start + DUPLICATE_BLOCK_ROWS] = self._update_block(row_hashes[start:start + DUPLICATE_BLOCK_ROWS])
+        return repeated
+
+    def false_positive_rate(self):
+        """Chance that a new row is mistaken for a repeat, from how full the filter's words are"""
+        fill = _popcount(self.filter) / 64.0
+        return float(np.mean(fill ** self.hash_count))
+
+    def quality(self):
+        """data_quality entries: the estimate and how many rows it is expected to be over by"""
+        return {
+            "duplicate_rows": self.duplicates,
+            "duplicate_rows_approximate": True,
+            "duplicate_rows_error": int(math.ceil(self.false_positives))
+        }
+
+    def _update_block(self, row_hashes):
+        # Repeats inside the block are exact; first occurrences are checked against earlier blocks
+        repeated = pd.Series(row_hashes).duplicated().to_numpy()
+        first = np.flatnonzero(~repeated)
+        words, masks = self._locate(row_hashes[first])
+        seen = (self.filter[words] & masks) == masks
+        repeated[first[seen]] = True
+        self.duplicates += int(repeated.sum())
+        self.false_positives += (len(first) - int(seen.sum())) * self.false_positive_rate()
+        np.bitwise_or.at(self.filter, words, masks)
+        return repeated
+
+    def _locate(self, hashes):
+        """Word of each hash and the bits it sets there (6 bits of a remixed hash per bit)"""
+        words = (hashes & np.uint64(self.words - 1)).astype(np.int64)
+        mixed = _mix64(hashes)
+        masks = np.zeros(len(hashes), dtype=np.uint64)
+        for i in range(self.hash_count):
+            masks |= np.uint64(1) << ((mixed >> np.uint64(6 * i)) & np.uint64(63))
+        return words, masks
+
+
+def column_statistics(series, approximate=False, error=DEFAULT_ERROR):
+    """fields_info entry of a cleaned column.
+
+    Exact statistics count distinct values with a hash table of the whole
+    column and take quantiles from its numbers; approximate ones go
+    through a FieldAggregator, whose memory does not grow with the rows.
+    """
+    if approximate:
+        aggregator = FieldAggregator(error=error)
+        aggregator.update(series)
+        return aggregator.to_field_info()
+    present = series.dropna()
+    sample_values = present.head(5).tolist()
+    data_types = list(set([type(val).__name__ for val in sample_values if val is not None]))
+    info = {
+        "type": data_types[0] if len(data_types) == 1 else "mixed",
+        "sample_values": sample_values[:3],
+        "null_count": int(len(series) - len(present)),
+        "unique_count": int(present.nunique())
+    }
+    numbers, integers = _numbers(present)
+    if numbers is not None:
+        numbers = numbers[np.isfinite(numbers)]
+        if len(numbers):
+            quantiles = np.quantile(numbers, QUANTILES).tolist()
+            info.update(_summary(float(numbers.min()), float(numbers.max()), float(numbers.mean()), quantiles, integers))
+    return info
+
+
+def row_hashes(df):
+    """uint64 hash of each row's values, computed a block of rows at a time"""
+    if len(df) == 0:
+        return np.zeros(0, dtype=np.uint64)
+    return np.concatenate([pd.util.hash_pandas_object(df.iloc[start:start + DUPLICATE_BLOCK_ROWS], index=False).to_numpy()
+                           for start in range(0, len(df), DUPLICATE_BLOCK_ROWS)])
+
+
+def count_duplicates(df, hashes, error=DEFAULT_ERROR):
+    """Exact df.duplicated().sum() without a hash table of every row.
+
+    hashes (one per row, equal for equal rows) go through a
+    DuplicateEstimator sized for error; only rows sharing a hash with a
+    row it reported as a repeat (true repeats plus its false positives)
+    are compared.
+    """
+    repeated = DuplicateEstimator.for_rows(len(df), error).update(hashes)
+    if not repeated.any():
+        return 0
+    candidates = pd.Series(hashes).isin(np.unique(hashes[repeated])).to_numpy()
+    return int(df.iloc[np.flatnonzero(candidates)].duplicated().sum())
+
+
+def _repetitive(array):
+    """Whether an object array's leading values repeat enough for hash_array to factorize them first"""
+    if array.dtype != object:
+        return False
+    head = array[:REPETITION_SAMPLE]
+    return len(pd.unique(head)) * 2 < len(head)
+
+
+def _numbers(present):
+    """(float array, all integers) of a column's present values, or (None, False) unless all are numbers"""
+    kind = present.dtype.kind
+    if kind in 'iuf':
+        return present.to_numpy(dtype=np.float64), kind in 'iu'
+    if kind != 'O' or present.empty:
+        return None, False
+    inferred = pd.api.types.infer_dtype(present, skipna=True)
+    if inferred not in ('integer', 'floating', 'mixed-integer-float'):
+        return None, False
+    try:
+        return present.to_numpy(dtype=np.float64), inferred == 'integer'
+    except (TypeError, ValueError, OverflowError):
+        return None, False
+
+
+def _summary(minimum, maximum, mean, quantiles, integers):
+    if integers:
+        minimum, maximum = int(minimum), int(maximum)
+    return {
+        "min": minimum,
+        "max": maximum,
+        "mean": mean,
+        "quantiles": {f"p{round(fraction * 100)}": value for fraction, value in zip(QUANTILES, quantiles)}
+    }
+
+
+def _significant(value, digits):
+    if value == 0:
+        return 0.0
+    return round(value, digits - 1 - math.floor(math.log10(abs(value))))
+
+
+def _mix64(values):
+    """splitmix64 finalizer: bits independent of the input's, for a second hash"""
+    with np.errstate(over='ignore'):
+        values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+def _popcount(words):
+    """Set bits of each uint64"""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(words)
+    return _BYTE_BITS[words.view(np.uint8)].reshape(-1, 8).sum(axis=1)
+
+
+_BYTE_BITS = np.array([bin(value).count('1') for value in range(256)], dtype=np.uint8)
+
+
+def _bit_length(values):
+    """Vectorized int.bit_length for uint64 arrays"""
+    values = values.copy()
+    length = np.zeros(len(values), dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        mask = values >= np.uint64(1 << shift)
+        length[mask] += shift
+        values[mask] >>= np.uint64(shift)
+    length += (values > 0).astype(np.int64)
+    return length
@@ -0,0 +1,232 @@
+import json
+import os
+import pickle
+import shutil
+import uuid
+import numpy as np
+from store import ColumnStore, NumericColumn, DictionaryColumn, ObjectColumn
+from search import SearchIndex, PostingLists
+from filters import FilterIndex, HashIndex, SortedIndex, NumericKeys, date_key
+
+
+SNAPSHOT_FORMAT = 2
+# Format 1 snapshots have no saved indexes; they are built on load
+READABLE_FORMATS = (1, 2)
+META_FILE = 'meta.json'
+
+
+def save_snapshot(path, api_data, store, search_index=None, filter_index=None):
+    """Write a ColumnStore, its indexes and its API metadata to a snapshot directory.
+
+    Typed columns and index arrays become .npy files that load_snapshot
+    memory-maps, so every process serving the snapshot shares the same
+    pages and nothing is rebuilt at startup. Indexes that are not passed
+    in are built here. The new directory replaces the old one only once
+    it is complete.
+    """
+    try:
+        temp_path = f"{path}.tmp-{os.getpid()}"
+        if os.path.exists(temp_path):
+            shutil.rmtree(temp_path)
+        os.makedirs(temp_path)
+
+        columns = []
+        for position, column in enumerate(store.columns):
+            columns.append(_save_column(temp_path, position, column))
+
+        search_index = search_index or SearchIndex(store)
+        filter_index = filter_index or FilterIndex(store, api_data.get('metadata', {}).get('fields_info'))
+        meta = {
+            "format": SNAPSHOT_FORMAT,
+            "id": uuid.uuid4().hex[:8],
+            "row_count": len(store),
+            "columns": columns,
+            "search": _save_search_index(temp_path, search_index),
+            "filter": _save_filter_index(temp_path, filter_index, store),
+            "api_data": {key: value for key, value in api_data.items() if key not in ('data', 'appended', 'sheets')}
+        }
+        with open(os.path.join(temp_path, META_FILE), 'w', encoding='utf-8') as meta_file:
+            json.dump(meta, meta_file, ensure_ascii=False, default=str)
+
+        # Processes still mapping the old files keep them until they let go
+        old_path = f"{path}.old-{os.getpid()}"
+        if os.path.exists(path):
+            os.rename(path, old_path)
+        os.rename(temp_path, path)
+        shutil.rmtree(old_path, ignore_errors=True)
+        return meta['id']
+    except Exception as e:
+        raise Exception(f"Snapshot save error: {str(e)}")
+
+
+def load_snapshot(path, mmap=True):
+    """Returns (api_data without records, ColumnStore, snapshot id, search index, filter index).
+
+    The indexes are None for snapshots written before they were saved.
+    """
+    try:
+        with open(os.path.join(path, META_FILE), encoding='utf-8') as meta_file:
+            meta = json.load(meta_file)
+        if meta.get('format') not in READABLE_FORMATS:
+            raise ValueError(f"Unsupported snapshot format: {meta.get('format')}")
+
+        mmap_mode = 'r' if mmap else None
+        columns = [_load_column(path, position, info, mmap_mode)
+                   for position, info in enumerate(meta['columns'])]
+        store = ColumnStore(columns, meta['row_count'])
+        search_index = filter_index = None
+        if 'search' in meta:
+            search_index = _load_search_index(path, meta['search'], mmap_mode)
+            filter_index = _load_filter_index(path, meta['filter'], store, mmap_mode)
+        return meta['api_data'], store, meta['id'], search_index, filter_index
+    except Exception as e:
+        raise Exception(f"Snapshot load error: {str(e)}")
+
+
+def is_snapshot(path):
+    return os.path.isfile(os.path.join(path, META_FILE))
+
+
+def snapshot_version(path):
+    """Changes whenever the snapshot at path is replaced (save_snapshot renames a new meta.json into place)"""
+    stat = os.stat(os.path.join(path, META_FILE))
+    return (stat.st_ino, stat.st_mtime_ns)
+
+
+def _save_column(path, position, column):
+    prefix = os.path.join(path, str(position))
+    if isinstance(column, NumericColumn):
+        np.save(f"{prefix}.values.npy", column.values)
+        if column.nulls is not None:
+            np.save(f"{prefix}.nulls.npy", column.nulls)
+        return {"name": column.name, "kind": "numeric", "nulls": column.nulls is not None}
+
+    if isinstance(column, DictionaryColumn):
+        np.save(f"{prefix}.codes.npy", column.codes)
+        _save_strings(f"{prefix}.offsets.npy", f"{prefix}.strings.bin", column.dictionary.tolist())
+        return {"name": column.name, "kind": "dictionary"}
+
+    with open(f"{prefix}.objects.pkl", 'wb') as objects:
+        pickle.dump(column.values, objects, protocol=pickle.HIGHEST_PROTOCOL)
+    return {"name": column.name, "kind": "object"}
+
+
+def _load_column(path, position, info, mmap_mode):
+    prefix = os.path.join(path, str(position))
+    name = info['name']
+    if info['kind'] == 'numeric':
+        nulls = np.load(f"{prefix}.nulls.npy") if info['nulls'] else None
+        return NumericColumn.from_packed(name, np.load(f"{prefix}.values.npy", mmap_mode=mmap_mode), nulls)
+
+    if info['kind'] == 'dictionary':
+        # The dictionary is decoded once; workers forked afterwards share it
+        values = _load_strings(f"{prefix}.offsets.npy", f"{prefix}.strings.bin")
+        dictionary = np.empty(len(values), dtype=object)
+        dictionary[:] = values
+        return DictionaryColumn(name, np.load(f"{prefix}.codes.npy", mmap_mode=mmap_mode), dictionary)
+
+    with open(f"{prefix}.objects.pkl", 'rb') as objects:
+        return ObjectColumn(name, pickle.load(objects))
+
+
+def _save_search_index(path, index):
+    _save_strings(os.path.join(path, 'search.terms.offsets.npy'), os.path.join(path, 'search.terms.bin'), index.terms)
+    for position, postings in enumerate(index.column_postings):
+        _save_postings(os.path.join(path, f'search.{position}'), postings)
+    _save_postings(os.path.join(path, 'search.refs'), index.term_refs)
+    _save_postings(os.path.join(path, 'search.grams'), index.gram_terms)
+    np.save(os.path.join(path, 'search.grams.keys.npy'), index.gram_keys)
+    return {"row_count": index.row_count, "column_count": index.column_count,
+            "columns": len(index.column_postings)}
+
+
+def _load_search_index(path, info, mmap_mode):
+    column_postings = [_load_postings(os.path.join(path, f'search.{position}'), mmap_mode)
+                       for position in range(info['columns'])]
+    return SearchIndex.from_parts(
+        info['row_count'],
+        info['column_count'],
+        _load_strings(os.path.join(path, 'search.terms.offsets.npy'), os.path.join(path, 'search.terms.bin')),
+        column_postings,
+        _load_postings(os.path.join(path, 'search.refs'), mmap_mode),
+        np.load(os.path.join(path, 'search.grams.keys.npy'), mmap_mode=mmap_mode),
+        _load_postings(os.path.join(path, 'search.grams'), mmap_mode)
+    )
+
+
+def _save_filter_index(path, index, store):
+    fields = []
+    for position, name in enumerate(store.field_names):
+        prefix = os.path.join(path, f'filter.{position}')
+        field = {"kind": index.field_kinds[name], "hash": None, "sorted": None}
+        hash_index = index.hash_indexes.get(name)
+        if hash_index is not None:
+            _save_postings(f"{prefix}.hash", hash_index.postings)
+            if isinstance(hash_index.keys, NumericKeys):
+                field["hash"] = "numeric"
+                np.save(f"{prefix}.hash.distinct.npy", hash_index.keys.distinct)
+            elif isinstance(store.columns[position], DictionaryColumn):
+                # Codes are the column's own dictionary codes; the dict is rebuilt from it
+                field["hash"] = "dictionary"
+            else:
+                field["hash"] = "object"
+                with open(f"{prefix}.hash.keys.pkl", 'wb') as keys:
+                    pickle.dump(hash_index.keys, keys, protocol=pickle.HIGHEST_PROTOCOL)
+        sorted_index = index.sorted_indexes.get(name)
+        if sorted_index is not None:
+            field["sorted"] = "date" if sorted_index.to_key is date_key else "number"
+            np.save(f"{prefix}.sorted.rows.npy", sorted_index.rows)
+            np.save(f"{prefix}.sorted.values.npy", sorted_index.values)
+        fields.append(field)
+    return {"row_count": index.row_count, "fields": fields}
+
+
+def _load_filter_index(path, info, store, mmap_mode):
+    hash_indexes, sorted_indexes, field_kinds = {}, {}, {}
+    for position, (name, field) in enumerate(zip(store.field_names, info['fields'])):
+        prefix = os.path.join(path, f'filter.{position}')
+        field_kinds[name] = field['kind']
+        if field['hash'] == 'numeric':
+            keys = NumericKeys(np.load(f"{prefix}.hash.distinct.npy", mmap_mode=mmap_mode))
+        elif field['hash'] == 'dictionary':
+            keys = {value: code for code, value in enumerate(store.columns[position].dictionary.tolist())}
+        elif field['hash'] == 'object':
+            with open(f"{prefix}.hash.keys.pkl", 'rb') as key_file:
+                keys = pickle.load(key_file)
+        if field['hash']:
+            hash_indexes[name] = HashIndex.from_postings(keys, _load_postings(f"{prefix}.hash", mmap_mode))
+        if field['sorted']:
+            sorted_indexes[name] = SortedIndex.from_arrays(
+                np.load(f"{prefix}.sorted.rows.npy", mmap_mode=mmap_mode),
+                np.load(f"{prefix}.sorted.values.npy", mmap_mode=mmap_mode),
+                info['row_count'],
+                date_key if field['sorted'] == 'date' else float
+            )
+    return FilterIndex.from_parts(info['row_count'], hash_indexes, sorted_indexes, field_kinds)
+
+
+def _save_postings(prefix, postings):
+    np.save(f"{prefix}.values.npy", postings.values)
+    np.save(f"{prefix}.offsets.npy", postings.offsets)
+
+
+def _load_postings(prefix, mmap_mode):
+    return PostingLists.from_arrays(np.load(f"{prefix}.values.npy", mmap_mode=mmap_mode),
+                                    np.load(f"{prefix}.offsets.npy", mmap_mode=mmap_mode))
+
+
+def _save_strings(offsets_path, blob_path, values):
+    """Strings as one UTF-8 blob plus an array of offsets into it"""
+    encoded = [value.encode('utf-8') for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    np.save(offsets_path, offsets)
+    with open(blob_path, 'wb') as strings:
+        strings.write(b''.join(encoded))
+
+
+def _load_strings(offsets_path, blob_path):
+    offsets = np.load(offsets_path).tolist()
+    with open(blob_path, 'rb') as strings:
+        blob = strings.read()
+    return [blob[start:end].decode('utf-8') for start, end in zip(offsets[:-1], offsets[1:])]
@@ -0,0 +1,122 @@
+import threading
+import numpy as np
+import pandas as pd
+from store import NumericColumn, DictionaryColumn
+
+
+# Sort orders kept per dataset version; the oldest is dropped beyond this
+MAX_SORT_ORDERS = 16
+# '-' marks a descending field; the Unicode minus sign is accepted too
+DESCENDING_PREFIXES = ('-', '−')
+
+
+class SortError(ValueError):
+    """Raised for sort or fields parameters naming unknown fields"""
+
+
+def parse_sort(value, field_names):
+    """'city,-amount' -> (('city', False), ('amount', True)); empty for no sort"""
+    keys = []
+    for part in (value or '').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        descending = part.startswith(DESCENDING_PREFIXES)
+        name = part[1:].strip() if descending else part.lstrip('+')
+        if name not in field_names:
+            raise SortError(f"Unknown sort field '{name}'")
+        keys.append((name, descending))
+    return tuple(keys)
+
+
+def parse_fields(value, field_names):
+    """'a,b,c' -> ('a', 'b', 'c') in the requested order; None (every field) when not given"""
+    if not value:
+        return None
+    names = []
+    for name in value.split(','):
+        name = name.strip()
+        if not name or name in names:
+            continue
+        if name not in field_names:
+            raise SortError(f"Unknown field '{name}'")
+        names.append(name)
+    return tuple(names) or None
+
+
+class SortOrders:
+    """Row permutations of one store, computed on first use and kept for its Dataset version.
+
+    Each field is ranked once (dense ranks, nulls after every value) and
+    a sort order is a stable lexsort of those ranks, so rows that tie
+    stay in file order. Paging through a sorted view then only slices
+    the cached permutation. Lookups of cached orders take no lock; the
+    lock only keeps concurrent first requests from sorting twice.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.ranks = {}
+        self.orders = {}
+        self.lock = threading.Lock()
+
+    @property
+    def nbytes(self):
+        return sum(ranks.nbytes for ranks in self.ranks.values()) + sum(order.nbytes for order in self.orders.values())
+
+    def order(self, keys):
+        """Row positions in the order of keys ((field, descending) pairs)"""
+        order = self.orders.get(keys)
+        if order is not None:
+            return order
+        with self.lock:
+            order = self.orders.get(keys)
+            if order is None:
+                order = self._sort(keys)
+                if len(self.orders) >= MAX_SORT_ORDERS:
+                    self.orders.pop(next(iter(self.orders)))
+                self.orders[keys] = order
+        return order
+
+    def _sort(self, keys):
+        sort_keys = []
+        for name, descending in keys:
+            ranks = self._ranks(name)
+            # Nulls sort after every value in both directions
+            sort_keys.append(np.where(ranks < 0, np.iinfo(np.int64).max, -ranks if descending else ranks))
+        # lexsort sorts by its last key first
+        return np.lexsort(sort_keys[::-1])
+
+    def _ranks(self, name):
+        ranks = self.ranks.get(name)
+        if ranks is None:
+            ranks = rank_column(self.store.columns[self.store.field_names.index(name)])
+            self.ranks[name] = ranks
+        return ranks
+
+
+def rank_column(column):
+    """Dense int64 rank of every row's value in ascending order; -1 for nulls"""
+    null_mask = column.null_mask()
+    if isinstance(column, DictionaryColumn):
+        # Only the dictionary is sorted; rows take the rank of their code
+        dictionary_ranks = np.empty(len(column.dictionary), dtype=np.int64)
+        dictionary_ranks[np.argsort(column.dictionary, kind='stable')] = np.arange(len(column.dictionary))
+        codes = column.codes.astype(np.int64)
+        return np.where(null_mask, -1, dictionary_ranks[np.maximum(codes, 0)])
+
+    if isinstance(column, NumericColumn):
+        _, ranks = np.unique(column.values, return_inverse=True)
+        return np.where(null_mask, -1, ranks.reshape(-1))
+
+    # Mixed values: numbers first in numeric order, then the rest by their text
+    values = pd.Series(column.values, dtype=object)
+    numbers = pd.to_numeric(values, errors='coerce').to_numpy(dtype=np.float64)
+    numeric = ~np.isnan(numbers) & ~null_mask
+    text = ~numeric & ~null_mask
+    ranks = np.full(len(values), -1, dtype=np.int64)
+    distinct, number_ranks = np.unique(numbers[numeric], return_inverse=True)
+    ranks[numeric] = number_ranks.reshape(-1)
+    _, text_ranks = np.unique(values[text].astype(str).to_numpy(dtype=object), return_inverse=True)
+    ranks[text] = text_ranks.reshape(-1) + len(distinct)
+    return ranks
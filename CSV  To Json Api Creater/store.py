@@ -0,0 +1,351 @@
+import sys
+import numpy as np
+import pandas as pd
+
+
+# String columns whose distinct values are at most this share of their values are dictionary-encoded
+DICTIONARY_MAX_RATIO = 0.1
+# and that have at most this many distinct values (pandas then keeps the codes in int16)
+DICTIONARY_MAX_UNIQUE = 32767
+
+class NumericColumn:
+    """Typed NumPy values (int64, float64 or bool) with a packed null bitmap"""
+
+    def __init__(self, name, values, null_mask=None):
+        self.name = name
+        self.values = values
+        self.nulls = np.packbits(null_mask) if null_mask is not None and null_mask.any() else None
+
+    @classmethod
+    def from_packed(cls, name, values, nulls):
+        """Build from an already packed null bitmap (None when there are no nulls)"""
+        column = cls(name, values)
+        column.nulls = nulls
+        return column
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes + (self.nulls.nbytes if self.nulls is not None else 0)
+
+    def null_mask(self, indices=None):
+        """Null flags for the given rows (all rows when indices is None)"""
+        if self.nulls is None:
+            count = len(self) if indices is None else len(indices)
+            return np.zeros(count, dtype=bool)
+        if indices is None:
+            return np.unpackbits(self.nulls, count=len(self)).astype(bool)
+        return ((self.nulls[indices >> 3] >> (7 - (indices & 7))) & 1).astype(bool)
+
+    def take(self, indices):
+        values = self.values[indices].tolist()
+        if self.nulls is not None:
+            for position in np.flatnonzero(self.null_mask(indices)):
+                values[position] = None
+        return values
+
+    def match(self, query):
+        """Rows whose value is truthy and contains query in its lowercase text"""
+        present = ~self.null_mask()
+        distinct = np.unique(self.values[present])
+        matched = [value for value in distinct.tolist() if value and query in str(value).lower()]
+        if not matched:
+            return np.zeros(len(self), dtype=bool)
+        return np.isin(self.values, matched) & present
+
+    def search_terms(self):
+        """Per-row codes into a list of lowercase value strings (-1 = not searchable)"""
+        distinct, codes = np.unique(self.values, return_inverse=True)
+        codes = codes.reshape(-1)
+        distinct = distinct.tolist()
+        falsy = np.array([not value for value in distinct], dtype=bool)
+        codes = np.where(falsy[codes] | self.null_mask(), -1, codes)
+        return codes, [str(value).lower() for value in distinct]
+
+
+class DictionaryColumn:
+    """Strings stored once in a dictionary and referenced by integer codes (-1 = null)"""
+
+    def __init__(self, name, codes, dictionary):
+        self.name = name
+        self.codes = codes
+        self.dictionary = dictionary
+
+    def __len__(self):
+        return len(self.codes)
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes + self.dictionary.nbytes + sum(sys.getsizeof(value) for value in self.dictionary.tolist())
+
+    def null_mask(self, indices=None):
+        codes = self.codes if indices is None else self.codes[indices]
+        return codes < 0
+
+    def take(self, indices):
+        codes = self.codes[indices]
+        values = self.dictionary[np.maximum(codes, 0)].tolist()
+        for position in np.flatnonzero(codes < 0):
+            values[position] = None
+        return values
+
+    def match(self, query):
+        matched = [code for code, value in enumerate(self.dictionary.tolist())
+                   if value and query in value.lower()]
+        if not matched:
+            return np.zeros(len(self), dtype=bool)
+        return np.isin(self.codes, matched)
+
+    def search_terms(self):
+        terms = [value.lower() for value in self.dictionary.tolist()]
+        empty = np.array([not value for value in terms], dtype=bool)
+        codes = self.codes.astype(np.int64)
+        if empty.any():
+            codes = np.where((codes >= 0) & empty[np.maximum(codes, 0)], -1, codes)
+        return codes, terms
+
+
+class ObjectColumn:
+    """Fallback for mixed-type columns, kept as Python objects"""
+
+    def __init__(self, name, values):
+        self.name = name
+        self.values = values
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def nbytes(self):
+        # Approximate: shared objects such as small ints are counted every time
+        return self.values.nbytes + sum(sys.getsizeof(value) for value in self.values.tolist() if value is not None)
+
+    def null_mask(self, indices=None):
+        values = self.values if indices is None else self.values[indices]
+        return pd.isna(values)
+
+    def take(self, indices):
+        return [None if _is_missing(value) else value for value in self.values[indices].tolist()]
+
+    def match(self, query):
+        cache = {}
+        mask = np.zeros(len(self), dtype=bool)
+        for position, value in enumerate(self.values.tolist()):
+            if _is_missing(value) or not value:
+                continue
+            # 1 and True compare equal, so the type is part of the key
+            key = (type(value), value)
+            if key not in cache:
+                cache[key] = query in str(value).lower()
+            mask[position] = cache[key]
+        return mask
+
+    def search_terms(self):
+        values = pd.Series(self.values, dtype=object)
+        # Falsy values (0, False, '') are never matched, mirroring the old scan
+        searchable = ~values.isna().to_numpy() & self.values.astype(bool)
+        codes = np.full(len(self), -1, dtype=np.int64)
+        if not searchable.any():
+            return codes, []
+        local_codes, terms = pd.factorize(values[searchable].astype(str).str.lower())
+        codes[searchable] = local_codes
+        return codes, terms.tolist()
+
+
+class ColumnStore:
+    """Column-oriented record store; row dicts are only built for rows being returned"""
+
+    def __init__(self, columns, row_count=0):
+        self.columns = columns
+        self.field_names = [column.name for column in columns]
+        self.row_count = len(columns[0]) if columns else row_count
+
+    def __len__(self):
+        return self.row_count
+
+    @classmethod
+    def from_dataframe(cls, df):
+        columns = [build_column(df.columns[position], df.iloc[:, position])
+                   for position in range(df.shape[1])]
+        return cls(columns, len(df))
+
+    @classmethod
+    def from_records(cls, records, field_names=None):
+        if field_names is None:
+            field_names = list(records[0].keys()) if records else []
+        df = pd.DataFrame.from_records(records, columns=field_names) if records else pd.DataFrame(columns=field_names)
+        return cls.from_dataframe(df)
+
+    @property
+    def nbytes(self):
+        return sum(column.nbytes for column in self.columns)
+
+    def rows(self, indices, fields=None):
+        """Build record dicts for the given row positions, with only the named fields when fields is given"""
+        indices = np.asarray(indices, dtype=np.int64)
+        if not len(indices):
+            return []
+        names = self.field_names if fields is None else list(fields)
+        columns = self.columns if fields is None else [self.columns[self.field_names.index(name)] for name in names]
+        values = [column.take(indices) for column in columns]
+        return [dict(zip(names, row)) for row in zip(*values)]
+
+    def slice(self, start, end, fields=None):
+        start = max(start, 0)
+        end = min(end, self.row_count)
+        if start >= end:
+            return []
+        return self.rows(np.arange(start, end), fields)
+
+    def row(self, index):
+        return self.rows([index])[0]
+
+    def search(self, query):
+        """Row positions where any value contains query (lowercase substring match)"""
+        mask = np.zeros(self.row_count, dtype=bool)
+        for column in self.columns:
+            mask |= column.match(query)
+        return np.flatnonzero(mask)
+
+    def appended(self, other):
+        """A new store holding these rows followed by other's; self is left untouched"""
+        if other.field_names != self.field_names:
+            raise ValueError("Appended rows have different fields")
+        columns = [append_column(column, tail) for column, tail in zip(self.columns, other.columns)]
+        return ColumnStore(columns, self.row_count + other.row_count)
+
+    def string_rows(self, indices=None):
+        """Rows as lists of str(value), for the CSV array format"""
+        if indices is None:
+            indices = np.arange(self.row_count)
+        indices = np.asarray(indices, dtype=np.int64)
+        values = [[str(value) for value in column.take(indices)] for column in self.columns]
+        return [list(row) for row in zip(*values)]
+
+
+def build_column(name, series):
+    """Pick the most compact representation for a cleaned column"""
+    kind = series.dtype.kind
+    if kind in 'iub':
+        return NumericColumn(name, series.to_numpy())
+    if kind == 'f':
+        null_mask = series.isna().to_numpy()
+        return NumericColumn(name, series.fillna(0).to_numpy(dtype=np.float64), null_mask)
+
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        categories = series.cat.categories
+        if pd.api.types.infer_dtype(categories, skipna=True) == 'string':
+            # The categorical codes already are dictionary codes (-1 = null)
+            codes = series.cat.codes.to_numpy()
+            return DictionaryColumn(name, codes.astype(_code_dtype(len(categories))),
+                                    np.asarray(categories, dtype=object))
+        series = series.astype(object)
+
+    inferred = pd.api.types.infer_dtype(series, skipna=True)
+    null_mask = series.isna().to_numpy()
+    if inferred == 'string':
+        codes, uniques = pd.factorize(series)
+        return DictionaryColumn(name, codes.astype(_code_dtype(len(uniques))), np.asarray(uniques, dtype=object))
+    if inferred == 'boolean':
+        return NumericColumn(name, _filled(series, null_mask, False, bool), null_mask)
+    if inferred == 'integer':
+        try:
+            return NumericColumn(name, _filled(series, null_mask, 0, np.int64), null_mask)
+        except OverflowError:
+            pass
+    return ObjectColumn(name, series.to_numpy(dtype=object))
+
+
+def dictionary_encode(df, fields_info):
+    """Store low-cardinality string columns of a cleaned frame as pd.Categorical.
+
+    Candidates are picked from the unique_count of fields_info, so no
+    column is scanned only to be skipped. Each distinct string is then
+    held once and rows (and records built from the frame) refer to it.
+    Returns the frame and a report of the encoded fields and their memory
+    before and after.
+    """
+    encoded, before, after = [], 0, 0
+    for position, name in enumerate(df.columns):
+        info = fields_info.get(name, {})
+        series = df.iloc[:, position]
+        present = len(series) - info.get('null_count', 0)
+        if series.dtype != object or info.get('type') != 'str' or not present:
+            continue
+        unique_count = info.get('unique_count', present)
+        if unique_count > present * DICTIONARY_MAX_RATIO or unique_count > DICTIONARY_MAX_UNIQUE:
+            continue
+        categorical = series.astype('category')
+        # The samples only show a few values; a mixed column keeps its objects
+        if pd.api.types.infer_dtype(categorical.cat.categories, skipna=True) != 'string':
+            continue
+        before += int(series.memory_usage(index=False, deep=True))
+        after += int(categorical.memory_usage(index=False, deep=True))
+        df.isetitem(position, categorical)
+        info['encoding'] = 'dictionary'
+        encoded.append(name)
+    return df, {
+        "dictionary_encoded_fields": encoded,
+        "encoded_bytes_before": before,
+        "encoded_bytes_after": after,
+        "memory_saved_bytes": before - after
+    }
+
+
+def frame_records(df):
+    """df.to_dict('records'), with None for the nulls of categorical columns (to_dict gives them as NaN)"""
+    categorical = [position for position, dtype in enumerate(df.dtypes) if isinstance(dtype, pd.CategoricalDtype)]
+    if categorical:
+        df = df.copy(deep=False)
+        for position in categorical:
+            series = df.iloc[:, position]
+            # Values stay the category objects, so records still share each distinct string
+            df.isetitem(position, series.astype(object).where(series.notna(), None))
+    return df.to_dict('records')
+
+
+def append_column(column, tail):
+    """Concatenate two columns of the same field, keeping the compact representation when types agree"""
+    if isinstance(column, NumericColumn) and isinstance(tail, NumericColumn) and column.values.dtype == tail.values.dtype:
+        null_mask = np.concatenate([column.null_mask(), tail.null_mask()])
+        return NumericColumn(column.name, np.concatenate([column.values, tail.values]), null_mask)
+
+    if isinstance(column, DictionaryColumn) and isinstance(tail, DictionaryColumn):
+        dictionary = column.dictionary.tolist()
+        positions = {value: code for code, value in enumerate(dictionary)}
+        remap = np.empty(len(tail.dictionary), dtype=np.int64)
+        for code, value in enumerate(tail.dictionary.tolist()):
+            if value not in positions:
+                positions[value] = len(dictionary)
+                dictionary.append(value)
+            remap[code] = positions[value]
+        tail_codes = tail.codes.astype(np.int64)
+        tail_codes = np.where(tail_codes >= 0, remap[np.maximum(tail_codes, 0)], -1)
+        codes = np.concatenate([column.codes.astype(np.int64), tail_codes]).astype(_code_dtype(len(dictionary)))
+        return DictionaryColumn(column.name, codes, np.asarray(dictionary, dtype=object))
+
+    if isinstance(column, ObjectColumn) and isinstance(tail, ObjectColumn):
+        return ObjectColumn(column.name, np.concatenate([column.values, tail.values]))
+
+    # Types differ (e.g. numbers followed by text): rebuild from the Python values
+    values = column.take(np.arange(len(column))) + tail.take(np.arange(len(tail)))
+    return build_column(column.name, pd.Series(values, dtype=object))
+
+
+def _filled(series, null_mask, fill, dtype):
+    values = series.to_numpy(dtype=object, copy=True)
+    values[null_mask] = fill
+    return values.astype(dtype)
+
+
+def _code_dtype(size):
+    for dtype in (np.int8, np.int16, np.int32):
+        if size < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def _is_missing(value):
+    return value is None or (isinstance(value, float) and value != value)
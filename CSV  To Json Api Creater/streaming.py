@@ -0,0 +1,218 @@
+import os
+from datetime import datetime
+import pandas as pd
+from inference import infer_frame
+from detection import detect_csv_format, read_csv_with_format
+from excel import open_workbook, iter_sheet_chunks
+from sketches import FieldAggregator, DuplicateEstimator, DEFAULT_ERROR
+from serializer import dumps_text
+
+
+DEFAULT_CHUNK_SIZE = 50000
+
+
+class JSONStreamSink:
+    """Writes the API document incrementally: header, records, then metadata"""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+        self.count = 0
+
+    def open(self, api_info, endpoints):
+        self.file = open(self.path, 'w', encoding='utf-8')
+        self.file.write('{\n  "api_info": ')
+        self.file.write(dumps_text(api_info))
+        self.file.write(',\n  "endpoints": ')
+        self.file.write(dumps_text(endpoints))
+        self.file.write(',\n  "data": [')
+
+    def write_records(self, records):
+        for record in records:
+            self.file.write(',\n    ' if self.count else '\n    ')
+            self.file.write(dumps_text(record))
+            self.count += 1
+
+    def close(self, metadata):
+        self.file.write('\n  ],\n  "metadata": ')
+        self.file.write(dumps_text(metadata))
+        self.file.write('\n}\n')
+        self.file.close()
+
+
+class NDJSONSink(JSONStreamSink):
+    """One record per line; metadata goes to a .meta.json file next to it"""
+
+    def open(self, api_info, endpoints):
+        self.file = open(self.path, 'w', encoding='utf-8')
+        self.header = {"api_info": api_info, "endpoints": endpoints}
+
+    def write_records(self, records):
+        for record in records:
+            self.file.write(dumps_text(record))
+            self.file.write('\n')
+            self.count += 1
+
+    def close(self, metadata):
+        self.file.close()
+        with open(os.path.splitext(self.path)[0] + '.meta.json', 'w', encoding='utf-8') as meta:
+            meta.write(dumps_text(dict(self.header, metadata=metadata), pretty=True))
+
+
+def sink_for_path(path):
+    if path.lower().endswith(('.ndjson', '.jsonl')):
+        return NDJSONSink(path)
+    return JSONStreamSink(path)
+
+
+def iter_source_chunks(file_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield (raw chunk, fraction of input consumed) without loading the whole file.
+
+    CSV values are parsed like the whole-file path parses them (pandas
+    picks each column's dtype), so a column typed the same in every chunk
+    converts exactly as it does in clean_data. pandas only sees one chunk
+    at a time, though; stream_to_sink reports columns whose dtype changed
+    between chunks.
+    """
+    file_ext = os.path.splitext(file_path)[1].lower()
+    if file_ext == '.csv':
+        csv_format = detect_csv_format(file_path)
+        size = os.path.getsize(file_path) or 1
+        with open(file_path, 'rb') as handle:
+            reader = read_csv_with_format(handle, csv_format, chunksize=chunk_size)
+            for chunk in reader:
+                yield chunk, min(handle.tell() / size, 1.0)
+    elif file_ext == '.xlsx':
+        # Rows stream from openpyxl's read-only mode; only one chunk is in memory at a time
+        yield from iter_sheet_chunks(file_path, chunk_size=chunk_size)
+    elif file_ext == '.xls':
+        # xlrd cannot page through a workbook, so the sheet is sliced after loading
+        df = open_workbook(file_path).parse(0)
+        total = max(len(df), 1)
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size], min((start + chunk_size) / total, 1.0)
+    else:
+        raise ValueError(f"Unsupported file format: {file_ext}")
+
+
+def stream_to_sink(file_path, sink, clean_column_name, config, on_progress=None, on_status=None):
+    """Clean the source chunk by chunk and write records to sink.
+
+    Returns the API structure with metadata and the first preview_limit
+    records; the full record list only ever exists in the sink.
+    Columns that are empty in every chunk are kept, because dropping them
+    would require a second pass over the input. Statistics always come
+    from the mergeable sketches (config['statistics'] does not apply),
+    sized for config['statistics_error'].
+    """
+    chunk_size = config.get('chunk_size', DEFAULT_CHUNK_SIZE)
+    error = config.get('statistics_error', DEFAULT_ERROR)
+    preview_limit = config.get('preview_limit', 1000)
+    preview_only = config.get('preview_only', False)
+
+    api_info, endpoints = api_header(file_path)
+
+    columns = None
+    aggregators = {}
+    parsed_kinds = {}  # column -> how pandas parsed it in each chunk
+    duplicates = DuplicateEstimator()
+    preview = []
+    total_rows = 0
+    null_cells = 0
+
+    sink.open(api_info, endpoints)
+    try:
+        for chunk, fraction in iter_source_chunks(file_path, chunk_size):
+            if columns is None:
+                columns = [clean_column_name(col) for col in chunk.columns]
+                aggregators = {col: FieldAggregator(error=error) for col in columns}
+                parsed_kinds = {col: set() for col in columns}
+            chunk.columns = columns
+            chunk = chunk.dropna(how='all')
+
+            if preview_only:
+                chunk = chunk.iloc[:preview_limit - total_rows]
+            if chunk.empty:
+                continue
+
+            for position, col in enumerate(columns):
+                values = chunk.iloc[:, position]
+                if values.notna().any():
+                    parsed_kinds[col].add(_parsed_kind(values.dtype))
+            chunk, _ = infer_frame(chunk, infer_dtypes=False)
+
+            for position, col in enumerate(columns):
+                aggregators[col].update(chunk.iloc[:, position].to_numpy())
+            null_cells += int(chunk.isna().sum().sum())
+            duplicates.update(pd.util.hash_pandas_object(chunk, index=False).to_numpy())
+
+            records = chunk.to_dict('records')
+            sink.write_records(records)
+            if len(preview) < preview_limit:
+                preview.extend(records[:preview_limit - len(preview)])
+            total_rows += len(records)
+
+            if on_progress:
+                on_progress(fraction)
+            if on_status:
+                on_status(f"Streamed {total_rows:,} records...")
+            if preview_only and total_rows >= preview_limit:
+                break
+    except Exception:
+        sink.file.close()
+        raise
+
+    metadata = build_metadata(columns or [], aggregators, total_rows, null_cells, duplicates)
+    # The whole-file path types these columns once for all rows, so some of their values may convert differently
+    metadata["data_quality"]["chunk_type_mismatches"] = [col for col in columns or [] if len(parsed_kinds[col]) > 1]
+    sink.close(metadata)
+
+    return {
+        "api_info": api_info,
+        "metadata": metadata,
+        "endpoints": endpoints,
+        "output_file": sink.path,
+        "data": preview
+    }
+
+
+def api_header(file_path):
+    """api_info and endpoints blocks of a generated API"""
+    api_info = {
+        "version": "1.0",
+        "title": f"{os.path.splitext(os.path.basename(file_path))[0]} API",
+        "description": f"Generated JSON API from {os.path.splitext(file_path)[1]} file",
+        "generated_at": datetime.now().isoformat(),
+        "source_file": os.path.basename(file_path)
+    }
+    endpoints = {
+        "get_all": "/api/data",
+        "get_by_id": "/api/data/{id}",
+        "search": "/api/data/search?q={query}",
+        "filter": "/api/data/filter?field={field}&value={value}",
+        "paginate": "/api/data?page={page}&limit={limit}",
+        "fields": "/api/fields",
+        "stats": "/api/stats"
+    }
+    return api_info, endpoints
+
+
+def _parsed_kind(dtype):
+    """How pandas parsed a column of a chunk (integers, floats, booleans or text)"""
+    return {'i': 'integer', 'u': 'integer', 'f': 'float', 'b': 'boolean'}.get(dtype.kind, 'text')
+
+
+def build_metadata(columns, aggregators, total_rows, null_cells, duplicates):
+    """The metadata block from mergeable aggregators"""
+    cells = total_rows * len(columns)
+    return {
+        "total_records": total_rows,
+        "total_fields": len(columns),
+        "fields": columns,
+        "fields_info": {col: aggregators[col].to_field_info() for col in columns},
+        "data_quality": {
+            "empty_rows_removed": 0,
+            **duplicates.quality(),
+            "completeness_score": round((1 - null_cells / cells) * 100, 2) if cells else 0.0
+        }
+    }
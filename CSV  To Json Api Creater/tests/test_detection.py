@@ -0,0 +1,40 @@
+import os
+import sys
+import math
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from detection import sniff_delimiter, detect_csv_format
+from processing import FileProcessor
+
+
+def loaded_records(path):
+    processor = FileProcessor(str(path), {})
+    processor.df = processor.load_csv_file()
+    processor.clean_data()
+    return processor.generate_json_api()['data']
+
+
+def test_short_trailing_rows_keep_the_header_columns(tmp_path):
+    text = "a,b,c\n1,2,3\n4,5\n6,7\n8,9\n"
+    assert sniff_delimiter(text) == (',', 3)
+
+    path = tmp_path / "ragged.csv"
+    path.write_text(text, encoding='utf-8')
+    records = loaded_records(path)
+    assert list(records[0]) == ['a', 'b', 'c']
+    assert records[0]['c'] == 3
+    assert records[1]['a'] == 4 and records[1]['b'] == 5
+    assert records[1]['c'] is None or math.isnan(records[1]['c'])
+
+
+def test_aligned_columns_are_still_read_as_fixed_width(tmp_path):
+    path = tmp_path / "aligned.txt.csv"
+    path.write_text("name  age  city\nAnn   30   Rome\nBob   41   Oslo\n", encoding='utf-8')
+    assert detect_csv_format(str(path))['fixed_width']
+    assert loaded_records(path)[1] == {"name": "Bob", "age": 41, "city": "Oslo"}
+
+
+def test_text_with_spaces_does_not_outvote_the_real_delimiter():
+    text = "word 0\tsentence 1\nnorth\tnorth and south\neast\tred and green\nwest\tbeta\n"
+    assert sniff_delimiter(text) == ('\t', 2)
@@ -0,0 +1,55 @@
+import json
+import os
+import sys
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from processing import FileProcessor
+from export import write_api_file
+from store import dictionary_encode, DICTIONARY_MAX_UNIQUE
+from Api import FlaskAPIServer
+
+
+def reject_constant(name):
+    raise ValueError(f"{name} is not valid JSON")
+
+
+def processed(tmp_path):
+    rows = ["id,city"] + [f"{i},{'' if i == 3 else ['Paris', 'Rome'][i % 2]}" for i in range(40)]
+    path = tmp_path / "cities.csv"
+    path.write_text("\n".join(rows) + "\n", encoding='utf-8')
+    processor = FileProcessor(str(path), {})
+    processor.df = processor.load_csv_file()
+    processor.clean_data()
+    return processor, processor.generate_json_api()
+
+
+def test_blank_cell_of_an_encoded_column_is_null(tmp_path):
+    processor, api_data = processed(tmp_path)
+    assert api_data['metadata']['fields_info']['city']['encoding'] == 'dictionary'
+    assert api_data['data'][3]['city'] is None
+
+    output = tmp_path / "cities_api.json"
+    write_api_file(api_data, str(output))
+    document = json.loads(output.read_text(encoding='utf-8'), parse_constant=reject_constant)
+    assert document['data'][3] == {"id": 3, "city": None}
+
+    server = FlaskAPIServer()
+    server.update_data(api_data, processor.df, processor.sheet_frames)
+    response = server.app.test_client().get('/api/data?page=1&limit=5')
+    page = json.loads(response.get_data(as_text=True), parse_constant=reject_constant)
+    assert page['data'][3] == {"id": 3, "city": None}
+
+
+def test_columns_with_many_distinct_values_stay_plain():
+    df = pd.DataFrame({"few": ["a", "b"] * 50, "some": [f"v{i % 30}" for i in range(100)]}, dtype=object)
+    fields_info = {name: {"type": "str", "null_count": 0, "unique_count": df[name].nunique()} for name in df.columns}
+    df, report = dictionary_encode(df, fields_info)
+    assert report["dictionary_encoded_fields"] == ["few"]
+    assert fields_info["some"].get("encoding") is None
+
+    over_cap = {"type": "str", "null_count": 0, "unique_count": DICTIONARY_MAX_UNIQUE + 1}
+    large = pd.DataFrame({"code": ["x"] * ((DICTIONARY_MAX_UNIQUE + 1) * 20)}, dtype=object)
+    _, report = dictionary_encode(large, {"code": over_cap})
+    assert report["dictionary_encoded_fields"] == []
@@ -0,0 +1,38 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from processing import FileProcessor
+from incremental import process_incremental
+
+
+CSV = "id,code,ratio\n1,01,1.5\n2,002,3\n3,3,2.5\n"
+APPENDED = "4,04,2\n5,5,7\n"
+
+
+def whole_file_records(path):
+    processor = FileProcessor(path, {})
+    processor.df = processor.load_csv_file()
+    processor.clean_data()
+    return processor.generate_json_api()['data']
+
+
+def test_incremental_records_match_a_normal_run(tmp_path):
+    path = str(tmp_path / "growing.csv")
+    with open(path, 'w', encoding='utf-8') as handle:
+        handle.write(CSV)
+    clean_column_name = FileProcessor(path, {}).clean_column_name
+
+    api_data, _, _, state = process_incremental(path, None, clean_column_name)
+    assert api_data['data'] == whole_file_records(path)
+    assert api_data['data'][0] == {"id": True, "code": True, "ratio": 1.5}
+    assert api_data['data'][1]['ratio'] == 3.0
+
+    with open(path, 'a', encoding='utf-8') as handle:
+        handle.write(APPENDED)
+    api_data, _, _, state = process_incremental(path, state, clean_column_name)
+    assert api_data['appended'] == {"start_row": 3, "rows": 2}
+    assert api_data['data'] == whole_file_records(path)[3:]
+    # Whole numbers appended to the float column are still floats
+    assert [type(record['ratio']) for record in api_data['data']] == [float, float]
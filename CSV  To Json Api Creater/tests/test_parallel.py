@@ -0,0 +1,40 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inference import infer_frame
+from parallel import parallel_infer_frame, _share_columns, SHARED_TEXT_MAX_RATIO
+
+
+def frame_with_long_value(rows=200000):
+    rng = np.random.default_rng(0)
+    notes = rng.choice(np.array(['ok', 'late', 'n/a', 'checked'], dtype=object), rows)
+    notes[rows // 2] = 'x' * 100000
+    return pd.DataFrame({
+        'amount': rng.integers(0, 1000, rows).astype(str).astype(object),
+        'note': notes,
+        'city': rng.choice(np.array(['Paris', 'Rome'], dtype=object), rows),
+    })
+
+
+def test_text_column_with_one_very_long_value_is_not_shared():
+    df = frame_with_long_value()
+    shared, layout, local = _share_columns(df)
+    try:
+        assert local == [1]
+        assert sorted(layout) == [0, 2]
+        assert shared.size <= SHARED_TEXT_MAX_RATIO * df.memory_usage(index=False, deep=True).sum()
+    finally:
+        shared.close()
+        shared.unlink()
+
+
+def test_parallel_result_matches_with_a_local_column():
+    df = frame_with_long_value()
+    expected, expected_types = infer_frame(df.copy())
+    result, column_types, _ = parallel_infer_frame(df, 2)
+    assert column_types == expected_types
+    pd.testing.assert_frame_equal(result, expected)
@@ -0,0 +1,36 @@
+import json
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from serializer import available_backends, get_serializer
+from Api import FlaskAPIServer
+
+
+def test_backends_encode_the_same_document():
+    value = {"b": np.int64(3), "a": np.arange(3), "when": pd.Timestamp('2020-01-01'), "text": "Zürich", "none": None}
+    encoded = {name: get_serializer(name).dumps(value, sort_keys=True) for name in available_backends()}
+    assert set(encoded.values()) == {'{"a":[0,1,2],"b":3,"none":null,"text":"Zürich","when":"2020-01-01 00:00:00"}'.encode('utf-8')}
+
+
+def test_backends_write_nan_and_infinity_as_null():
+    value = {"floats": [1.5, float('nan'), float('inf')], "column": np.array([np.nan, -np.inf, 2.0]),
+             "scalar": np.float64('nan'), "big": 2**70}
+    for pretty in (False, True):
+        encoded = {name: get_serializer(name).dumps(value, pretty, True) for name in available_backends()}
+        assert len(set(encoded.values())) == 1, encoded
+        assert json.loads(encoded['json']) == {
+            "big": 2**70, "column": [None, None, 2.0], "floats": [1.5, None, None], "scalar": None}
+        assert b'NaN' not in encoded['json'] and b'Infinity' not in encoded['json']
+
+
+def test_jsonify_is_compact_unless_pretty_is_requested():
+    client = FlaskAPIServer().app.test_client()
+    compact = client.get('/api/data').get_data(as_text=True)
+    pretty = client.get('/api/data?pretty=1').get_data(as_text=True)
+    assert compact == '{"error":"No data loaded"}\n'
+    assert pretty == '{\n  "error": "No data loaded"\n}\n'
+    assert json.loads(pretty) == json.loads(compact)
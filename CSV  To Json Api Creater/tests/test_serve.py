@@ -0,0 +1,33 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from serve import load_server
+
+
+def write_csv(path, rows):
+    path.write_text("id,city\n" + "".join(f"{i},{city}\n" for i, city in enumerate(rows)), encoding='utf-8')
+
+
+def test_reload_keeps_unchanged_datasets_loaded(tmp_path):
+    sales, stock = tmp_path / "sales.csv", tmp_path / "stock.csv"
+    write_csv(sales, ["Paris", "Rome"])
+    write_csv(stock, ["Oslo"])
+    datasets = {"sales": str(sales), "stock": str(stock)}
+    server = load_server(None, None, datasets=datasets)
+    registry = server.registry
+    registry.get("sales")
+    registry.get("sales")
+    registry.get("stock")
+    sales_entry, stock_entry = registry.entries["sales"], registry.entries["stock"]
+
+    write_csv(stock, ["Oslo", "Bergen", "Lima"])
+    # A later modification time than the snapshot, as an edit after the conversion would have
+    os.utime(stock, (os.path.getmtime(stock) + 10,) * 2)
+    load_server(None, None, server=server, datasets=datasets)
+
+    assert registry.entries["sales"] is sales_entry
+    assert sales_entry.stats()["loaded"] and (sales_entry.hits, sales_entry.loads) == (1, 1)
+    assert registry.entries["stock"] is not stock_entry
+    assert len(registry.get("stock").store) == 3
@@ -0,0 +1,64 @@
+import os
+import shutil
+import tempfile
+from processing import FileProcessor
+
+
+UPLOAD_EXTENSIONS = ('.csv', '.xlsx', '.xls')
+COPY_BUFFER_BYTES = 1 << 20
+# Uploads at least this large are processed as a background job
+BACKGROUND_UPLOAD_BYTES = 8 << 20
+
+
+def save_upload(file_storage):
+    """Copy an uploaded file to a temporary path with its original extension.
+
+    Werkzeug has already spooled large request bodies to disk; the copy is
+    done in COPY_BUFFER_BYTES blocks, so the upload is never held in memory
+    as one string.
+    """
+    extension = os.path.splitext(file_storage.filename)[1].lower()
+    handle, path = tempfile.mkstemp(prefix='upload-', suffix=extension)
+    try:
+        with os.fdopen(handle, 'wb') as target:
+            shutil.copyfileobj(file_storage.stream, target, COPY_BUFFER_BYTES)
+    except Exception:
+        os.remove(path)
+        raise
+    return path
+
+
+def resolve_source_path(path, roots):
+    """Real path of a server-side file a job may read: a CSV/Excel file inside one of roots.
+
+    Relative paths are taken from the first root; symlinks are resolved
+    before the check, so a link cannot point a job outside the roots.
+    """
+    if not roots:
+        raise PermissionError("Jobs on server files are disabled (no job directories configured)")
+    if not path:
+        raise ValueError("Provide an uploaded 'file' or a 'path'")
+    real = os.path.realpath(os.path.join(roots[0], path))
+    allowed = [os.path.realpath(root) for root in roots]
+    if not any(os.path.commonpath([real, root]) == root for root in allowed):
+        raise PermissionError(f"{path} is outside the job directories")
+    if not real.lower().endswith(UPLOAD_EXTENSIONS):
+        raise ValueError("Only CSV and Excel files can be processed")
+    if not os.path.isfile(real):
+        raise FileNotFoundError(f"File not found: {path}")
+    return real
+
+
+def process_upload(path, filename, config=None, on_progress=None, on_status=None):
+    """Run an uploaded file through the desktop pipeline; returns the FileProcessor and api_data.
+
+    api_info names the uploaded file instead of the temporary copy.
+    """
+    processor = FileProcessor(path, dict(config or {}, streaming=False, incremental=False),
+                              on_progress=on_progress, on_status=on_status)
+    api_data = processor.process()
+    api_info = api_data['api_info']
+    api_info['title'] = f"{os.path.splitext(filename)[0]} API"
+    api_info['description'] = f"Uploaded {os.path.splitext(filename)[1].lstrip('.').upper()} file with {api_data['metadata']['total_records']} records"
+    api_info['source_file'] = filename
+    return processor, api_data
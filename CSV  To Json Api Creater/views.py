@@ -0,0 +1,187 @@
+import json
+from collections import OrderedDict
+from itertools import islice
+import numpy as np
+from PyQt5.QtCore import Qt, QAbstractListModel, QAbstractTableModel, QModelIndex
+
+
+# Rows converted per store read, and how many such blocks the preview keeps
+PREVIEW_BLOCK_ROWS = 256
+PREVIEW_CACHED_BLOCKS = 32
+RECORD_INDENT = '    '
+FIELD_INDENT = '      '
+
+
+class JsonLinesModel(QAbstractListModel):
+    """The lines of json.dumps(api_data, indent=2), formatted only when a view asks for them.
+
+    Everything except the records (api_info, metadata, endpoints) is small
+    and rendered up front. Records with the same number of fields take
+    len(fields) + 2 lines each, so the record and field behind any line are
+    found by arithmetic: a view scrolled anywhere in millions of records
+    only formats the lines on screen. Records with differing
+    fields are shown one compact line each instead.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.clear_document()
+
+    def clear_document(self):
+        self.head = []  # lines before the first record
+        self.tail = []  # lines after the last record
+        self.records = []
+        self.record_lines = 1
+        self.field_count = 0
+        self.line_count = 0
+
+    def set_document(self, api_data):
+        self.beginResetModel()
+        self.clear_document()
+        if api_data:
+            self._layout(api_data)
+        else:
+            self.head = ['{}']
+        self.line_count = len(self.head) + len(self.records) * self.record_lines + len(self.tail)
+        self.endResetModel()
+
+    def clear(self):
+        self.beginResetModel()
+        self.clear_document()
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self.line_count
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        return self.line(index.row())
+
+    def line(self, number):
+        """Text of one line of the document"""
+        if number < len(self.head):
+            return self.head[number]
+        number -= len(self.head)
+        if number >= len(self.records) * self.record_lines:
+            return self.tail[number - len(self.records) * self.record_lines]
+
+        position, offset = divmod(number, self.record_lines)
+        record = self.records[position]
+        comma = ',' if position < len(self.records) - 1 else ''
+        if self.record_lines == 1:
+            return f"{RECORD_INDENT}{_dumps(record)}{comma}"
+        if offset == 0:
+            return f"{RECORD_INDENT}{{"
+        if offset == self.record_lines - 1:
+            return f"{RECORD_INDENT}}}{comma}"
+        key, value = _nth_item(record, offset - 1)
+        separator = ',' if offset < self.field_count else ''
+        return f"{FIELD_INDENT}{_dumps(key)}: {_dumps(value)}{separator}"
+
+    def _layout(self, api_data):
+        self.head = ['{']
+        target = self.head
+        keys = list(api_data)
+        for position, key in enumerate(keys):
+            comma = ',' if position < len(keys) - 1 else ''
+            value = api_data[key]
+            if key == 'data' and isinstance(value, list) and value:
+                target.append(f'  {_dumps(key)}: [')
+                self.records = value
+                field_counts = {len(record) if isinstance(record, dict) else -1 for record in value}
+                self.field_count = field_counts.pop() if len(field_counts) == 1 else -1
+                # Records without fields print as {} on one line, like mixed records
+                self.record_lines = self.field_count + 2 if self.field_count > 0 else 1
+                target = self.tail
+                target.append(f"  ]{comma}")
+                continue
+            lines = json.dumps({key: value}, indent=2, ensure_ascii=False, default=str).split('\n')[1:-1]
+            lines[-1] += comma
+            target.extend(lines)
+        target.append('}')
+
+
+class RecordTableModel(QAbstractTableModel):
+    """Rows of a ColumnStore, or a short list of preview rows, for a QTableView.
+
+    Cells are read PREVIEW_BLOCK_ROWS rows at a time with one take() per
+    column and the last PREVIEW_CACHED_BLOCKS blocks are kept, so no
+    per-cell items are created and scrolling anywhere in millions of rows
+    only converts the rows on screen.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.headers = []
+        self.rows = []
+        self.store = None
+        self.blocks = OrderedDict()
+
+    def set_rows(self, headers, rows):
+        """Show plain row lists (the first rows, before the data is loaded)"""
+        self.beginResetModel()
+        self.headers, self.rows, self.store = list(headers), rows, None
+        self.blocks.clear()
+        self.endResetModel()
+
+    def set_store(self, store):
+        self.beginResetModel()
+        self.headers, self.rows, self.store = list(store.field_names), [], store
+        self.blocks.clear()
+        self.endResetModel()
+
+    def clear(self):
+        self.set_rows([], [])
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.store) if self.store is not None else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.headers)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal and section < len(self.headers):
+            return self.headers[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        if self.store is None:
+            return str(self.rows[index.row()][index.column()])
+        block, offset = divmod(index.row(), PREVIEW_BLOCK_ROWS)
+        value = self._block(block)[index.column()][offset]
+        return "" if _is_missing(value) else str(value)
+
+    def _block(self, block):
+        columns = self.blocks.get(block)
+        if columns is not None:
+            self.blocks.move_to_end(block)
+            return columns
+        start = block * PREVIEW_BLOCK_ROWS
+        indices = np.arange(start, min(start + PREVIEW_BLOCK_ROWS, len(self.store)))
+        columns = [column.take(indices) for column in self.store.columns]
+        self.blocks[block] = columns
+        while len(self.blocks) > PREVIEW_CACHED_BLOCKS:
+            self.blocks.popitem(last=False)
+        return columns
+
+
+def _dumps(value):
+    # default=str keeps a value json cannot encode visible instead of failing the whole view
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+
+def _nth_item(record, position):
+    return next(islice(record.items(), position, None))
+
+
+def _is_missing(value):
+    return value is None or (isinstance(value, float) and value != value)
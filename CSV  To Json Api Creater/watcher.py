@@ -0,0 +1,92 @@
+import os
+import threading
+import time
+
+
+POLL_INTERVAL = 0.5
+DEBOUNCE_SECONDS = 1.0
+WATCHED_EXTENSIONS = ('.csv', '.xlsx', '.xls')
+
+
+class FileWatcher:
+    """Calls on_change(path) after a watched file or directory stops changing.
+
+    Each poll compares a stat signature (size, modification time and inode
+    of the file, or of every CSV/Excel file in a directory); contents are
+    never read, so polling stays cheap for large files and also catches
+    editors that save by renaming a new file into place. A burst of writes
+    is debounced: on_change runs once nothing has changed for debounce
+    seconds. start() polls on a daemon thread, so a reload never blocks the
+    caller or the request threads; a process that must not start threads
+    (one that forks workers) can call poll() from its own loop instead.
+    """
+
+    def __init__(self, path, on_change, interval=POLL_INTERVAL, debounce=DEBOUNCE_SECONDS, log=print):
+        self.path = path
+        self.on_change = on_change
+        self.interval = interval
+        self.debounce = debounce
+        self.log = log
+        self.last = self.signature()
+        self.changed_at = None
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    @property
+    def running(self):
+        return self.thread is not None
+
+    def start(self):
+        if self.running:
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if not self.running:
+            return
+        self.stop_event.set()
+        # A reload in progress finishes on its own; the thread is a daemon
+        self.thread.join(self.interval * 2)
+        self.thread = None
+
+    def signature(self):
+        """Stat fingerprint of the watched path (None while it does not exist)"""
+        try:
+            if os.path.isdir(self.path):
+                entries = []
+                with os.scandir(self.path) as scan:
+                    for entry in scan:
+                        if entry.is_file() and entry.name.lower().endswith(WATCHED_EXTENSIONS):
+                            entries.append((entry.name, _stat_signature(entry.stat())))
+                return tuple(sorted(entries))
+            return _stat_signature(os.stat(self.path))
+        except OSError:
+            return None
+
+    def poll(self):
+        """Check once; calls on_change when a change has settled"""
+        current = self.signature()
+        if current != self.last:
+            self.last = current
+            self.changed_at = time.monotonic()
+            return
+        if self.changed_at is None or time.monotonic() - self.changed_at < self.debounce:
+            return
+        self.changed_at = None
+        if current is None:
+            # Removed (or mid-replace): keep serving the current data
+            return
+        try:
+            self.on_change(self.path)
+        except Exception as e:
+            self.log(f"Reload failed, keeping the current data: {str(e)}")
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            self.poll()
+
+
+def _stat_signature(stat):
+    return (stat.st_size, stat.st_mtime_ns, stat.st_ino)